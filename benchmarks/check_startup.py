@@ -0,0 +1,92 @@
+"""
+CLI cold-start budget check.
+
+For each CLI entry point, runs `python src/<entry>.py --help` (imports + building every flag group),
+and for the library modules the CLIs load, imports them in a fresh interpreter. Checks that
+1. none of the heavy dependencies (pandas, numpy, requests, bs4, streamlit) were loaded eagerly, and
+2. the median time stays under the budget (ms, on top of a bare `python -c pass`).
+
+    python benchmarks/check_startup.py
+    python benchmarks/check_startup.py --budget-ms 80 --runs 7
+
+Exit code is 1 when either check fails, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+CLI_ENTRIES = ["main", "trend_hunter", "niche_hunter"]
+LIBRARY_MODULES = ["data_fetcher", "calculator", "keyword_expander"]
+HEAVY_MODULES = ["pandas", "numpy", "requests", "bs4", "streamlit"]
+
+PROBE = """
+import sys, json
+sys.path.insert(0, {src!r})
+import {module}
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+# --help 실행 후 로드된 무거운 모듈 확인 (argparse가 SystemExit으로 끝내므로 atexit에서 출력)
+CLI_PROBE = """
+import atexit, json, runpy, sys
+atexit.register(lambda: print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules))))
+sys.argv = [{script!r}, "--help"]
+runpy.run_path({script!r}, run_name="__main__")
+"""
+
+
+def timed_run(*argv: str) -> (float, str):
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, *argv], capture_output=True, text=True, cwd=ROOT_DIR, check=True)
+    return (time.perf_counter() - started) * 1000, out.stdout.strip()
+
+
+def heavy_loaded(*argv: str):
+    return json.loads(timed_run(*argv)[1].splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI cold-start budget check")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="Max median overhead per entry point (`--help`) or library module (import)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    bare = statistics.median(timed_run("-c", "pass")[0] for _ in range(args.runs))
+    failed = False
+    print(f"interpreter baseline: {bare:.1f} ms (budget +{args.budget_ms:.0f} ms)")
+
+    checks = []
+    for entry in CLI_ENTRIES:
+        script = os.path.join(SRC_DIR, f"{entry}.py")
+        checks.append((f"{entry}.py --help", (script, "--help"),
+                       ("-c", CLI_PROBE.format(script=script, heavy=HEAVY_MODULES))))
+    for module in LIBRARY_MODULES:
+        code = ("-c", PROBE.format(src=SRC_DIR, module=module, heavy=HEAVY_MODULES))
+        checks.append((f"import {module}", code, code))
+
+    for label, command, probe in checks:
+        overhead = statistics.median(timed_run(*command)[0] for _ in range(args.runs)) - bare
+        loaded = heavy_loaded(*probe)
+
+        problems = []
+        if loaded:
+            problems.append(f"eager heavy imports: {', '.join(loaded)}")
+        if overhead > args.budget_ms:
+            problems.append(f"{overhead:.1f} ms > budget")
+        failed |= bool(problems)
+        status = "❌ " + "; ".join(problems) if problems else "✅"
+        print(f"  {label:<26}{overhead:8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
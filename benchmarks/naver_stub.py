@@ -0,0 +1,221 @@
+"""
+Local stand-in for the two Naver endpoints used by data_fetcher.py.
+
+- GET /keywordstool           (Ad API, RelKwdStat)  -> {"keywordList": [...]}
+- GET /v1/search/blog.json    (Search API)          -> {"total": ..., "items": [...]}
+
+Payloads are deterministic per keyword (seeded by hash) and shaped like the real API:
+low volumes come back as the string "< 10", compIdx is 낮음/중간/높음, and blog items carry
+title/bloggername/bloggerlink/postdate. Latency, jitter and 429 injection are configurable.
+
+Standalone:
+    python benchmarks/naver_stub.py --port 8099 --latency-ms 30 --throttle-rate 0.05
+    NAVER_AD_BASE_URL=http://127.0.0.1:8099 \
+    NAVER_SEARCH_BASE_URL=http://127.0.0.1:8099/v1/search/blog.json python src/main.py --seed 캠핑의자
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+RELATED_SUFFIXES = ["추천", "후기", "가격", "비교", "순위", "방법", "종류", "할인", "사이트", "브랜드",
+                    "정리", "전망", "주가", "신청", "조회", "장단점", "내돈내산", "리뷰", "꿀팁", "모음"]
+COMP_LEVELS = ["낮음", "중간", "높음"]
+
+
+def keyword_rng(keyword: str, salt: str = "") -> random.Random:
+    digest = hashlib.blake2b(f"{salt}:{keyword}".encode("utf-8"), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def fake_volume(keyword: str) -> int:
+    # 검색량은 롱테일(로그정규) 분포: 대부분 수십~수천, 일부 수십만
+    return int(keyword_rng(keyword, "vol").lognormvariate(6.0, 1.8))
+
+
+def fake_total_docs(keyword: str) -> int:
+    vol = max(fake_volume(keyword), 10)
+    saturation = keyword_rng(keyword, "docs").lognormvariate(0.5, 1.4)
+    return int(vol * saturation)
+
+
+def _qc(value: int) -> Any:
+    return "< 10" if value < 10 else value
+
+
+def keyword_item(keyword: str) -> Dict[str, Any]:
+    rng = keyword_rng(keyword, "item")
+    vol = fake_volume(keyword)
+    mobile_share = rng.uniform(0.55, 0.9)
+    mobile = int(vol * mobile_share)
+    return {
+        "relKeyword": keyword.replace(" ", ""),
+        "monthlyPcQcCnt": _qc(vol - mobile),
+        "monthlyMobileQcCnt": _qc(mobile),
+        "monthlyAvePcClkCnt": round(rng.uniform(0, 30), 1),
+        "monthlyAveMobileClkCnt": round(rng.uniform(0, 80), 1),
+        "monthlyAvePcCtr": round(rng.uniform(0, 3), 2),
+        "monthlyAveMobileCtr": round(rng.uniform(0, 5), 2),
+        "plAvgDepth": rng.randint(1, 15),
+        "compIdx": rng.choice(COMP_LEVELS),
+    }
+
+
+def keywordstool_payload(hint: str, related_per_hint: int) -> Dict[str, Any]:
+    items = [keyword_item(hint)]
+    rng = keyword_rng(hint, "related")
+    for i in range(related_per_hint - 1):
+        suffix = RELATED_SUFFIXES[i % len(RELATED_SUFFIXES)]
+        extra = "" if i < len(RELATED_SUFFIXES) else str(rng.randint(2, 99))
+        items.append(keyword_item(f"{hint}{suffix}{extra}"))
+    return {"keywordList": items}
+
+
+def blog_payload(query: str, display: int) -> Dict[str, Any]:
+    rng = keyword_rng(query, "blog")
+    today = date.today()
+    items: List[Dict[str, Any]] = []
+    for i in range(display):
+        blogger = f"blogger{rng.randint(1, 40)}"
+        posted = today - timedelta(days=int(rng.expovariate(1 / 120)))
+        title = f"{query} {rng.choice(RELATED_SUFFIXES)}" if rng.random() < 0.5 else f"<b>{query}</b> 솔직 {rng.choice(RELATED_SUFFIXES)}"
+        items.append({
+            "title": title,
+            "link": f"https://blog.naver.com/{blogger}/{rng.randint(10**11, 10**12)}",
+            "description": f"{query} 관련 포스팅 {i}",
+            "bloggername": blogger,
+            "bloggerlink": f"blog.naver.com/{blogger}",
+            "postdate": posted.strftime("%Y%m%d"),
+        })
+    return {
+        "lastBuildDate": time.strftime("%a, %d %b %Y %H:%M:%S +0900"),
+        "total": fake_total_docs(query),
+        "start": 1,
+        "display": display,
+        "items": items,
+    }
+
+
+class NaverStubServer:
+    """
+    Threaded HTTP stub. Use as a context manager; `base_url` is ready after __enter__.
+    `counts` holds per-path request counters (including injected 429s under 'throttled').
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 throttle_rate: float = 0.0, related_per_hint: int = 100, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.related_per_hint = related_per_hint
+        self.counts: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides that point RealDataFetcher at this stub."""
+        return {
+            "NAVER_AD_BASE_URL": self.base_url,
+            "NAVER_SEARCH_BASE_URL": f"{self.base_url}/v1/search/blog.json",
+            "NAVER_REQUEST_INTERVAL": "0",
+        }
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts = {}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _delay_and_throttle(self) -> bool:
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            throttled = self._rng.random() < self.throttle_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return throttled
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # 조용히
+                pass
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                stub._count(url.path)
+                if stub._delay_and_throttle():
+                    stub._count("throttled")
+                    self._send(429, {"errorMessage": "Rate limit exceeded.", "errorCode": "012"})
+                    return
+
+                if url.path == "/keywordstool":
+                    hint = query.get("hintKeywords", [""])[0]
+                    self._send(200, keywordstool_payload(hint, stub.related_per_hint))
+                elif url.path == "/v1/search/blog.json":
+                    q = query.get("query", [""])[0]
+                    display = min(int(query.get("display", ["10"])[0]), 100)
+                    self._send(200, blog_payload(q, display))
+                else:
+                    self._send(404, {"errorMessage": "Not Found"})
+
+        return Handler
+
+    def __enter__(self) -> "NaverStubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Naver API stand-in")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--related-per-hint", type=int, default=100)
+    args = parser.parse_args()
+
+    with NaverStubServer(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                         throttle_rate=args.throttle_rate, related_per_hint=args.related_per_hint) as stub:
+        print(f"Naver stub listening on {stub.base_url}")
+        for k, v in stub.env().items():
+            print(f"  export {k}={v}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
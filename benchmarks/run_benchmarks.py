@@ -0,0 +1,299 @@
+"""
+End-to-end benchmarks against the local Naver stand-in (benchmarks/naver_stub.py).
+
+Measures keywords/sec, API calls per keyword and peak Python memory (tracemalloc) for the
+src/main.py, trend_hunter, niche_hunter and calculator paths at several input sizes.
+The CLI paths run each entry point's main() (staged pipeline, batch scoring, SERP parsing, reports);
+only the keyword supply is swapped so that every path gets exactly the requested number of keywords.
+Each run is stored under benchmarks/results/, and compared against baseline.json when present.
+
+    python benchmarks/run_benchmarks.py                       # 100, 1k, 10k keywords, all paths
+    python benchmarks/run_benchmarks.py --sizes 100 --paths main,niche
+    python benchmarks/run_benchmarks.py --save-baseline       # accept current numbers as baseline
+    python benchmarks/run_benchmarks.py --latency-ms 30 --throttle-rate 0.05
+    python benchmarks/run_benchmarks.py --sizes 1000 --workers fetch=16
+
+Exit code is 1 when a path regresses beyond --tolerance against the baseline.
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+
+for p in (SRC_DIR, BENCH_DIR):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from naver_stub import NaverStubServer, fake_total_docs, fake_volume  # noqa: E402
+
+ALL_PATHS = ["main", "trend", "niche", "calculator"]
+SEED_WORDS = ["캠핑", "주식", "여행", "맛집", "청소기", "반도체", "코인", "크림", "제품", "블로그"]
+
+
+def seed_name(i: int) -> str:
+    """i-th distinct seed topic, cycling through categories so every expander branch is exercised."""
+    return f"{SEED_WORDS[i % len(SEED_WORDS)]}{i}"
+
+
+def expansion_plan(n: int) -> Dict[str, List[str]]:
+    """Seed topic -> its not-yet-seen expanded keywords, over as many seeds as it takes to reach `n` keywords."""
+    from keyword_expander import expand_keyword
+
+    seen, plan, i = set(), {}, 0
+    while len(seen) < n:
+        seed = seed_name(i)
+        plan[seed] = []
+        for kw in expand_keyword(seed)[0]:
+            if kw not in seen and len(seen) < n:
+                seen.add(kw)
+                plan[seed].append(kw)
+        i += 1
+    return plan
+
+
+def expanded_keywords(n: int) -> List[str]:
+    return [kw for keywords in expansion_plan(n).values() for kw in keywords]
+
+
+# --- Paths ---
+# 각 경로는 진입점의 main()을 그대로 실행합니다 (파이프라인, --workers, 배치 score_rows, SERP 파싱, 리포트 포함).
+# 입력 크기를 맞추기 위해 키워드 공급 지점만 바꿔 끼웁니다.
+CLI_ARGS: List[str] = []  # --workers 등 진입점에 그대로 넘길 플래그
+
+
+def run_cli(module_name: str, argv: List[str], workdir: str, **patches: Any) -> int:
+    """Runs `module_name.main()` with argv inside `workdir` (reports/ goes there) and returns the rows written."""
+    module = importlib.import_module(module_name)
+    saved = {name: getattr(module, name) for name in patches}
+    old_argv, old_cwd = sys.argv, os.getcwd()
+    try:
+        for name, value in patches.items():
+            setattr(module, name, value)
+        sys.argv = [f"{module_name}.py", *argv, *CLI_ARGS]
+        os.chdir(workdir)
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            module.main()
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+        sys.argv = old_argv
+        os.chdir(old_cwd)
+
+    rows = 0
+    reports = os.path.join(workdir, "reports")
+    for name in os.listdir(reports) if os.path.isdir(reports) else ():
+        if name.endswith(".jsonl"):
+            with open(os.path.join(reports, name), encoding="utf-8") as f:
+                rows += sum(1 for _ in f)
+    return rows
+
+
+def bench_main(n: int, workdir: str) -> int:
+    # src/main.py: 시드 하나 → 확장 → 중복 제거 → fetch_keyword_data (병렬) → score_rows → 순위 → 리포트
+    keywords = expanded_keywords(n)
+    return run_cli("main", ["--seed", seed_name(0)], workdir, expand_keyword=lambda seed: (keywords, []))
+
+
+def bench_trend(n: int, workdir: str) -> int:
+    # trend_hunter: 여러 트렌드 → 트렌드별 확장 (fan-out) → 중복 제거 → 수집 → Blue Ocean/Red Ocean 리포트.
+    # 트렌드 수집(Signal.bz)은 외부 사이트라 시드 주제 목록으로 대체합니다.
+    plan = expansion_plan(n)
+    return run_cli("trend_hunter", [], workdir,
+                   fetch_trending_keywords=lambda limit=None: list(plan),
+                   expand_keyword=lambda trend: (plan[trend], []))
+
+
+def bench_niche(n: int, workdir: str) -> int:
+    # niche_hunter: 연관 검색어 (광고 API) → 중복 제거 → fetch_docs (검색 API + SERP) → score_rows → 리포트.
+    # 시드 하나의 연관 검색어는 스텁 설정 수만큼이므로, n개가 될 때까지 여러 시드의 결과를 이어 붙입니다.
+    from data_fetcher import RealDataFetcher
+
+    class BenchFetcher(RealDataFetcher):
+        def get_related_keywords(self, seed_keyword):
+            out, seen, i = [], set(), 0
+            while len(out) < n:
+                related = super().get_related_keywords(seed_name(i))
+                if not related and i > n:
+                    break  # 스텁 오류 등으로 더 모을 수 없음
+                for item in related:
+                    if item["keyword"] not in seen and len(out) < n:
+                        seen.add(item["keyword"])
+                        out.append(item)
+                i += 1
+            return out
+
+    return run_cli("niche_hunter", ["--seed", seed_name(0)], workdir, RealDataFetcher=BenchFetcher)
+
+
+def bench_calculator(n: int, workdir: str) -> int:
+    # API 없이 점수 계산 + DataFrame 필터/정렬 (app.py 경로와 동일한 형태)
+    from calculator import calculate_saturation, calculate_efficiency, filter_keywords
+    from records import KeywordRecords
+
+    records = KeywordRecords()
+    for i in range(n):
+        kw = f"bench keyword {i}"
+        vol, docs = fake_volume(kw), fake_total_docs(kw)
+        sk = calculate_saturation(docs, vol)
+        records.append(kw, vol, docs, sk, calculate_efficiency(sk, vol))
+    filter_keywords(records.to_pandas()).sort_values(by="Efficiency_Score", ascending=False)
+    return len(records)
+
+
+BENCHES: Dict[str, Callable[[int, str], int]] = {
+    "main": bench_main,
+    "trend": bench_trend,
+    "niche": bench_niche,
+    "calculator": bench_calculator,
+}
+
+
+def run_one(name: str, n: int, stub: NaverStubServer) -> Dict[str, Any]:
+    stub.reset_counts()
+    with tempfile.TemporaryDirectory() as workdir:
+        tracemalloc.start()
+        started = time.perf_counter()
+        rows = BENCHES[name](n, workdir)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    calls = sum(v for k, v in stub.counts.items() if k != "throttled")
+    return {
+        "path": name,
+        "size": n,
+        "rows": rows,
+        "seconds": round(elapsed, 4),
+        "keywords_per_sec": round(n / elapsed, 2) if elapsed else math.inf,
+        "api_calls_per_keyword": round(calls / n, 4),
+        "throttled": stub.counts.get("throttled", 0),
+        "peak_mem_mb": round(peak / 1024 / 1024, 3),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Returns human-readable regression messages (empty list = no regression)."""
+    base = {(r["path"], r["size"]): r for r in baseline.get("results", [])}
+    problems = []
+    for r in results:
+        b = base.get((r["path"], r["size"]))
+        if not b:
+            continue
+        label = f"{r['path']}@{r['size']}"
+        if r["keywords_per_sec"] < b["keywords_per_sec"] * (1 - tolerance):
+            problems.append(f"{label}: keywords/sec {r['keywords_per_sec']} < baseline {b['keywords_per_sec']}")
+        if r["api_calls_per_keyword"] > b["api_calls_per_keyword"] * (1 + tolerance):
+            problems.append(f"{label}: API calls/keyword {r['api_calls_per_keyword']} > baseline {b['api_calls_per_keyword']}")
+        if r["peak_mem_mb"] > b["peak_mem_mb"] * (1 + tolerance):
+            problems.append(f"{label}: peak memory {r['peak_mem_mb']}MB > baseline {b['peak_mem_mb']}MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Naver SEO end-to-end benchmarks (local API stand-in)")
+    parser.add_argument("--sizes", type=str, default="100,1000,10000")
+    parser.add_argument("--paths", type=str, default=",".join(ALL_PATHS))
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--jitter-ms", type=float, default=1.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--related-per-hint", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=1, help="Number of credential sets in the pool")
+    parser.add_argument("--key-rate", type=float, default=None, help="Requests/sec per credential set (default: unlimited)")
+    parser.add_argument("--workers", action="append", default=[], metavar="STAGE=N",
+                        help="Pipeline threads per stage, passed to the entry points (e.g. fetch=16)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs. baseline")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    CLI_ARGS.extend(f"--workers={spec}" for spec in args.workers)
+    paths = [p for p in args.paths.split(",") if p]
+    unknown = set(paths) - set(BENCHES)
+    if unknown:
+        parser.error(f"unknown paths: {sorted(unknown)}")
+
+    with NaverStubServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, throttle_rate=args.throttle_rate,
+                         related_per_hint=args.related_per_hint) as stub, \
+            tempfile.TemporaryDirectory() as secrets_dir:
+        secrets_path = os.path.join(secrets_dir, "secrets.json")
+        with open(secrets_path, "w", encoding="utf-8") as f:
+            fields = ["NAVER_AD_API_KEY", "NAVER_AD_SECRET_KEY", "NAVER_CUSTOMER_ID", "NAVER_CLIENT_ID", "NAVER_CLIENT_SECRET"]
+            key_sets = [dict({k: f"bench{i}" for k in fields}, RATE_PER_SEC=args.key_rate) for i in range(args.keys)]
+            json.dump({"NAVER_CREDENTIALS": key_sets}, f)
+        os.environ.update(stub.env())
+        os.environ["NAVER_SECRETS_PATH"] = secrets_path
+
+        # 모듈 import 비용이 첫 측정의 메모리/시간에 섞이지 않도록 미리 로드
+        import pandas, data_fetcher, calculator, records, report_writer, keyword_expander  # noqa: F401
+        for module in ("main", "trend_hunter", "niche_hunter"):
+            importlib.import_module(module)
+
+        results = []
+        print(f"{'path':<11}{'size':>7}{'kw/s':>11}{'calls/kw':>10}{'peak MB':>10}{'429s':>7}")
+        for name in paths:
+            for n in sizes:
+                r = run_one(name, n, stub)
+                results.append(r)
+                print(f"{name:<11}{n:>7}{r['keywords_per_sec']:>11.1f}{r['api_calls_per_keyword']:>10.2f}"
+                      f"{r['peak_mem_mb']:>10.2f}{r['throttled']:>7}")
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "stub": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+                 "throttle_rate": args.throttle_rate, "related_per_hint": args.related_per_hint,
+                 "keys": args.keys, "key_rate": args.key_rate, "workers": args.workers},
+        "results": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, ensure_ascii=False, indent=2)
+    print(f"Results saved: {out_path}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+        print(f"Baseline updated: {BASELINE_PATH}")
+        return
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("stub") != run["stub"]:
+            print("⚠️ Stub settings differ from baseline; comparison may be meaningless.")
+        problems = compare(results, baseline, args.tolerance)
+        if problems:
+            print("❌ Regressions detected:")
+            for p in problems:
+                print(f"   - {p}")
+            sys.exit(1)
+        print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,19 @@ import os
 import pandas as pd
 from datetime import datetime
 from src.keyword_expander import expand_keyword
-from src.data_fetcher import fetch_metrics
-from src.calculator import calculate_saturation, calculate_efficiency, filter_keywords
+from src.data_fetcher import fetch_keyword_data
+from src.calculator import filter_keywords
+from src.serp_features import score_rows
+from src.synthetic_fetcher import add_synthetic_args, synthetic_from_args
 
 import argparse
 
 def main():
     parser = argparse.ArgumentParser(description="Naver SEO Keyword Miner")
     parser.add_argument("--seed", type=str, default="캠핑의자", help="Seed keyword for mining")
+    add_synthetic_args(parser)
     args = parser.parse_args()
+    fetcher = synthetic_from_args(args)  # None = real Naver API
 
     print("Initializing Naver Search Ecology Architect Agent...")
     
@@ -27,19 +31,21 @@ def main():
         print(f"*** Auto-Brainstorming Mode Active! ***")
         print(f"Input Broad Topic: '{seed_keyword}' -> Expanded Sub-topics: {sub_topics}")
     
-    # 3. Fetch Data (Mock)
-    print("Fetching metrics from (Mock) Naver DataLab & Search API...")
+    # 3. Fetch Data
+    print(f"Fetching metrics from {'synthetic data' if fetcher else 'Naver Ad & Search API'}...")
     data = []
     for kw in keywords:
-        metrics = fetch_metrics(kw)
-        data.append(metrics)
-        
-    df = pd.DataFrame(data)
+        metrics = fetch_keyword_data(kw, fetcher=fetcher)
+        if metrics:  # None = API failure, skipped
+            data.append(metrics)
+
+    if not data:
+        print("No data collected. Check secrets.json or try --synthetic.")
+        return
     
     # 4. Calculate Scores
-    print("Calculating Saturation Index (Sk) and Efficiency Score (Ek)...")
-    df['saturation_index'] = df.apply(lambda row: calculate_saturation(row['doc_count'], row['search_volume']), axis=1)
-    df['efficiency_score'] = df.apply(lambda row: calculate_efficiency(row['saturation_index'], row['search_volume']), axis=1)
+    print("Calculating Saturation Index (Sk), Efficiency Score (Ek) and SERP features...")
+    df = pd.DataFrame(score_rows(data))
     
     # 5. Filter (Constraint: Sk < 5.0)
     print("Filtering keywords (Constraint: Sk < 5.0)...")
@@ -49,7 +55,7 @@ def main():
     print(f"Dropped {dropped_count} keywords due to high saturation.")
     
     # 6. Sort by Efficiency (Priority)
-    df_filtered = df_filtered.sort_values(by='efficiency_score', ascending=False)
+    df_filtered = df_filtered.sort_values(by='Efficiency_Score', ascending=False)
     
     # 7. Generate Report
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -57,10 +63,10 @@ def main():
     
     # Format for readability
     display_df = df_filtered.copy()
-    display_df['saturation_index'] = display_df['saturation_index'].round(2)
-    display_df['efficiency_score'] = display_df['efficiency_score'].round(2)
+    display_df['Saturation_Index'] = display_df['Saturation_Index'].round(2)
+    display_df['Efficiency_Score'] = display_df['Efficiency_Score'].round(2)
     
-    markdown_table = display_df[['keyword', 'search_volume', 'doc_count', 'saturation_index', 'efficiency_score', 'smart_block_type']].to_markdown(index=False)
+    markdown_table = display_df[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score', 'SmartBlock_Type']].to_markdown(index=False)
     
     brainstorm_section = ""
     if sub_topics:
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from distributed import normalize_keyword
+    from report_writer import markdown_table
+except ImportError:
+    from src.distributed import normalize_keyword
+    from src.report_writer import markdown_table
+
+DEFAULT_STATE_DIR = "reports"
+
+# 리포트에 나열하는 미분석 키워드 수 상한
+PENDING_LIMIT = 50
+
+
+def _compact(keyword: str) -> str:
+    # 광고 API 연관 키워드는 공백 없이 돌아오므로 공백을 뺀 형태로 맞춤
+    return normalize_keyword(keyword).replace(" ", "")
+
+
+def volume_hints(related: Iterable[Dict[str, Any]], store=None, keywords: Iterable[str] = ()) -> Dict[str, int]:
+    """
+    Expected monthly volume per keyword (compact form) before anything is fetched:
+    the seed's related keywords (one Ad API call) and, with a `store` (MetricStore or KeywordIndex), the last
+    stored volume.
+    """
+    hints = {_compact(item["keyword"]): item["volume"] for item in related}
+    if store is not None:
+        for kw in keywords:
+            obs = store.latest(kw)
+            if obs is not None and obs["volume"] is not None:
+                hints.setdefault(_compact(kw), obs["volume"])
+    return hints
+
+
+def prioritize(seed: str, keywords: Iterable[str], hints: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Work items {'keyword', 'volume'}: the seed first (if listed), then by expected volume (unknown last, in order)."""
+    items, seen = [], set()
+    for kw in keywords:
+        key = normalize_keyword(kw)
+        if key not in seen:
+            seen.add(key)
+            items.append({"keyword": kw, "volume": hints.get(_compact(kw))})
+    seed_key = normalize_keyword(seed)
+    items.sort(key=lambda item: (normalize_keyword(item["keyword"]) != seed_key,
+                                 1 if item["volume"] is None else -item["volume"]))
+    return items
+
+
+class Deadline:
+    """Wall-clock budget; None = unlimited."""
+
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+        self.at = time.monotonic() + seconds if seconds else None
+
+    @property
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+
+class AnytimeRun:
+    """
+    Deadline-bounded analysis of one seed's work list that returns the best result so far.
+    Items are fetched in priority order until the deadline; fetches already started are allowed to finish,
+    later ones are skipped and stay pending. save() keeps the pending items and the scored rows so that
+    the next call (resume) fetches only what is left and reports everything analyzed so far.
+    """
+
+    def __init__(self, seed: str, items: List[Dict[str, Any]], rows: Optional[List[Dict[str, Any]]] = None,
+                 failed: Optional[List[str]] = None, path: Optional[str] = None):
+        self.seed = seed
+        self.items = items
+        self.rows = rows or []
+        self.failed = failed or []
+        self.path = path
+        self.deadline = Deadline(None)
+        self._done = {normalize_keyword(row["Keyword"]) for row in self.rows}
+        self._done.update(normalize_keyword(kw) for kw in self.failed)
+        self._lock = threading.Lock()
+
+    # --- Persistence ---
+    @staticmethod
+    def state_path(seed: str, directory: str = DEFAULT_STATE_DIR) -> str:
+        digest = hashlib.blake2b(normalize_keyword(seed).encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(directory, f"anytime_{digest}.json")
+
+    @classmethod
+    def load(cls, path: str) -> Optional["AnytimeRun"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        return cls(state["seed"], state["pending"], state["rows"], state.get("failed"), path)
+
+    def save(self) -> None:
+        """Writes the state (or removes it once nothing is pending)."""
+        if self.path is None:
+            return
+        if not self.pending:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"seed": self.seed, "pending": self.pending, "rows": self.rows, "failed": self.failed},
+                      f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    # --- Pipeline hooks ---
+    def start(self, seconds: Optional[float]) -> None:
+        self.deadline = Deadline(seconds)
+
+    def discover(self) -> Iterator[Dict[str, Any]]:
+        """Pending items in priority order, until the deadline."""
+        for item in self.pending:
+            if self.deadline.expired:
+                return
+            yield item
+
+    def gate(self, fetch: Callable[[str], Optional[Dict[str, Any]]]) -> Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Wraps a keyword fetch: past the deadline items are skipped (they stay pending); failures are not retried."""
+        def fetch_item(item):
+            if self.deadline.expired:
+                return None
+            row = fetch(item["keyword"])
+            if row is None:
+                with self._lock:
+                    self.failed.append(item["keyword"])
+                    self._done.add(normalize_keyword(item["keyword"]))
+            return row
+        return fetch_item
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Sink hook: keeps a scored row."""
+        with self._lock:
+            self.rows.append(row)
+            self._done.add(normalize_keyword(row["Keyword"]))
+
+    # --- Results ---
+    @property
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [item for item in self.items if normalize_keyword(item["keyword"]) not in self._done]
+
+    @property
+    def complete(self) -> bool:
+        return not self.pending
+
+    def summary_markdown(self) -> str:
+        """Coverage line plus the keywords not analyzed yet (for the report)."""
+        pending = self.pending
+        total = len(self.rows) + len(self.failed) + len(pending)
+        budget = f" within the {self.deadline.seconds:g}s time budget" if self.deadline.seconds else ""
+        lines = [f"- **Coverage:** {len(self.rows)} of {total} keywords analyzed{budget}"
+                 + (f", {len(self.failed)} failed" if self.failed else "")]
+        if not pending:
+            return "\n".join(lines)
+        lines.append(f"- **Not analyzed yet:** {len(pending)} keywords (highest expected volume first); "
+                     f"run again with `--resume` to continue")
+        shown = [{"Keyword": item["keyword"], "Expected_Volume": item["volume"] if item["volume"] is not None else "-"}
+                 for item in pending[:PENDING_LIMIT]]
+        lines.append("")
+        lines.append(markdown_table(shown, ["Keyword", "Expected_Volume"]))
+        if len(pending) > PENDING_LIMIT:
+            lines.append(f"\n*... and {len(pending) - PENDING_LIMIT} more.*")
+        return "\n".join(lines)
+
+
+def add_anytime_args(parser) -> None:
+    group = parser.add_argument_group("anytime mode")
+    group.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                       help="Stop starting new fetches after this many seconds and report the best-so-far ranking "
+                            "(seed first, then high-volume expansions); the rest is saved for --resume")
+    group.add_argument("--resume", action="store_true",
+                       help="Continue the unfinished time-budgeted run of the same seed")
@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
-import time
 
 # --- Path Setup ---
 # Add 'src' to sys.path if running from root
@@ -14,15 +13,33 @@ if current_dir not in sys.path:
 try:
     from keyword_expander import expand_keyword
     from data_fetcher import fetch_keyword_data, RealDataFetcher
-    from calculator import calculate_saturation, calculate_efficiency, filter_keywords
+    from calculator import filter_keywords, BLUE_OCEAN_SK, RED_OCEAN_SK
     from trend_hunter import fetch_trending_keywords 
+    from niche_hunter import fetch_docs
+    from records import KeywordRecords
+    from scenarios import ScenarioGrid, load_records, parse_category_rates, parse_rates, rate_scenarios
+    from synthetic_fetcher import SYNTHETIC_HISTORY_PATH, SyntheticDataFetcher
+    from pipeline import Pipeline
+    from serp_features import score_rows
+    from keyword_index import KeywordIndex, known_row
+    from anytime import AnytimeRun, prioritize, volume_hints
+    from metric_store import DEFAULT_HISTORY_PATH
 except ImportError:
     # Handle direct execution from src folder or different structure
     sys.path.append(os.path.join(current_dir, ".."))
     from src.keyword_expander import expand_keyword
     from src.data_fetcher import fetch_keyword_data, RealDataFetcher
-    from src.calculator import calculate_saturation, calculate_efficiency, filter_keywords
+    from src.calculator import filter_keywords, BLUE_OCEAN_SK, RED_OCEAN_SK
     from src.trend_hunter import fetch_trending_keywords
+    from src.niche_hunter import fetch_docs
+    from src.records import KeywordRecords
+    from src.scenarios import ScenarioGrid, load_records, parse_category_rates, parse_rates, rate_scenarios
+    from src.synthetic_fetcher import SYNTHETIC_HISTORY_PATH, SyntheticDataFetcher
+    from src.pipeline import Pipeline
+    from src.serp_features import score_rows
+    from src.keyword_index import KeywordIndex, known_row
+    from src.anytime import AnytimeRun, prioritize, volume_hints
+    from src.metric_store import DEFAULT_HISTORY_PATH
 
 st.set_page_config(page_title="네이버 SEO 아키텍트", page_icon="🧬", layout="wide")
 
@@ -33,49 +50,118 @@ st.markdown("""
 """)
 
 # --- Sidebar Mode Selection ---
-mode = st.sidebar.selectbox("분석 모드 선택", ["모드 A: 기초 키워드 분석", "모드 B: 실시간 트렌드 딥다이브", "모드 C: 니치 마켓 헌터"])
+mode = st.sidebar.selectbox("분석 모드 선택", ["모드 A: 기초 키워드 분석", "모드 B: 실시간 트렌드 딥다이브", "모드 C: 니치 마켓 헌터", "모드 D: 시나리오 분석"])
+# 합성 데이터: API 쿼터 없이 점수 계산/필터/표시 경로를 시험 (None = 실제 네이버 API)
+synthetic = SyntheticDataFetcher() if st.sidebar.checkbox("합성 데이터 사용 (부하 테스트)") else None
+
+
+# 사전 예열(prewarm.py) 등 다른 프로세스가 기록한 이력을 앱 재시작 없이 반영하도록 주기적으로 다시 로드 (초)
+INDEX_TTL = 3600
+
+
+@st.cache_resource(ttl=INDEX_TTL)
+def keyword_index(path):
+    """Prefix index over the keyword history, loaded once per app process (shared by all sessions) and every INDEX_TTL."""
+    return KeywordIndex.open(path)
+
+
+# 합성 데이터는 실제 이력과 섞이지 않도록 별도 이력/인덱스 사용
+index = keyword_index(SYNTHETIC_HISTORY_PATH if synthetic else DEFAULT_HISTORY_PATH)
+
+
+def collect_records(discover, expand, progress_bar, fetch=None):
+    """
+    Runs discover → (expand) → dedupe → fetch → score (batched: Sk/Ek + SERP features) → sink on the shared Pipeline.
+    The sink (records + progress bar) stays in the script thread, as Streamlit requires.
+    """
+    records = KeywordRecords()
+    pipe = Pipeline()
+
+    def sink(metrics):
+        records.append_row(metrics)
+        progress_bar.progress(min(1.0, pipe.stats["fetch"].received / max(1, pipe.stats["dedupe"].emitted)))
+
+    pipe.source("discover", discover)
+    if expand is not None:
+        pipe.flat_map("expand", expand)
+    pipe.dedupe("dedupe", key=(lambda item: item['keyword']) if fetch else None)
+    pipe.map("fetch", fetch or (lambda kw: fetch_keyword_data(kw, fetcher=synthetic)))  # None = API 실패 (건너뜀)
+    pipe.batch("score", score_rows)
+    pipe.sink("sink", sink)
+    pipe.run()
+    progress_bar.progress(1.0)
+    return records
 
 if mode == "모드 A: 기초 키워드 분석":
     st.header("🔍 기초 키워드 분석 (Basic)")
     st.info("하나의 시드 키워드를 입력하면, 관련 세부 주제로 확장하여 분석합니다.")
     
     seed = st.text_input("시드 키워드 입력", value="광주 맛집")
-    
-    if st.button("키워드 분석 시작"):
+
+    # 입력과 동시에 이전에 분석한 키워드의 지표를 바로 표시 (API 호출 없음)
+    suggestions = [known_row(s) for s in index.suggest(seed) if s.docs is not None and s.volume is not None]
+    if suggestions:
+        st.caption(f"📚 이전에 분석한 키워드 ({len(index)}개 중 '{seed}'로 시작하는 상위 {len(suggestions)}개)")
+        st.dataframe(pd.DataFrame(suggestions)[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score']],
+                     use_container_width=True, hide_index=True)
+
+    # 시간 예산: 시드 → 검색량 높은 순으로 수집하다가 예산이 끝나면 지금까지의 결과를 표시 (남은 키워드는 이어서 분석)
+    budget = st.slider("시간 예산 (초, 0 = 제한 없음)", min_value=0, max_value=300, value=0, step=5)
+    run = st.session_state.get("anytime")
+    if run is not None and (run.seed != seed or run.complete):
+        run = None
+
+    start = st.button("키워드 분석 시작")
+    resume = run is not None and st.button(f"이어서 분석 (남은 {len(run.pending)}개)")
+
+    if start or resume:
         with st.status("분석 진행 중...", expanded=True):
-            st.write("🧠 키워드 브레인스토밍 및 확장 중...")
-            keywords, sub_topics = expand_keyword(seed)
-            if sub_topics:
-                st.success(f"⚡ 자동 브레인스토밍 발동! 다음 주제로 확장됨: {sub_topics}")
-            else:
-                st.info(f"총 {len(keywords)}개 파생 키워드 분석 시작.")
-            
-            st.write("📡 네이버 실제 데이터 수집 중...")
-            data = []
-            progress_bar = st.progress(0)
-            
-            for i, kw in enumerate(keywords):
-                metrics = fetch_keyword_data(kw)
-                if metrics:
-                    data.append(metrics)
-                progress_bar.progress((i + 1) / len(keywords))
-                time.sleep(0.1)
-                
-            if not data:
+            if start:
+                st.write("🧠 키워드 브레인스토밍 및 확장 중...")
+                keywords, sub_topics = expand_keyword(seed)
+                if sub_topics:
+                    st.success(f"⚡ 자동 브레인스토밍 발동! 다음 주제로 확장됨: {sub_topics}")
+                else:
+                    st.info(f"총 {len(keywords)}개 파생 키워드 분석 시작.")
+
+                # 재조회 주기가 지나지 않은 키워드는 저장된 지표 사용, 나머지만 수집
+                known, unknown = index.split(keywords)
+                if known:
+                    st.write(f"📚 {len(known)}개 키워드는 저장된 지표 사용 (API 호출 생략)")
+                # 수집 순서: 시드 → 예상 검색량 높은 순 (연관 키워드 검색량 1회 조회 + 이력에 남은 검색량)
+                related = (synthetic or RealDataFetcher()).get_related_keywords(seed) if budget and unknown else []
+                run = AnytimeRun(seed, prioritize(seed, unknown, volume_hints(related, index, unknown)), rows=known)
+                st.session_state["anytime"] = run
+            run.start(budget or None)
+
+            st.write(f"📡 네이버 실제 데이터 수집 중... ({len(run.pending)}개)")
+            # 지표(Sk, Ek)는 수집 즉시 계산해 컬럼형 레코드에 적재 (수집은 병렬, 적재/진행률은 이 스레드에서)
+            fetched = collect_records(run.discover, None, st.progress(0),
+                                      fetch=run.gate(lambda kw: fetch_keyword_data(kw, fetcher=synthetic)))
+            for row in fetched:
+                run.add(row)
+                index.add(row['Keyword'], row['Monthly_Search_Volume'], row['Total_Docs'])
+            index.flush()
+            if not run.complete:
+                st.warning(f"⏳ 시간 예산 종료: {len(run.pending)}개 키워드는 아직 분석하지 않았습니다. "
+                           f"'이어서 분석'으로 계속할 수 있습니다.")
+
+            records = KeywordRecords()
+            for row in run.rows:
+                records.append_row(row)
+
+            if not records:
                 st.error("데이터 수집 실패. API 키나 검색어를 확인해주세요.")
             else:
-                df = pd.DataFrame(data)
-                
-                st.write("🧮 지표($S_k, E_k$) 계산 중...")
-                df['Saturation_Index'] = df.apply(lambda row: calculate_saturation(row['Total_Docs'], row['Monthly_Search_Volume']), axis=1)
-                df['Efficiency_Score'] = df.apply(lambda row: calculate_efficiency(row['Saturation_Index'], row['Monthly_Search_Volume']), axis=1)
+                st.session_state["last_records"] = records  # 모드 D에서 재사용
+                df = records.to_pandas()
                 
                 # Show Result
-                st.subheader("📊 분석 결과")
+                st.subheader("📊 분석 결과" if run.complete else f"📊 분석 결과 (중간 결과: {len(records)}개 분석, {len(run.pending)}개 남음)")
                 
                 # Highlight Blue Ocean
                 def highlight_blue_ocean(val):
-                    color = '#d4edda' if val < 1.0 else ''
+                    color = '#d4edda' if val < BLUE_OCEAN_SK else ''
                     return f'background-color: {color}'
 
                 display_df = df[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score']].sort_values(by='Efficiency_Score', ascending=False)
@@ -85,6 +171,11 @@ if mode == "모드 A: 기초 키워드 분석":
                 csv = display_df.to_csv(index=False).encode('utf-8-sig')
                 st.download_button("결과 CSV 다운로드", csv, "keyword_analysis.csv", "text/csv")
 
+            if not run.complete:
+                st.caption("⏳ 미분석 키워드 (예상 검색량 순)")
+                st.dataframe(pd.DataFrame(run.pending).rename(columns={'keyword': 'Keyword', 'volume': 'Expected_Volume'}),
+                             use_container_width=True, hide_index=True)
+
 
 elif mode == "모드 B: 실시간 트렌드 딥다이브":
     st.header("🌊 실시간 트렌드 딥 다이브")
@@ -93,39 +184,32 @@ elif mode == "모드 B: 실시간 트렌드 딥다이브":
     if st.button("트렌드 헌팅 시작"):
         with st.status("트렌드 추적 중...", expanded=True) as status:
             st.write("📡 Signal.bz 크롤링 중...")
-            trends = fetch_trending_keywords(limit=5)
+            trends = synthetic.get_trending_keywords(5) if synthetic else fetch_trending_keywords(limit=5)
             st.write(f"🔥 포착된 트렌드: {trends}")
             
             st.write("🧠 확장 및 심층 분석 중...")
-            all_targets = set()
-            for t in trends:
-                exp, _ = expand_keyword(t)
-                all_targets.update(exp)
-            
-            unique_targets = list(all_targets)
-            st.write(f"🚀 총 {len(unique_targets)}개 키워드 분석 대상")
-            
-            data = []
-            progress_bar = st.progress(0)
-            
-            for i, kw in enumerate(unique_targets):
-                metrics = fetch_keyword_data(kw)
-                if metrics:
-                    data.append(metrics)
-                progress_bar.progress((i + 1) / len(unique_targets))
-                time.sleep(0.1)
+            # 사전 예열(prewarm.py)이나 이전 분석으로 저장된 지표는 재사용하고 나머지만 수집
+            known, unknown = index.split(kw for t in trends for kw in expand_keyword(t)[0])
+            if known:
+                st.write(f"📚 {len(known)}개 키워드는 저장된 지표 사용 (API 호출 생략)")
+            records = collect_records(lambda: unknown, None, st.progress(0))
+            for row in records:
+                index.add(row['Keyword'], row['Monthly_Search_Volume'], row['Total_Docs'])
+            index.flush()
+            for row in known:
+                records.append_row(row)
+            st.write(f"🚀 총 {len(records)}개 키워드 분석 완료")
                 
-            if data:
-                df = pd.DataFrame(data)
-                df['Saturation_Index'] = df.apply(lambda row: calculate_saturation(row['Total_Docs'], row['Monthly_Search_Volume']), axis=1)
-                df['Efficiency_Score'] = df.apply(lambda row: calculate_efficiency(row['Saturation_Index'], row['Monthly_Search_Volume']), axis=1)
+            if records:
+                st.session_state["last_records"] = records
+                df = records.to_pandas()
                 
-                st.subheader("🏆 블루오션 기회 ($S_k < 1.0$)")
-                blue_ocean = df[df['Saturation_Index'] < 1.0].sort_values(by='Efficiency_Score', ascending=False)
+                st.subheader(f"🏆 블루오션 기회 ($S_k < {BLUE_OCEAN_SK}$)")
+                blue_ocean = df[df['Saturation_Index'] < BLUE_OCEAN_SK].sort_values(by='Efficiency_Score', ascending=False)
                 st.dataframe(blue_ocean, use_container_width=True)
                 
-                st.subheader("💀 레드오션 경고 ($S_k \ge 5.0$)")
-                red_ocean = df[df['Saturation_Index'] >= 5.0].sort_values(by='Saturation_Index', ascending=False)
+                st.subheader(f"💀 레드오션 경고 ($S_k \\ge {RED_OCEAN_SK}$)")
+                red_ocean = df[df['Saturation_Index'] >= RED_OCEAN_SK].sort_values(by='Saturation_Index', ascending=False)
                 st.dataframe(red_ocean, use_container_width=True)
                 
                 status.update(label="분석 완료", state="complete")
@@ -139,7 +223,7 @@ elif mode == "모드 C: 니치 마켓 헌터":
     seed = st.text_input("분야/주제 입력", value="미국 주식")
     
     if st.button("니치 마켓 발굴 시작"):
-        fetcher = RealDataFetcher()
+        fetcher = synthetic or RealDataFetcher()
         with st.status("발굴 진행 중...", expanded=True) as status:
             st.write("📡 연관 검색어 수집 중...")
             related = fetcher.get_related_keywords(seed)
@@ -152,28 +236,13 @@ elif mode == "모드 C: 니치 마켓 헌터":
                 # Limit to 100 for web demo speed
                 target_list = related[:100] 
                 
-                results = []
-                progress_bar = st.progress(0)
-                
-                for i, item in enumerate(target_list):
-                    kw = item['keyword']
-                    vol = item['volume']
-                    
-                    docs = fetcher.get_doc_count(kw)
-                    sk = calculate_saturation(docs, vol)
-                    ek = calculate_efficiency(sk, vol)
-                    
-                    results.append({
-                        "Keyword": kw,
-                        "Monthly_Search_Volume": vol,
-                        "Total_Docs": docs,
-                        "Saturation_Index": sk,
-                        "Efficiency_Score": ek
-                    })
-                    progress_bar.progress((i + 1) / len(target_list))
+                # 문서 수 None = API 실패 (0으로 채우지 않고 건너뜀)
+                records = collect_records(lambda: target_list, None, st.progress(0),
+                                          fetch=lambda item: fetch_docs(fetcher, item['keyword'], item['volume']))
                     
-                if results:
-                    df = pd.DataFrame(results)
+                if records:
+                    st.session_state["last_records"] = records
+                    df = records.to_pandas(columns=['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score'])
                     
                     col1, col2 = st.columns(2)
                     
@@ -182,8 +251,8 @@ elif mode == "모드 C: 니치 마켓 헌터":
                         st.dataframe(df.sort_values(by='Monthly_Search_Volume', ascending=False).head(20), use_container_width=True)
                         
                     with col2:
-                        st.subheader("💎 숨겨진 블루오션 ($S_k < 1.0$)")
-                        blue_ocean = df[df['Saturation_Index'] < 1.0].sort_values(by='Efficiency_Score', ascending=False)
+                        st.subheader(f"💎 숨겨진 블루오션 ($S_k < {BLUE_OCEAN_SK}$)")
+                        blue_ocean = df[df['Saturation_Index'] < BLUE_OCEAN_SK].sort_values(by='Efficiency_Score', ascending=False)
                         st.dataframe(blue_ocean, use_container_width=True)
                     
                     csv = df.to_csv(index=False).encode('utf-8-sig')
@@ -191,6 +260,49 @@ elif mode == "모드 C: 니치 마켓 헌터":
                     
                 status.update(label="발굴 완료", state="complete")
 
+elif mode == "모드 D: 시나리오 분석":
+    st.header("🧪 시나리오 분석 (What-if)")
+    st.info("이미 수집한 데이터로 전환율/임계값 시나리오별 블루오션 순위 변화를 비교합니다. (API 호출 없음)")
+
+    uploaded = st.file_uploader("리포트 파일 (CSV / JSONL)", type=["csv", "jsonl"], accept_multiple_files=True)
+    if uploaded:
+        records = load_records(uploaded)
+    else:
+        records = st.session_state.get("last_records")
+        if records:
+            st.caption(f"직전 분석 결과 {len(records)}개 키워드 사용")
+
+    rates_text = st.text_input("기본 전환율 (쉼표 구분)", value="0.02, 0.05, 0.1")
+    category_text = st.text_input("카테고리별 전환율 (예: 주식=0.03,0.08; 맛집=0.1)", value="")
+    thresholds = st.multiselect("블루오션 임계값 ($S_k$)", [0.5, BLUE_OCEAN_SK, 2.0, RED_OCEAN_SK], default=[BLUE_OCEAN_SK, RED_OCEAN_SK])
+    top_k = st.slider("Top-K", 5, 100, 20)
+
+    if not records:
+        st.warning("먼저 모드 A~C로 분석하거나 리포트 파일을 업로드해주세요.")
+    elif not thresholds:
+        st.warning("임계값을 하나 이상 선택해주세요.")
+    else:
+        try:
+            scenarios = rate_scenarios(parse_rates(rates_text), parse_category_rates([category_text]))
+        except ValueError:
+            st.error("전환율 형식을 확인해주세요. (예: 0.02, 0.05)")
+            st.stop()
+        thresholds = sorted(thresholds)
+        grid = ScenarioGrid(records, scenarios, thresholds)
+        st.write(f"{len(records)}개 키워드 × {len(scenarios)}개 전환율 시나리오 × {len(thresholds)}개 임계값 "
+                 f"(카테고리: {', '.join(grid.category_names)})")
+
+        st.subheader("📊 시나리오 요약")
+        st.dataframe(pd.DataFrame(grid.summary(k=top_k)), use_container_width=True)
+
+        st.subheader("🏆 시나리오별 순위")
+        col1, col2 = st.columns(2)
+        with col1:
+            s = st.selectbox("시나리오", range(len(scenarios)), format_func=lambda i: scenarios[i][0])
+        with col2:
+            t = st.selectbox("임계값", range(len(thresholds)), format_func=lambda i: f"S_k < {thresholds[i]:g}")
+        st.dataframe(pd.DataFrame(grid.ranking(s, t, top_k)), use_container_width=True)
+
 # Footer
 st.markdown("---")
 st.markdown("© 2026 Naver Search Ecology Architect | Powered by Streamlit")
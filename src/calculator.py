@@ -1,5 +1,16 @@
-import pandas as pd
 import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# 판정 기준 (리포트, 필터, 앱, 시나리오 분석이 공유)
+BLUE_OCEAN_SK = 1.0      # Sk < 1.0: 블루오션
+RED_OCEAN_SK = 5.0       # Sk >= 5.0: 레드오션 (filter_keywords에서 제거)
+DEFAULT_CONVERSION_RATE = 0.05
+# 이 검색량 미만은 통계적으로 무의미하여 Sk, Ek 모두 0으로 처리
+MIN_SEARCH_VOLUME = 50
 
 def calculate_saturation(doc_count: int, search_volume: int) -> float:
     """
@@ -11,7 +22,7 @@ def calculate_saturation(doc_count: int, search_volume: int) -> float:
     2. Smoothing: If Search Volume is 0, return 999.0 (High Saturation/Error).
     """
     # 1. Volume Cut-off
-    if search_volume < 50:
+    if search_volume < MIN_SEARCH_VOLUME:
         return 0.0
         
     # 2. Prevent Division by Zero
@@ -20,7 +31,7 @@ def calculate_saturation(doc_count: int, search_volume: int) -> float:
         
     return doc_count / search_volume
 
-def calculate_efficiency(saturation: float, search_volume: int, conversion_rate: float = 0.05) -> float:
+def calculate_efficiency(saturation: float, search_volume: int, conversion_rate: float = DEFAULT_CONVERSION_RATE) -> float:
     """
     Calculates the Efficiency Score (Ek).
     Formula: Ek = (Conversion Rate / (Sk + 1.0)) * log10(Search Vol)
@@ -31,7 +42,7 @@ def calculate_efficiency(saturation: float, search_volume: int, conversion_rate:
     3. Log Safety: Uses math.log10(max(search_volume, 1)).
     """
     # 1. Volume Cut-off
-    if search_volume < 50:
+    if search_volume < MIN_SEARCH_VOLUME:
         return 0.0
         
     # 3. Log Safety & Formula Application
@@ -43,7 +54,7 @@ def calculate_efficiency(saturation: float, search_volume: int, conversion_rate:
     except Exception:
         return 0.0
 
-def filter_keywords(df: pd.DataFrame) -> pd.DataFrame:
+def filter_keywords(df: "pd.DataFrame") -> "pd.DataFrame":
     """
     Filters out keywords where Sk >= 5.0.
     Also handles the case where Sk is 0.0 due to low volume (optional, but strictly kept < 5.0 per user rule).
@@ -62,6 +73,27 @@ def filter_keywords(df: pd.DataFrame) -> pd.DataFrame:
     # Filter: Keep only where Sk < 5.0
     # Note: If Sk == 0.0 (Low Volume), it passes this filter.
     # Users should sort by Efficiency to push 0.0 scores to the bottom.
-    filtered_df = df[df[target_col] < 5.0].copy()
+    filtered_df = df[df[target_col] < RED_OCEAN_SK].copy()
     
     return filtered_df
+
+def saturation_array(doc_counts: "np.ndarray", search_volumes: "np.ndarray") -> "np.ndarray":
+    """Vectorized calculate_saturation (same cut-off) for whole columns."""
+    import numpy as np
+
+    volumes = np.asarray(search_volumes, dtype=np.float64)
+    docs = np.asarray(doc_counts, dtype=np.float64)
+    return np.where(volumes < MIN_SEARCH_VOLUME, 0.0, docs / np.maximum(volumes, 1.0))
+
+def efficiency_array(saturation: "np.ndarray", search_volumes: "np.ndarray",
+                     conversion_rate: "np.ndarray | float" = DEFAULT_CONVERSION_RATE) -> "np.ndarray":
+    """
+    Vectorized calculate_efficiency. `conversion_rate` broadcasts, so a (scenarios, 1) or
+    (scenarios, keywords) array scores every scenario in one pass.
+    """
+    import numpy as np
+
+    volumes = np.asarray(search_volumes, dtype=np.float64)
+    base = np.log10(np.maximum(volumes, 1.0)) / (np.asarray(saturation, dtype=np.float64) + 1.0)
+    base = np.where(volumes < MIN_SEARCH_VOLUME, 0.0, base)
+    return np.asarray(conversion_rate, dtype=np.float64) * base
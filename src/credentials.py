@@ -0,0 +1,205 @@
+import hashlib
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Mapping, Optional
+
+# 키 세트 하나가 가진 필드 (검색 API / 검색광고 API)
+SEARCH_FIELDS = ("NAVER_CLIENT_ID", "NAVER_CLIENT_SECRET")
+AD_FIELDS = ("NAVER_AD_API_KEY", "NAVER_AD_SECRET_KEY", "NAVER_CUSTOMER_ID")
+
+# 네이버 검색 API 기본 일일 한도 (애플리케이션당 25,000회)
+DEFAULT_DAILY_QUOTA = {"search": 25000, "ad": None}
+
+# 429 이후 키를 쉬게 하는 시간(초). 연속으로 받으면 두 배씩 늘어남.
+THROTTLE_COOLDOWN = 1.0
+MAX_COOLDOWN = 60.0
+
+
+class NoCredentialAvailable(Exception):
+    """Every credential of the pool is ejected (auth error, quota exhausted or cooling down)."""
+
+
+class TokenBucket:
+    """Simple token bucket. `rate` tokens/sec, bursts up to `capacity`. rate=None means unlimited."""
+
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * (self.rate or 0))
+        self._updated = now
+
+    def wait_time(self) -> float:
+        if self.rate is None:
+            return 0.0
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        if self.rate is None:
+            return
+        self._refill()
+        self._tokens -= 1
+
+
+class Credential:
+    """One API key set for one API kind ('search' or 'ad'), with its own limiter and quota counters."""
+
+    def __init__(self, name: str, kind: str, fields: Dict[str, str], rate: Optional[float], daily_quota: Optional[int]):
+        self.name = name
+        self.kind = kind
+        self.fields = fields
+        self.limiter = TokenBucket(rate)
+        self.daily_quota = daily_quota
+        self.used_today = 0
+        self.in_flight = 0
+        self.errors = 0
+        self.ejected_reason: Optional[str] = None
+        self.ejected_until = 0.0  # monotonic; inf = 영구 제외
+        self._cooldown = THROTTLE_COOLDOWN
+        self._day = date.today()
+
+    def __getitem__(self, key: str) -> str:
+        return self.fields[key]
+
+    def _roll_day(self) -> None:
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+            if self.ejected_reason == "quota":
+                self.ejected_reason, self.ejected_until = None, 0.0
+
+    def healthy(self) -> bool:
+        self._roll_day()
+        if self.ejected_reason and time.monotonic() >= self.ejected_until:
+            self.ejected_reason = None
+        return self.ejected_reason is None
+
+    def load(self) -> float:
+        """Lower is better: requests in flight, then share of the daily quota already used."""
+        quota_share = self.used_today / self.daily_quota if self.daily_quota else 0.0
+        return self.in_flight + quota_share
+
+    def eject(self, reason: str, seconds: float) -> None:
+        self.ejected_reason = reason
+        self.ejected_until = time.monotonic() + seconds
+
+
+class CredentialPool:
+    """
+    Spreads requests over several key sets of the same API kind.
+    - acquire(): picks the least-loaded healthy key whose rate limiter has a token (waits if all are busy).
+    - release(): updates counters from the response status;
+      401/403 eject the key permanently, 429 ejects it for a growing cool-down
+      (acquire waits for it if no other key is usable), and a key whose daily quota
+      is used up is ejected until the next day.
+    """
+
+    def __init__(self, kind: str, credentials: List[Credential]):
+        self.kind = kind
+        self.credentials = credentials
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def acquire(self, timeout: float = 60.0) -> Credential:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                healthy = [c for c in self.credentials if c.healthy()]
+                if healthy:
+                    ready = [c for c in healthy if c.limiter.wait_time() == 0.0]
+                    if ready:
+                        cred = min(ready, key=Credential.load)
+                        cred.limiter.take()
+                        cred.in_flight += 1
+                        cred.used_today += 1
+                        return cred
+                    wait = min(c.limiter.wait_time() for c in healthy)
+                else:
+                    # 429로 잠시 쉬는 키만 남았다면 가장 먼저 풀리는 키를 기다림. 인증/쿼터 제외는 기다려도 소용없음.
+                    cooling = [c for c in self.credentials if c.ejected_reason == "throttled"]
+                    if not cooling:
+                        reasons = ", ".join(f"{c.name}={c.ejected_reason}" for c in self.credentials)
+                        raise NoCredentialAvailable(f"No usable {self.kind} credential ({reasons or 'none configured'})")
+                    wait = min(c.ejected_until for c in cooling) - time.monotonic()
+            wait = max(wait, 0.0)
+            if time.monotonic() + wait > deadline:
+                raise NoCredentialAvailable(f"Timed out waiting for a {self.kind} credential")
+            time.sleep(wait)
+
+    def release(self, cred: Credential, status_code: Optional[int]) -> None:
+        with self._lock:
+            cred.in_flight = max(0, cred.in_flight - 1)
+            if status_code in (401, 403):
+                cred.errors += 1
+                cred.eject("auth", float("inf"))
+            elif status_code == 429:
+                cred.errors += 1
+                cred.eject("throttled", cred._cooldown)
+                cred._cooldown = min(cred._cooldown * 2, MAX_COOLDOWN)
+            elif status_code is not None and status_code < 400:
+                cred._cooldown = THROTTLE_COOLDOWN
+            if cred.daily_quota and cred.used_today >= cred.daily_quota and cred.ejected_reason is None:
+                cred.eject("quota", 24 * 3600)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{
+                "name": c.name,
+                "healthy": c.healthy(),
+                "ejected_reason": c.ejected_reason,
+                "used_today": c.used_today,
+                "daily_quota": c.daily_quota,
+                "in_flight": c.in_flight,
+                "errors": c.errors,
+            } for c in self.credentials]
+
+
+def credential_sets(secrets: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Normalizes secrets into a list of key sets.
+    Supports the legacy single-set layout (top-level NAVER_* keys) and
+    a `NAVER_CREDENTIALS` list of sets; both may be combined.
+    """
+    sets: List[Dict[str, Any]] = []
+    if any(secrets.get(k) for k in SEARCH_FIELDS + AD_FIELDS):
+        sets.append({k: secrets.get(k) for k in SEARCH_FIELDS + AD_FIELDS if secrets.get(k)})
+    for entry in secrets.get("NAVER_CREDENTIALS", []) or []:
+        sets.append(dict(entry))
+    return sets
+
+
+def build_pool(kind: str, sets: List[Dict[str, Any]], default_rate: Optional[float]) -> CredentialPool:
+    fields = SEARCH_FIELDS if kind == "search" else AD_FIELDS
+    creds = []
+    for i, entry in enumerate(sets):
+        if not all(entry.get(f) for f in fields):
+            continue  # 이 세트에는 해당 API 키가 없음
+        rate = entry.get("RATE_PER_SEC", default_rate)
+        quota = entry.get("DAILY_QUOTA", DEFAULT_DAILY_QUOTA[kind]) if kind == "search" else entry.get("AD_DAILY_QUOTA")
+        name = entry.get("NAME") or f"{kind}-{i + 1}"
+        creds.append(Credential(name, kind, {f: entry[f] for f in fields}, rate, quota))
+    return CredentialPool(kind, creds)
+
+
+# 프로세스 내 공유 풀: fetch_keyword_data가 호출마다 RealDataFetcher를 새로 만들어도 같은 한도/카운터를 사용
+_SHARED_POOLS: Dict[str, CredentialPool] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_pool(kind: str, sets: List[Dict[str, Any]], default_rate: Optional[float]) -> CredentialPool:
+    fields = SEARCH_FIELDS if kind == "search" else AD_FIELDS
+    fingerprint = hashlib.sha1(repr([[s.get(f) for f in fields] for s in sets]).encode("utf-8")).hexdigest()
+    key = f"{kind}:{fingerprint}"
+    with _SHARED_LOCK:
+        if key not in _SHARED_POOLS:
+            _SHARED_POOLS[key] = build_pool(kind, sets, default_rate)
+        return _SHARED_POOLS[key]
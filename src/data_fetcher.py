@@ -2,43 +2,93 @@ import hashlib
 import hmac
 import base64
 import time
-import urllib.request
-import urllib.parse
 import json
 import os
-import requests
-from typing import Dict, Any, Optional, List
+import sys
+from typing import TYPE_CHECKING, Callable, Dict, Any, Optional, List
+
+if TYPE_CHECKING:
+    import requests
+    from doc_estimator import DocCountEstimator
+
+try:
+    from metrics import REGISTRY, classify_outcome
+    from resilience import CircuitOpenError, RetryPolicy, breaker_for, hedged_call
+    from credentials import Credential, CredentialPool, NoCredentialAvailable, credential_sets, shared_pool
+    from serp_features import SERP_DISPLAY, SERP_ITEMS, slim_items
+except ImportError:
+    from src.metrics import REGISTRY, classify_outcome
+    from src.resilience import CircuitOpenError, RetryPolicy, breaker_for, hedged_call
+    from src.credentials import Credential, CredentialPool, NoCredentialAvailable, credential_sets, shared_pool
+    from src.serp_features import SERP_DISPLAY, SERP_ITEMS, slim_items
+
+# Search API 키 하나당 호출 간 최소 간격(초) → 키별 기본 속도 제한 (1 / 간격 회/초).
+# 벤치마크/로컬 스텁에서는 NAVER_REQUEST_INTERVAL=0 으로 끌 수 있습니다.
+REQUEST_INTERVAL = float(os.environ.get("NAVER_REQUEST_INTERVAL", "0.1"))
+
+# (connect, read) 타임아웃(초). 응답 없는 소켓 하나가 직렬 루프 전체를 멈추지 않도록 모든 호출에 적용합니다.
+REQUEST_TIMEOUT = (3.05, float(os.environ.get("NAVER_READ_TIMEOUT", "10")))
+# 재시도 횟수(첫 시도 포함)
+MAX_ATTEMPTS = int(os.environ.get("NAVER_MAX_ATTEMPTS", "3"))
+# 설정 시, 이 시간(초) 안에 응답이 없으면 같은 요청을 한 번 더 보내 먼저 온 응답을 사용 (hedged request)
+HEDGE_AFTER = float(os.environ["NAVER_HEDGE_AFTER"]) if os.environ.get("NAVER_HEDGE_AFTER") else None
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+def _default_rate(kind: str) -> Optional[float]:
+    if kind == "search" and REQUEST_INTERVAL > 0:
+        return 1.0 / REQUEST_INTERVAL
+    return None
 
 class RealDataFetcher:
-    def __init__(self):
+    def __init__(self, timeout=REQUEST_TIMEOUT, retry_policy: Optional[RetryPolicy] = None,
+                 hedge_after: Optional[float] = HEDGE_AFTER):
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=MAX_ATTEMPTS)
+        self.hedge_after = hedge_after
+
         self.secrets = self._load_secrets()
+
+        # 키 세트 풀: secrets의 단일 키 + NAVER_CREDENTIALS 목록. 키마다 속도 제한/쿼터를 따로 관리합니다.
+        sets = credential_sets(self.secrets)
+        self.search_pool: CredentialPool = shared_pool("search", sets, _default_rate("search"))
+        self.ad_pool: CredentialPool = shared_pool("ad", sets, _default_rate("ad"))
+
         self.ad_api_key = self.secrets.get("NAVER_AD_API_KEY")
         self.ad_secret_key = self.secrets.get("NAVER_AD_SECRET_KEY")
         self.customer_id = self.secrets.get("NAVER_CUSTOMER_ID")
         self.client_id = self.secrets.get("NAVER_CLIENT_ID")
         self.client_secret = self.secrets.get("NAVER_CLIENT_SECRET")
         
-        self.ad_base_url = "https://api.naver.com"
-        self.search_base_url = "https://openapi.naver.com/v1/search/blog.json"
+        # 기본값은 실제 네이버 API. 로컬 스텁(benchmarks/naver_stub.py)을 쓸 때는 환경변수로 교체합니다.
+        self.ad_base_url = os.environ.get("NAVER_AD_BASE_URL", "https://api.naver.com")
+        self.search_base_url = os.environ.get("NAVER_SEARCH_BASE_URL", "https://openapi.naver.com/v1/search/blog.json")
 
     def _load_secrets(self) -> Dict[str, str]:
         """
         Hybrid Auth:
-        1. Try loading from Streamlit secrets (Cloud).
+        1. Try loading from Streamlit secrets (Cloud) - only when running inside the app.
         2. Fallback to local secrets.json (Local).
+           NAVER_SECRETS_PATH env var, if set, is checked first.
         """
         # 1. Try Streamlit Secrets
-        try:
-            import streamlit as st
-            if hasattr(st, "secrets") and "NAVER_AD_API_KEY" in st.secrets:
-                return st.secrets
-        except ImportError:
-            pass
-        except Exception:
-            pass
+        # CLI 실행에서는 streamlit을 import하지 않습니다 (콜드 스타트의 대부분을 차지).
+        # app.py가 이미 streamlit을 로드한 경우에만 st.secrets를 확인합니다.
+        if "streamlit" in sys.modules:
+            try:
+                import streamlit as st
+                if hasattr(st, "secrets") and "NAVER_AD_API_KEY" in st.secrets:
+                    return st.secrets
+            except ImportError:
+                pass
+            except Exception:
+                pass
 
         # 2. Fallback to Local secrets.json
         paths = ["secrets.json", "../secrets.json", os.path.join(os.path.dirname(__file__), "../secrets.json")]
+        if os.environ.get("NAVER_SECRETS_PATH"):
+            paths.insert(0, os.environ["NAVER_SECRETS_PATH"])
         for p in paths:
             if os.path.exists(p):
                 with open(p, "r", encoding="utf-8") as f:
@@ -46,45 +96,152 @@ class RealDataFetcher:
         
         raise FileNotFoundError("Authentication Failed: 'secrets.json' not found locally, and Streamlit secrets not available.")
 
-    def _generate_signature(self, timestamp: str, method: str, uri: str) -> str:
+    def _generate_signature(self, timestamp: str, method: str, uri: str, secret_key: Optional[str] = None) -> str:
         """Generates HMAC-SHA256 signature for Naver Ad API."""
         message = f"{timestamp}.{method}.{uri}"
         hash = hmac.new(
-            self.ad_secret_key.encode("utf-8"),
+            (secret_key or self.ad_secret_key).encode("utf-8"),
             message.encode("utf-8"),
             hashlib.sha256
         )
         hash.hexdigest()
         return base64.b64encode(hash.digest()).decode("utf-8")
 
-    def _get_header(self, method: str, uri: str) -> Dict[str, str]:
-        """Returns headers for Naver Ad API."""
+    def _get_header(self, method: str, uri: str, cred: Optional[Credential] = None) -> Dict[str, str]:
+        """Returns headers for Naver Ad API (signed with `cred`, or the primary key set)."""
         timestamp = str(round(time.time() * 1000))
-        signature = self._generate_signature(timestamp, method, uri)
+        if cred is not None:
+            api_key, secret_key, customer_id = cred["NAVER_AD_API_KEY"], cred["NAVER_AD_SECRET_KEY"], cred["NAVER_CUSTOMER_ID"]
+        else:
+            api_key, secret_key, customer_id = self.ad_api_key, self.ad_secret_key, self.customer_id
+        signature = self._generate_signature(timestamp, method, uri, secret_key)
         return {
             "Content-Type": "application/json; charset=UTF-8",
             "X-Timestamp": timestamp,
-            "X-API-KEY": self.ad_api_key,
-            "X-Customer": self.customer_id,
+            "X-API-KEY": api_key,
+            "X-Customer": str(customer_id),
             "X-Signature": signature,
         }
 
-    def get_search_volume(self, keyword: str) -> int:
+    @staticmethod
+    def _search_header(cred: Credential) -> Dict[str, str]:
+        return {
+            "X-Naver-Client-Id": cred["NAVER_CLIENT_ID"],
+            "X-Naver-Client-Secret": cred["NAVER_CLIENT_SECRET"]
+        }
+
+    def _send(self, endpoint: str, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> "requests.Response":
+        """
+        One HTTP round trip with a timeout. Records latency, status class and response size per endpoint.
+        Exceptions are re-raised after being recorded.
+        """
+        import requests  # lazy: 실제 API 호출 경로에서만 로드
+
+        started = time.perf_counter()
+        try:
+            response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+        except Exception:
+            REGISTRY.observe_request(endpoint, time.perf_counter() - started)
+            raise
+        REGISTRY.observe_request(endpoint, time.perf_counter() - started, response.status_code, len(response.content))
+        return response
+
+    def _get(self, endpoint: str, url: str, params: Dict[str, Any], pool: CredentialPool,
+             headers_for: Callable[[Credential], Dict[str, str]]) -> "requests.Response":
+        """
+        GET with timeout, bounded retries (jittered exponential backoff) and a per-endpoint circuit breaker.
+        - Each attempt takes the least-loaded healthy key from `pool` (waiting on its rate limiter)
+          and builds fresh headers with `headers_for(cred)`, so signed Ad API headers get a new timestamp.
+        - Retries connection errors/timeouts, 429 and 5xx. Other responses are returned as-is.
+          401/403/429 eject the key from the pool, so the retry goes to another key.
+        - If retries run out on 429/5xx, the last response is returned so the caller can classify it.
+        - With `hedge_after`, each attempt is hedged (duplicate request if the first one is slow);
+          every copy takes and releases its own key, so duplicates are rate-limited and counted too.
+        - Every attempt that passes the breaker settles it: success/failure, or abandon() when the
+          outcome says nothing about the endpoint (429, no usable key), so a half-open trial never hangs.
+        Raises CircuitOpenError when the endpoint's breaker is open, NoCredentialAvailable when
+        every key is ejected, or the last exception.
+        """
+        breaker = breaker_for(endpoint)
+        last_error: Optional[BaseException] = None
+        response = None
+
+        def send() -> "requests.Response":
+            cred = pool.acquire()
+            try:
+                sent = self._send(endpoint, url, params, headers_for(cred))
+            except Exception:
+                pool.release(cred, None)
+                raise
+            pool.release(cred, sent.status_code)
+            return sent
+
+        for attempt, delay in enumerate(self.retry_policy.delays()):
+            if attempt:
+                REGISTRY.record_retry(endpoint)
+                time.sleep(delay)
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for '{endpoint}'")
+
+            settled = False
+            try:
+                try:
+                    response = hedged_call(send, self.hedge_after) if self.hedge_after else send()
+                except NoCredentialAvailable:
+                    raise
+                except Exception as e:
+                    breaker.record_failure()
+                    settled = True
+                    last_error = e
+                    continue
+
+                if response.status_code == 429:
+                    # 키 단위 한도 문제: 풀에서 해당 키만 제외하고 다른 키로 재시도 (브레이커는 건드리지 않음)
+                    continue
+                if _is_retryable_status(response.status_code):
+                    breaker.record_failure()
+                    settled = True
+                    continue
+
+                breaker.record_success()
+                settled = True
+                return response
+            finally:
+                if not settled:
+                    breaker.abandon()
+
+        if response is not None:
+            return response
+        raise last_error
+
+    def get_search_volume(self, keyword: str) -> Optional[int]:
         """
         Fetches monthly search volume (PC+Mobile) using Naver Ad API (RelKwdStat).
+        Returns 0 when the API answers with no data, and None when the call failed
+        (after retries) so that an error is never mistaken for a real zero.
+        """
+        stats = self.get_keyword_stats(keyword)
+        return None if stats is None else stats["volume"]
+
+    def get_keyword_stats(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """
+        Same call as get_search_volume, also keeping the Ad API competition level.
+        Returns {'volume': int, 'comp': str or None}, or None when the call failed.
         """
         uri = "/keywordstool"
         method = "GET"
         params = {"hintKeywords": keyword.replace(" ", ""), "showDetail": 1}
+        response = None
         
         try:
-            headers = self._get_header(method, uri)
-            response = requests.get(f"{self.ad_base_url}{uri}", params=params, headers=headers)
+            headers_for = lambda cred: self._get_header(method, uri, cred)
+            response = self._get("search_volume", f"{self.ad_base_url}{uri}", params, self.ad_pool, headers_for)
             response.raise_for_status()
             
             data = response.json()
             if not data.get("keywordList"):
-                return 0
+                REGISTRY.record_outcome("search_volume", "zero")
+                return {"volume": 0, "comp": None}
                 
             for item in data["keywordList"]:
                 if item["relKeyword"].replace(" ", "") == keyword.replace(" ", ""):
@@ -94,7 +251,8 @@ class RealDataFetcher:
                     if isinstance(pc_qc, str) and "<" in pc_qc: pc_qc = 10
                     if isinstance(mo_qc, str) and "<" in mo_qc: mo_qc = 10
                     
-                    return int(pc_qc) + int(mo_qc)
+                    REGISTRY.record_outcome("search_volume", "ok")
+                    return {"volume": int(pc_qc) + int(mo_qc), "comp": item.get("compIdx")}
             
             # Fallback to first item
             if data["keywordList"]:
@@ -103,43 +261,67 @@ class RealDataFetcher:
                  mo_qc = item["monthlyMobileQcCnt"]
                  if isinstance(pc_qc, str) and "<" in pc_qc: pc_qc = 10
                  if isinstance(mo_qc, str) and "<" in mo_qc: mo_qc = 10
-                 return int(pc_qc) + int(mo_qc)
+                 REGISTRY.record_outcome("search_volume", "ok")
+                 return {"volume": int(pc_qc) + int(mo_qc), "comp": item.get("compIdx")}
             
-            return 0
+            REGISTRY.record_outcome("search_volume", "zero")
+            return {"volume": 0, "comp": None}
             
+        except CircuitOpenError:
+            REGISTRY.record_outcome("search_volume", "circuit_open")
+            return None
+        except NoCredentialAvailable:
+            REGISTRY.record_outcome("search_volume", "no_credential")
+            return None
         except Exception as e:
             # print(f"Ad API Error: {e}")
-            return 0
+            REGISTRY.record_outcome("search_volume", classify_outcome(response.status_code if response is not None and not response.ok else None))
+            return None
 
-    def get_doc_count(self, keyword: str) -> int:
+    def get_doc_count(self, keyword: str) -> Optional[int]:
         """
         Fetches total blog document count using Naver Search API.
+        Returns None when the call failed (after retries): a failed call must not
+        become 0 docs, which would look like a perfect blue ocean (Sk = 0).
         """
-        headers = {
-            "X-Naver-Client-Id": self.client_id,
-            "X-Naver-Client-Secret": self.client_secret
-        }
-        params = {"query": keyword, "display": 1}
+        serp = self.get_serp(keyword)
+        return None if serp is None else serp["total"]
+
+    def get_serp(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """
+        Same single Search API call as get_doc_count, also keeping the top SERP_DISPLAY results:
+        {'total': int, 'items': [(postdate, blogger, normalized title), ...]} or None on failure.
+        """
+        params = {"query": keyword, "display": SERP_DISPLAY}
         
         try:
-            # Short sleep to prevent rate limiting, though app might need more robust handling
-            time.sleep(0.1) 
-            response = requests.get(self.search_base_url, headers=headers, params=params)
+            # 속도 제한은 키별 토큰 버킷이 담당 (고정 sleep 대신)
+            response = self._get("doc_count", self.search_base_url, params, self.search_pool, self._search_header)
             
             if response.status_code != 200:
-                return 0
+                REGISTRY.record_outcome("doc_count", classify_outcome(response.status_code))
+                return None
                 
             data = response.json()
-            return data.get("total", 0)
+            total = data.get("total", 0)
+            REGISTRY.record_outcome("doc_count", classify_outcome(response.status_code, empty=not total))
+            return {"total": total, "items": slim_items(data.get("items") or [])}
             
+        except CircuitOpenError:
+            REGISTRY.record_outcome("doc_count", "circuit_open")
+            return None
+        except NoCredentialAvailable:
+            REGISTRY.record_outcome("doc_count", "no_credential")
+            return None
         except Exception as e:
             # print(f"Search API Error: {e}")
-            return 0
+            REGISTRY.record_outcome("doc_count", "exception")
+            return None
 
     def get_related_keywords(self, seed_keyword: str) -> List[Dict[str, Any]]:
         """
         Fetches related keywords from Naver Ad API based on seed.
-        Returns list of dicts: {'keyword': str, 'volume': int}
+        Returns list of dicts: {'keyword': str, 'volume': int, 'comp': compIdx (낮음/중간/높음)}
         Filters out low volume keywords (< 100).
         """
         uri = "/keywordstool"
@@ -149,15 +331,17 @@ class RealDataFetcher:
         related_list = []
         
         try:
-            headers = self._get_header(method, uri)
-            response = requests.get(f"{self.ad_base_url}{uri}", params=params, headers=headers)
+            headers_for = lambda cred: self._get_header(method, uri, cred)
+            response = self._get("related_keywords", f"{self.ad_base_url}{uri}", params, self.ad_pool, headers_for)
             # response.raise_for_status() # Optional: Ad API sometimes returns errors if busy
             
             if response.status_code != 200:
+                 REGISTRY.record_outcome("related_keywords", classify_outcome(response.status_code))
                  return []
             
             data = response.json()
             if not data.get("keywordList"):
+                REGISTRY.record_outcome("related_keywords", "zero")
                 return []
                 
             for item in data["keywordList"]:
@@ -175,32 +359,77 @@ class RealDataFetcher:
                 if total_vol >= 100:
                     related_list.append({
                         "keyword": kw,
-                        "volume": total_vol
+                        "volume": total_vol,
+                        "comp": item.get("compIdx")
                     })
             
+            REGISTRY.record_outcome("related_keywords", classify_outcome(response.status_code, empty=not related_list))
             return related_list
 
+        except CircuitOpenError as e:
+            print(f"Related Keyword Error: {e}")
+            REGISTRY.record_outcome("related_keywords", "circuit_open")
+            return []
+        except NoCredentialAvailable as e:
+            print(f"Related Keyword Error: {e}")
+            REGISTRY.record_outcome("related_keywords", "no_credential")
+            return []
         except Exception as e:
             print(f"Related Keyword Error: {e}")
+            REGISTRY.record_outcome("related_keywords", "exception")
             return []
 
-def fetch_keyword_data(keyword: str) -> Dict[str, Any]:
+def fetch_keyword_data(keyword: str, estimator: Optional["DocCountEstimator"] = None,
+                       fetcher: Optional[Any] = None) -> Optional[Dict[str, Any]]:
     """
     Main entry point used by main.py.
-    Loads secrets internally.
-    Returns dictionary with Capitalized keys matching main.py expectations.
+    Loads secrets internally, unless a `fetcher` with the same interface is given
+    (e.g. SyntheticDataFetcher for load tests).
+    Returns dictionary with Capitalized keys matching main.py expectations,
+    or None if either API call failed (callers skip the keyword instead of scoring bad data).
+    With an `estimator` (approximate mode) the doc count may be estimated instead of fetched;
+    'Docs_Source' then tells which ('api' or 'estimate').
+    When the Search API was called, the top results ride along under SERP_ITEMS for
+    serp_features.score_rows, which also fills 'SmartBlock_Type'.
     """
     try:
-        fetcher = RealDataFetcher()
-        sv = fetcher.get_search_volume(keyword)
-        docs = fetcher.get_doc_count(keyword)
+        fetcher = fetcher or RealDataFetcher()
+        serp: Dict[str, Any] = {}
+
+        def fetch_docs(kw: str) -> Optional[int]:
+            result = fetcher.get_serp(kw)
+            if result is None:
+                return None
+            serp.update(result)
+            return result["total"]
+
+        if estimator is None:
+            sv = fetcher.get_search_volume(keyword)
+            if sv is None:
+                return None
+            docs = fetch_docs(keyword)
+            if docs is None:
+                return None
+        else:
+            stats = fetcher.get_keyword_stats(keyword)
+            if stats is None:
+                return None
+            sv = stats["volume"]
+            resolved = estimator.resolve(keyword, sv, stats["comp"], fetch_docs)
+            if resolved is None:
+                return None
+            docs, source = resolved
         
-        return {
+        row = {
             "Keyword": keyword,
             "Monthly_Search_Volume": sv,
             "Total_Docs": docs,
-            "SmartBlock_Type": "Real Analysis Required" 
         }
+        if serp:
+            row[SERP_ITEMS] = serp["items"]
+        if estimator is not None:
+            row["Docs_Source"] = source
+        return row
     except Exception as e:
         print(f"Fetcher Init Error: {e}")
         return None
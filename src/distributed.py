@@ -0,0 +1,323 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from pipeline import Pipeline
+except ImportError:
+    from src.pipeline import Pipeline
+
+if TYPE_CHECKING:
+    import sqlite3
+
+DEFAULT_STORE = "reports/crawl.sqlite"
+DEFAULT_SHARDS = 16
+DEFAULT_LEASE_SECONDS = 120.0
+ROLES = ("local", "coordinator", "worker", "merge")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    seed TEXT,
+    num_shards INTEGER NOT NULL,
+    created REAL NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS shards (
+    job_id TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    leases INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, shard)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    volume INTEGER,
+    comp TEXT,
+    shard INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    row TEXT,
+    worker TEXT,
+    PRIMARY KEY (job_id, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_shard ON tasks (job_id, shard, state);
+"""
+
+
+def normalize_keyword(keyword: str) -> str:
+    """NFKC + casefold + single spaces, so '강남역  맛집' and '강남역 맛집' become one task."""
+    return " ".join(unicodedata.normalize("NFKC", keyword).casefold().split())
+
+
+def shard_of(key: str, num_shards: int) -> int:
+    """Stable across processes and machines (the built-in hash() is salted per process)."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def default_worker_id() -> str:
+    import socket
+
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseStore:
+    """
+    Shared work queue for coordinator/worker runs, backed by SQLite.
+    - Keywords are deduplicated by normalized key and grouped into shards by hash.
+    - A worker leases a whole shard for `lease_seconds`; every pushed batch renews the lease.
+      A shard whose lease expired (worker died or stalled) is handed to the next worker that asks.
+    - Scored rows are kept per keyword, so a reclaimed shard resumes where the last owner stopped.
+    SQLite locking is reliable for processes on one host; for several machines the file must live
+    on a filesystem with working POSIX locks (most NFS setups do not qualify).
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        import sqlite3  # lazy: 분산 모드에서만 필요 (CLI 콜드 스타트 단축)
+
+        self.path = path
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        if "comp" not in {col[1] for col in self._conn.execute("PRAGMA table_info(tasks)")}:
+            # comp 열 이전에 만든 저장소
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN comp TEXT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator["sqlite3.Connection"]:
+        # BEGIN IMMEDIATE takes the write lock up front: two workers can never lease the same shard
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # --- Coordinator ---
+    def create_job(self, kind: str, seed: Optional[str], tasks: Iterable[Tuple[str, Optional[int], Optional[str]]],
+                   num_shards: int = DEFAULT_SHARDS, meta: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Enqueues (keyword, volume, compIdx) tasks; volume and compIdx may be None when the worker has to fetch
+        them (compIdx is the Ad API competition level, a signal for approximate doc counts).
+        """
+        job_id = f"{kind}-{time.strftime('%Y%m%d_%H%M%S')}-{os.urandom(3).hex()}"
+        rows: Dict[str, Tuple] = {}
+        for keyword, volume, comp in tasks:
+            key = normalize_keyword(keyword)
+            if key and key not in rows:
+                rows[key] = (job_id, key, keyword, volume, comp, shard_of(key, num_shards))
+        with self._write() as db:
+            db.execute(
+                "INSERT INTO jobs (job_id, kind, seed, num_shards, created, meta) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, seed, num_shards, time.time(), json.dumps(meta or {}, ensure_ascii=False)),
+            )
+            db.executemany("INSERT INTO tasks (job_id, key, keyword, volume, comp, shard) VALUES (?, ?, ?, ?, ?, ?)",
+                           rows.values())
+            db.executemany("INSERT INTO shards (job_id, shard) VALUES (?, ?)",
+                           [(job_id, s) for s in sorted({r[5] for r in rows.values()})])
+        return job_id
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT job_id, kind, seed, num_shards, created, meta FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"job_id": row[0], "kind": row[1], "seed": row[2], "num_shards": row[3],
+                "created": row[4], "meta": json.loads(row[5])}
+
+    def latest_job(self, kind: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT job_id FROM jobs WHERE kind = ? ORDER BY created DESC LIMIT 1", (kind,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        counts = {"pending": 0, "done": 0, "failed": 0}
+        for state, n in self._conn.execute(
+            "SELECT state, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY state", (job_id,)
+        ):
+            counts[state] = n
+        shards_left, workers = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM shards WHERE job_id = ?1 AND done = 0),"
+            " (SELECT COUNT(DISTINCT worker) FROM tasks WHERE job_id = ?1 AND worker IS NOT NULL)",
+            (job_id,),
+        ).fetchone()
+        counts["shards_left"] = shards_left
+        counts["workers"] = workers
+        return counts
+
+    def is_finished(self, job_id: str) -> bool:
+        return self.progress(job_id)["shards_left"] == 0
+
+    def iter_results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """Streams scored rows (no full materialization)."""
+        for (row,) in self._conn.execute("SELECT row FROM tasks WHERE job_id = ? AND state = 'done'", (job_id,)):
+            yield json.loads(row)
+
+    # --- Worker ---
+    def lease_shard(self, job_id: str, worker_id: str) -> Optional[int]:
+        """Leases a free or expired shard; never-leased shards go first. None = nothing to lease right now."""
+        now = time.time()
+        with self._write() as db:
+            row = db.execute(
+                "SELECT shard FROM shards WHERE job_id = ? AND done = 0 AND (owner IS NULL OR lease_expires < ?)"
+                " ORDER BY leases, shard LIMIT 1",
+                (job_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE shards SET owner = ?, lease_expires = ?, leases = leases + 1 WHERE job_id = ? AND shard = ?",
+                (worker_id, now + self.lease_seconds, job_id, row[0]),
+            )
+            return row[0]
+
+    def pending_tasks(self, job_id: str, shard: int) -> List[Tuple[str, str, Optional[int], Optional[str]]]:
+        return self._conn.execute(
+            "SELECT key, keyword, volume, comp FROM tasks WHERE job_id = ? AND shard = ? AND state = 'pending'",
+            (job_id, shard),
+        ).fetchall()
+
+    def push_results(self, job_id: str, shard: int, worker_id: str,
+                     results: List[Tuple[str, Optional[Dict[str, Any]]]]) -> bool:
+        """
+        Stores a batch of (key, row) results (row None = API failure) and renews the lease.
+        Returns False without writing if the lease was lost to another worker.
+        """
+        with self._write() as db:
+            owner = db.execute("SELECT owner FROM shards WHERE job_id = ? AND shard = ?", (job_id, shard)).fetchone()
+            if owner is None or owner[0] != worker_id:
+                return False
+            db.executemany(
+                "UPDATE tasks SET state = ?, row = ?, worker = ? WHERE job_id = ? AND key = ?",
+                [("failed" if row is None else "done",
+                  None if row is None else json.dumps(row, ensure_ascii=False),
+                  worker_id, job_id, key) for key, row in results],
+            )
+            db.execute("UPDATE shards SET lease_expires = ? WHERE job_id = ? AND shard = ?",
+                       (time.time() + self.lease_seconds, job_id, shard))
+            return True
+
+    def complete_shard(self, job_id: str, shard: int, worker_id: str) -> None:
+        with self._write() as db:
+            db.execute(
+                "UPDATE shards SET done = 1, owner = NULL WHERE job_id = ? AND shard = ? AND owner = ?"
+                " AND NOT EXISTS (SELECT 1 FROM tasks WHERE job_id = ? AND shard = ? AND state = 'pending')",
+                (job_id, shard, worker_id, job_id, shard),
+            )
+
+    def release_shard(self, job_id: str, shard: int, worker_id: str) -> None:
+        """Gives a shard back immediately (e.g. on Ctrl+C) instead of waiting for the lease to expire."""
+        with self._write() as db:
+            db.execute("UPDATE shards SET owner = NULL, lease_expires = 0 WHERE job_id = ? AND shard = ? AND owner = ?",
+                       (job_id, shard, worker_id))
+
+
+def run_worker(store: LeaseStore, job_id: str,
+               score: Callable[[str, Optional[int], Optional[str]], Optional[Dict[str, Any]]],
+               worker_id: Optional[str] = None, batch_size: int = 20, poll_seconds: float = 5.0,
+               workers: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    Leases shards until the job is finished and scores every pending keyword with
+    `score(keyword, volume, comp)` (a report row, or None when the API failed).
+    Each shard runs through a Pipeline whose "fetch" stage calls `score` concurrently
+    (`workers`, e.g. {"fetch": 8}); results are pushed in batches from the calling thread.
+    While other workers hold the remaining shards it polls, so shards of dead workers get reclaimed.
+    """
+    worker_id = worker_id or default_worker_id()
+    stats = {"shards": 0, "done": 0, "failed": 0}
+    while True:
+        shard = store.lease_shard(job_id, worker_id)
+        if shard is None:
+            if store.is_finished(job_id):
+                return stats
+            time.sleep(min(poll_seconds, store.lease_seconds / 4))
+            continue
+
+        try:
+            tasks = store.pending_tasks(job_id, shard)
+            batch: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+            lost = False
+
+            def push(result: Tuple[str, Optional[Dict[str, Any]]]) -> None:
+                nonlocal batch, lost
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    if not store.push_results(job_id, shard, worker_id, batch):
+                        lost = True
+                        pipe.cancel()  # 다른 워커가 샤드를 가져감: 남은 키워드는 버림
+                        return
+                    _count(stats, batch)
+                    batch = []
+
+            # 예외는 지금까지처럼 워커를 멈추고 샤드를 반납하도록 fail_fast
+            pipe = Pipeline(workers=workers, fail_fast=True)
+            pipe.source("discover", lambda: tasks)
+            pipe.map("fetch", lambda task: (task[0], score(task[1], task[2], task[3])))
+            pipe.sink("sink", push)
+            pipe.run()
+            if not lost and batch:
+                lost = not store.push_results(job_id, shard, worker_id, batch)
+                if not lost:
+                    _count(stats, batch)
+            if not lost:
+                store.complete_shard(job_id, shard, worker_id)
+                stats["shards"] += 1
+        except BaseException:
+            store.release_shard(job_id, shard, worker_id)
+            raise
+
+
+def _count(stats: Dict[str, int], batch: List[Tuple[str, Optional[Dict[str, Any]]]]) -> None:
+    for _, row in batch:
+        stats["failed" if row is None else "done"] += 1
+
+
+def wait_for_job(store: LeaseStore, job_id: str, poll_seconds: float = 5.0) -> None:
+    """Blocks until every shard is done, printing progress."""
+    while True:
+        p = store.progress(job_id)
+        total = p["pending"] + p["done"] + p["failed"]
+        print(f"      [{p['done'] + p['failed']}/{total}] scored by {p['workers']} worker(s), "
+              f"{p['shards_left']} shard(s) left", end="\r")
+        if p["shards_left"] == 0:
+            print()
+            return
+        time.sleep(poll_seconds)
+
+
+def add_distributed_args(parser: argparse.ArgumentParser) -> None:
+    """Flags shared by the hunters for coordinator/worker runs."""
+    group = parser.add_argument_group("distributed mode")
+    group.add_argument("--role", choices=ROLES, default="local",
+                       help="local = single process (default); coordinator = enqueue keywords; "
+                            "worker = score leased shards; merge = build the report from a finished job")
+    group.add_argument("--store", default=DEFAULT_STORE, help="Shared SQLite lease store")
+    group.add_argument("--job", default=None, help="Job id for worker/merge (default: latest job of this hunter)")
+    group.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="Number of shards (coordinator)")
+    group.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                       help="Lease length; a shard not renewed within this time is reclaimed")
+    group.add_argument("--wait", action="store_true",
+                       help="Coordinator: wait for the workers to finish, then merge into the report")
+
+
+def resolve_job(store: LeaseStore, kind: str, job_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    job_id = job_id or store.latest_job(kind)
+    return store.job(job_id) if job_id else None
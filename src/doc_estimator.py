@@ -0,0 +1,288 @@
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from calculator import calculate_saturation
+    from history_config import DEFAULT_HISTORY_PATH, add_refresh_args, add_snapshot_args
+    from metrics import REGISTRY
+except ImportError:
+    from src.calculator import calculate_saturation
+    from src.history_config import DEFAULT_HISTORY_PATH, add_refresh_args, add_snapshot_args
+    from src.metrics import REGISTRY
+
+# 이력 저장소/스냅샷/재조회 계획은 근사 모드에서만 필요 → 사용하는 함수 안에서 로드 (CLI 콜드 스타트)
+if TYPE_CHECKING:
+    from metric_snapshot import MetricSnapshot
+    from metric_store import MetricStore
+    from refresh_planner import RefreshPlanner
+
+# compIdx(광고 경쟁도)별 초기 Sk 추정치. 검증값이 쌓이면 학습된 중앙값으로 대체됨
+COMP_PRIOR_SK = {"낮음": 1.0, "중간": 3.0, "높음": 8.0}
+
+# 신호별 가중치 (log Sk 가중 평균). 최근 이력이 있으면 이력만 사용
+SIBLING_WEIGHT = 2.0
+COMP_WEIGHT = 1.0
+COMP_PRIOR_WEIGHT = 0.25
+
+# 신호별로 최근 검증값만 유지 (중앙값 계산이 키워드 수에 비례해 느려지지 않도록)
+SIGNAL_WINDOW = 101
+
+
+def _median(values: Iterable[float]) -> float:
+    # statistics 모듈 대신 (import 비용이 커서 CLI 콜드 스타트를 늘림)
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def head_term(keyword: str, seeds: Sequence[str] = ()) -> str:
+    """
+    Head term shared by sibling keywords: the longest seed the keyword starts with
+    ('캠핑의자추천' -> '캠핑의자'), else the first word, else the first two characters.
+    """
+    compact = keyword.replace(" ", "").casefold()
+    best = ""
+    for seed in seeds:
+        seed = seed.replace(" ", "").casefold()
+        if seed and compact.startswith(seed) and len(seed) > len(best):
+            best = seed
+    if best:
+        return best
+    tokens = keyword.casefold().split()
+    return tokens[0] if len(tokens) > 1 else compact[:2]
+
+
+class Estimate:
+    __slots__ = ("docs", "saturation", "sources")
+
+    def __init__(self, docs: int, saturation: float, sources: List[str]):
+        self.docs = docs
+        self.saturation = saturation
+        self.sources = sources
+
+
+class DocCountEstimator:
+    """
+    Approximate doc-count mode: estimates Total_Docs (and so Sk) from cheap signals and calls the
+    Search API only for keywords that could make the blue-ocean cut.
+
+    Signals:
+    - history: the last verified doc count of the same keyword (MetricStore), used as is while it is
+      fresh: within the keyword's adaptive refresh interval with a `planner`, else within `history_days`.
+      With a `snapshot` (MetricSnapshot) the last doc count and its interval are read from the mmap file
+      instead, so worker processes skip the per-keyword SQLite queries and the planner's history scan;
+      new observations are still recorded to the store.
+    - siblings: median Sk of the last verified keywords sharing the head term
+    - compIdx: median Sk of the last verified keywords with the same Ad API competition level
+      (a fixed prior is used only as a tie-breaker until `min_comp_samples` are seen)
+    Without history, siblings and compIdx are combined as a weighted mean of log Sk.
+
+    A keyword is verified when there is no signal, when its estimated Sk < threshold * margin,
+    or at random with probability `verify_rate`. The random sample is unbiased and is what the
+    accuracy report relies on.
+    """
+
+    def __init__(self, threshold: float, margin: float = 2.0, verify_rate: float = 0.05,
+                 store: Optional["MetricStore"] = None, seeds: Sequence[str] = (), history_days: float = 30.0,
+                 min_comp_samples: int = 10, rng: Optional[random.Random] = None,
+                 planner: Optional["RefreshPlanner"] = None, snapshot: Optional["MetricSnapshot"] = None):
+        self.threshold = threshold
+        self.margin = margin
+        self.verify_rate = verify_rate
+        self.store = store
+        self.seeds = list(seeds)
+        self.history_days = history_days
+        self.planner = planner
+        self.snapshot = snapshot
+        self.min_comp_samples = min_comp_samples
+        self._rng = rng or random.Random(0)
+        self._siblings: Dict[str, Deque[float]] = {}
+        self._comp: Dict[str, Deque[float]] = {}
+        # (estimated Sk, actual Sk) pairs: promising keywords / random sample of keywords that would be skipped
+        self.pairs: Dict[str, List[Tuple[float, float]]] = {"verified": [], "sample": []}
+        self.counts = {"api": 0, "estimate": 0, "no_signal": 0}
+        # 파이프라인 fetch 스테이지가 여러 스레드에서 resolve()를 호출하므로 신호/카운터 갱신을 보호
+        self._lock = threading.RLock()
+
+    def estimate(self, keyword: str, volume: int, comp: Optional[str] = None) -> Optional[Estimate]:
+        """None when there is nothing to go on (the keyword must be verified)."""
+        if volume <= 0:
+            return None
+        if self.snapshot is not None or self.store is not None:
+            obs = self.snapshot.latest(keyword) if self.snapshot is not None else self.store.latest(keyword)
+            if obs is None:
+                fresh = False
+            elif self.snapshot is not None:
+                fresh = time.time() - obs["observed_at"] <= obs["refresh_days"] * 86400
+            elif self.planner is not None:
+                # 변동이 큰 키워드는 이력을 더 빨리 만료시켜 다시 조회
+                fresh = self.planner.is_fresh(keyword, obs["observed_at"])
+            else:
+                fresh = time.time() - obs["observed_at"] <= self.history_days * 86400
+            REGISTRY.record_cache("doc_count", fresh)
+            if fresh:
+                # 문서 수는 천천히 변하므로 과거 문서 수 / 현재 검색량을 그대로 사용 (다른 신호보다 훨씬 정확)
+                docs = obs["docs"]
+                return Estimate(docs, calculate_saturation(docs, volume), ["history"])
+
+        terms: List[Tuple[float, float, str]] = []
+        siblings = self._siblings.get(head_term(keyword, self.seeds))
+        if siblings:
+            terms.append((_median(siblings), SIBLING_WEIGHT * min(len(siblings), 5) / 5, "siblings"))
+
+        learned = self._comp.get(comp or "")
+        if learned and len(learned) >= self.min_comp_samples:
+            terms.append((_median(learned), COMP_WEIGHT, "compIdx"))
+        elif terms and comp in COMP_PRIOR_SK:
+            terms.append((math.log(COMP_PRIOR_SK[comp]), COMP_PRIOR_WEIGHT, "compIdx"))
+
+        if not terms:
+            return None
+        log_sk = sum(v * w for v, w, _ in terms) / sum(w for _, w, _ in terms)
+        docs = int(round(math.exp(log_sk) * volume))
+        return Estimate(docs, calculate_saturation(docs, volume), [s for _, _, s in terms])
+
+    def observe(self, keyword: str, volume: int, docs: int, comp: Optional[str] = None) -> None:
+        """Feeds a verified doc count back into the signals (and the persistent history)."""
+        if self.store is not None:
+            self.store.record(keyword, volume, docs, comp)
+        if volume <= 0:
+            return
+        log_sk = math.log(max(docs, 1) / volume)
+        self._siblings.setdefault(head_term(keyword, self.seeds), deque(maxlen=SIGNAL_WINDOW)).append(log_sk)
+        if comp:
+            self._comp.setdefault(comp, deque(maxlen=SIGNAL_WINDOW)).append(log_sk)
+
+    def resolve(self, keyword: str, volume: int, comp: Optional[str],
+                fetch_docs: Callable[[str], Optional[int]]) -> Optional[Tuple[int, str]]:
+        """
+        Returns (docs, source) where source is 'api' or 'estimate',
+        or None when verification was needed and the API call failed.
+        Thread-safe; the API call itself runs outside the lock.
+        """
+        with self._lock:
+            est = self.estimate(keyword, volume, comp)
+            if est is None:
+                reason = "no_signal"
+            elif est.saturation < self.threshold * self.margin:
+                reason = "verified"
+            elif self._rng.random() < self.verify_rate:
+                reason = "sample"
+            else:
+                self.counts["estimate"] += 1
+                return est.docs, "estimate"
+
+        docs = fetch_docs(keyword)
+        if docs is None:
+            return None
+        with self._lock:
+            self.observe(keyword, volume, docs, comp)
+            self.counts["api"] += 1
+            if est is None:
+                self.counts["no_signal"] += 1
+            else:
+                self.pairs[reason].append((est.saturation, calculate_saturation(docs, volume)))
+        return docs, "api"
+
+    def close(self) -> None:
+        with self._lock:
+            if self.store is not None:
+                self.store.close()
+            if self.snapshot is not None:
+                self.snapshot.close()
+
+    # --- Accuracy ---
+    @staticmethod
+    def _errors(pairs: List[Tuple[float, float]]) -> Dict[str, float]:
+        ratios = [abs(math.log(e / a)) for e, a in pairs if e > 0 and a > 0]
+        if not ratios:
+            return {"n": len(pairs), "median_factor": math.nan, "p90_factor": math.nan, "within_2x": math.nan}
+        ratios.sort()
+        return {
+            "n": len(pairs),
+            "median_factor": math.exp(_median(ratios)),
+            "p90_factor": math.exp(ratios[min(len(ratios) - 1, int(0.9 * len(ratios)))]),
+            "within_2x": sum(r <= math.log(2) for r in ratios) / len(ratios),
+        }
+
+    def accuracy(self) -> Dict[str, Dict[str, float]]:
+        out = {name: self._errors(pairs) for name, pairs in self.pairs.items()}
+        sample = self.pairs["sample"]
+        missed = sum(a < self.threshold for _, a in sample)
+        out["sample"]["missed_rate"] = missed / len(sample) if sample else math.nan
+        return out
+
+    def summary_markdown(self) -> str:
+        total = self.counts["api"] + self.counts["estimate"]
+        if not total:
+            return "No keywords resolved."
+        acc = self.accuracy()
+        saved = self.counts["estimate"] / total * 100
+        lines = [
+            f"- **Search API calls:** {self.counts['api']} of {total} keywords "
+            f"({self.counts['estimate']} estimated, {saved:.0f}% of doc-count calls saved; "
+            f"{self.counts['no_signal']} verified for lack of signal)",
+            f"- **Verification rule:** estimated $S_k$ < {self.threshold * self.margin:g} "
+            f"(threshold {self.threshold:g} × margin {self.margin:g}), plus a {self.verify_rate:.0%} random sample",
+            "",
+            "| Set | Keywords | Median Error (×) | p90 Error (×) | Within 2× |",
+            "| --- | --- | --- | --- | --- |",
+        ]
+        labels = {"verified": "Promising (verified)", "sample": "Random sample (unbiased)"}
+        for name in ("verified", "sample"):
+            m = acc[name]
+            fmt = lambda v, spec: "-" if math.isnan(v) else format(v, spec)
+            lines.append(f"| {labels[name]} | {m['n']} | {fmt(m['median_factor'], '.2f')} "
+                         f"| {fmt(m['p90_factor'], '.2f')} | {fmt(m['within_2x'], '.0%')} |")
+        missed_rate = acc["sample"]["missed_rate"]
+        if not math.isnan(missed_rate):
+            lines.append("")
+            lines.append(f"- **Missed blue oceans (sample):** {missed_rate:.1%} of skipped keywords were actually "
+                         f"below $S_k$ {self.threshold:g} (≈ {missed_rate * self.counts['estimate']:.0f} keywords)")
+        return "\n".join(lines)
+
+
+def add_approx_args(parser) -> None:
+    """Flags shared by the hunters for approximate doc-count mode."""
+    group = parser.add_argument_group("approximate doc-count mode")
+    group.add_argument("--approx", action="store_true",
+                       help="Estimate Total_Docs from history, sibling keywords and compIdx; "
+                            "call the Search API only for keywords near or below the blue-ocean cut")
+    group.add_argument("--approx-margin", type=float, default=2.0,
+                       help="Verify keywords whose estimated Sk is below threshold x margin")
+    group.add_argument("--verify-rate", type=float, default=0.05,
+                       help="Share of skipped keywords verified anyway to measure the estimate error")
+    group.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="Keyword history store used for estimates")
+    add_refresh_args(group)
+    add_snapshot_args(group)
+
+
+def estimator_from_args(args, threshold: float, seeds: Sequence[str] = ()) -> Optional[DocCountEstimator]:
+    if not args.approx:
+        return None
+    try:
+        from metric_snapshot import snapshot_from_args
+        from metric_store import MetricStore
+        from refresh_planner import planner_from_args
+    except ImportError:
+        from src.metric_snapshot import snapshot_from_args
+        from src.metric_store import MetricStore
+        from src.refresh_planner import planner_from_args
+
+    store = MetricStore(args.history)
+    snapshot = snapshot_from_args(args)
+    # 스냅샷에는 빌드 시점의 재조회 주기가 들어 있으므로 이력 전체 스캔(planner)은 생략
+    return DocCountEstimator(threshold, margin=args.approx_margin, verify_rate=args.verify_rate,
+                             store=store, seeds=seeds, planner=None if snapshot else planner_from_args(args, store),
+                             snapshot=snapshot)
+
+
+def accuracy_section(estimator: Optional[DocCountEstimator]) -> str:
+    """Report section appended to the epilogue in approximate mode."""
+    if estimator is None:
+        return ""
+    return f"\n## 🎯 Doc-Count Estimate Accuracy\n{estimator.summary_markdown()}\n"
@@ -0,0 +1,29 @@
+# 키워드 이력 관련 기본값과 CLI 플래그. 무거운 모듈(sqlite3, 이력 저장소, 갱신 계획기)을 불러오지 않고도
+# 모든 CLI(--help 포함)와 합성 데이터 모드가 공유할 수 있도록 import 없이 유지
+
+# 근사 모드, 갱신 계획기, 스냅샷, 앱이 함께 쓰는 실제 키워드 이력 저장소
+DEFAULT_HISTORY_PATH = "reports/keyword_history.sqlite"
+
+# 허용 변화량: 저장된 값이 이 비율 이상 달라졌을 것으로 예상되면 다시 조회
+DEFAULT_TOLERANCE = 0.2
+
+# 재조회 주기 범위 (일). 최대값은 근사 모드의 기존 이력 유효 기간(30일)과 같음
+MIN_REFRESH_DAYS = 1.0
+MAX_REFRESH_DAYS = 30.0
+# 관측이 한 번뿐이라 변화율을 모를 때
+DEFAULT_REFRESH_DAYS = 7.0
+
+
+def add_refresh_args(parser) -> None:
+    """Adaptive history freshness, shared by the approximate mode and the refresh CLI."""
+    parser.add_argument("--refresh-tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Re-fetch a stored keyword once its volume/doc count is expected to have drifted "
+                             "by this share (interval = ln(1 + tolerance) / observed change rate)")
+    parser.add_argument("--max-refresh-days", type=float, default=MAX_REFRESH_DAYS,
+                        help="Longest refresh interval, even for keywords that never changed")
+
+
+def add_snapshot_args(parser) -> None:
+    parser.add_argument("--snapshot", default=None,
+                        help="Read stored metrics from a compiled snapshot (metric_snapshot.py) through mmap "
+                             "instead of scanning/querying the SQLite history in every worker process")
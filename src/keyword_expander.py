@@ -9,6 +9,10 @@ BROAD_TOPIC_MAP = {
     "여행": ["일본 여행", "다낭 여행", "환율 우대", "해외여행 준비물"]
 }
 
+# 키워드 성격 추론용 표지어 (접미사 선택과 keyword_category에서 공용)
+NEWS_MARKERS = ["주식", "전자", "코인", "비트", "에코프로", "환율", "금리", "AI", "테크", "반도체"]
+REVIEW_MARKERS = ["맛집", "여행", "제품", "리뷰", "크림", "청소기"]
+
 def expand_keyword(seed_keyword: str) -> Tuple[List[str], List[str]]:
     """
     키워드 성격에 따라 적절한 접미사(Suffix)를 붙여 확장합니다.
@@ -34,9 +38,9 @@ def expand_keyword(seed_keyword: str) -> Tuple[List[str], List[str]]:
     for target in targets:
         # 간단한 키워드 성격 추론 로직
         # (단어에 특정 글자가 포함되어 있으면 뉴스형 접미사 우선 적용)
-        if any(x in target for x in ["주식", "전자", "코인", "비트", "에코프로", "환율", "금리", "AI", "테크", "반도체"]):
+        if any(x in target for x in NEWS_MARKERS):
             target_suffixes = news_suffixes + info_suffixes # 투자+정보 위주
-        elif any(x in target for x in ["맛집", "여행", "제품", "리뷰", "크림", "청소기"]):
+        elif any(x in target for x in REVIEW_MARKERS):
             target_suffixes = base_suffixes + info_suffixes # 리뷰+정보 위주
         else:
             # 잘 모를 땐 다 섞어서 (가장 강력함)
@@ -45,4 +49,19 @@ def expand_keyword(seed_keyword: str) -> Tuple[List[str], List[str]]:
         for suffix in target_suffixes:
             expanded_list.append(f"{target} {suffix}")
             
-    return list(set(expanded_list)), sub_topics
\ No newline at end of file
+    return list(set(expanded_list)), sub_topics
+
+def keyword_category(keyword: str) -> str:
+    """
+    시나리오 분석용 카테고리.
+    대주제(BROAD_TOPIC_MAP)나 그 하위 주제를 포함하면 해당 대주제, 아니면 접미사 선택과 같은 규칙으로 '투자' / '리뷰' / '기타'.
+    """
+    compact = keyword.replace(" ", "")
+    for topic, sub_topics in BROAD_TOPIC_MAP.items():
+        if any(t.replace(" ", "") in compact for t in [topic] + sub_topics):
+            return topic
+    if any(x in keyword for x in NEWS_MARKERS):
+        return "투자"
+    if any(x in keyword for x in REVIEW_MARKERS):
+        return "리뷰"
+    return "기타"
@@ -0,0 +1,130 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from calculator import calculate_efficiency, calculate_saturation
+    from distributed import normalize_keyword
+    from metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from refresh_planner import KeywordState, RefreshPlanner
+except ImportError:
+    from src.calculator import calculate_efficiency, calculate_saturation
+    from src.distributed import normalize_keyword
+    from src.metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from src.refresh_planner import KeywordState, RefreshPlanner
+
+# 추천 목록을 고를 때 훑어보는 접두사 일치 키워드 수 상한 (짧은 접두사에서도 즉시 응답하도록)
+SUGGEST_SCAN = 5000
+
+
+class KeywordIndex:
+    """
+    In-memory prefix index over every keyword in the metric history: normalized keys in one sorted
+    list searched with bisect, each pointing at the keyword's latest KeywordState.
+    Built from a single history scan (the RefreshPlanner's), so each keyword also carries its adaptive
+    refresh interval and only keywords past it need the API again.
+    Thread-safe; add() records new observations to the store and keeps the index sorted.
+    """
+
+    def __init__(self, planner: RefreshPlanner):
+        self.planner = planner
+        states = planner.states
+        self._keys: List[str] = sorted(states)
+        self._states: List[KeywordState] = [states[key] for key in self._keys]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_HISTORY_PATH) -> "KeywordIndex":
+        return cls(RefreshPlanner(MetricStore(path)))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, keyword: str) -> Optional[KeywordState]:
+        key = normalize_keyword(keyword)
+        with self._lock:
+            i = bisect_left(self._keys, key)
+            return self._states[i] if i < len(self._keys) and self._keys[i] == key else None
+
+    def latest(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """MetricStore.latest()-shaped view of get() (volume may be stale)."""
+        state = self.get(keyword)
+        if state is None:
+            return None
+        return {"keyword": state.keyword, "volume": state.volume, "docs": state.docs, "observed_at": state.observed_at}
+
+    def prefix(self, text: str, limit: Optional[int] = None) -> List[KeywordState]:
+        """Keywords starting with `text` (after normalization), in key order."""
+        key = normalize_keyword(text)
+        if not key:
+            return []
+        out: List[KeywordState] = []
+        with self._lock:
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i].startswith(key) and (limit is None or len(out) < limit):
+                out.append(self._states[i])
+                i += 1
+        return out
+
+    def suggest(self, text: str, limit: int = 10) -> List[KeywordState]:
+        """Type-ahead: the highest-volume known keywords starting with `text`."""
+        matches = self.prefix(text, SUGGEST_SCAN)
+        matches.sort(key=lambda s: s.volume or 0, reverse=True)
+        return matches[:limit]
+
+    def split(self, keywords: Iterable[str], now: Optional[float] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        (rows, unknown): fetch_keyword_data-shaped rows with Sk/Ek for keywords whose stored metrics are
+        still fresh, and the keywords that must be fetched (never seen, incomplete or past their interval).
+        """
+        now = now or time.time()
+        rows: List[Dict[str, Any]] = []
+        unknown: List[str] = []
+        seen = set()
+        for keyword in keywords:
+            key = normalize_keyword(keyword)
+            if key in seen:
+                continue
+            seen.add(key)
+            state = self.get(keyword)
+            if state is None or state.is_stale(now):
+                unknown.append(keyword)
+            else:
+                rows.append(known_row(state))
+        return rows, unknown
+
+    def add(self, keyword: str, volume: int, docs: int, comp: Optional[str] = None) -> None:
+        """Records a fresh observation and makes it visible to get()/prefix() right away."""
+        now = time.time()
+        self.planner.store.record(keyword, volume, docs, comp, observed_at=now)
+        key = normalize_keyword(keyword)
+        with self._lock:
+            i = bisect_left(self._keys, key)
+            found = i < len(self._keys) and self._keys[i] == key
+            old = self._states[i] if found else None
+            # 변화율은 다음 전체 스캔 때 다시 계산 (그때까지는 기존 재조회 주기 유지)
+            state = KeywordState(keyword, volume, docs, now, old.observations + 1 if old else 1,
+                                 old.volume_rate if old else None, old.docs_rate if old else None,
+                                 old.interval_days if old else self.planner.default_days)
+            if found:
+                self._states[i] = state
+            else:
+                self._keys.insert(i, key)
+                self._states.insert(i, state)
+            self.planner.states[key] = state
+
+    def flush(self) -> None:
+        self.planner.store.flush()
+
+
+def known_row(state: KeywordState) -> Dict[str, Any]:
+    saturation = calculate_saturation(state.docs, state.volume)
+    return {
+        "Keyword": state.keyword,
+        "Monthly_Search_Volume": state.volume,
+        "Total_Docs": state.docs,
+        "Saturation_Index": saturation,
+        "Efficiency_Score": calculate_efficiency(saturation, state.volume),
+        "SmartBlock_Type": "",
+    }
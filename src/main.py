@@ -1,10 +1,8 @@
 import sys
 import os
 import json
-import pandas as pd
 import argparse
 from datetime import datetime
-import time
 
 # --- 경로 설정 (가장 중요) ---
 # 현재 파일(main.py)의 위치를 강제로 시스템 경로에 추가합니다.
@@ -16,113 +14,166 @@ if current_dir not in sys.path:
 try:
     # 같은 폴더(src)에 있는 모듈들을 직접 호출
     from keyword_expander import expand_keyword
-    from data_fetcher import fetch_keyword_data
-    from calculator import calculate_saturation, calculate_efficiency, filter_keywords
+    from data_fetcher import fetch_keyword_data, RealDataFetcher
+    from calculator import RED_OCEAN_SK
+    from report_writer import StreamingReportWriter, ReportSection, DEFAULT_MD_LIMIT, REPORT_COLUMNS, SERP_DETAIL_COLUMNS
+    from serp_features import score_rows
+    from metrics import REGISTRY, StageProfiler
+    from doc_estimator import accuracy_section, add_approx_args, estimator_from_args
+    from synthetic_fetcher import add_synthetic_args, synthetic_from_args
+    from pipeline import add_pipeline_args, pipeline_from_args
+    from anytime import AnytimeRun, add_anytime_args, prioritize, volume_hints
 except ImportError as e:
     print(f"❌ 모듈 로딩 실패: {e}")
     print(f"현재 'src' 폴더 안에 다음 파일들이 있는지 확인해주세요:")
     print(f" - keyword_expander.py")
     print(f" - data_fetcher.py")
     print(f" - calculator.py")
+    print(f" - report_writer.py")
+    print(f" - serp_features.py")
+    print(f" - metrics.py")
+    print(f" - doc_estimator.py")
+    print(f" - synthetic_fetcher.py")
+    print(f" - pipeline.py")
+    print(f" - anytime.py")
     sys.exit(1)
 
 def main():
     parser = argparse.ArgumentParser(description="Naver SEO Keyword Miner (Real Data Mode)")
     parser.add_argument("--seed", type=str, default="캠핑의자", help="Seed keyword for mining")
+    parser.add_argument("--md-limit", type=int, default=DEFAULT_MD_LIMIT, help="Max rows in the Markdown table (full data goes to CSV/JSONL)")
+    parser.add_argument("--chunk-rows", type=int, default=0, help="Split CSV/JSONL sidecars every N rows (0 = single file)")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown (discover, expand, dedupe, fetch, score, rank, sink, report)")
+    add_pipeline_args(parser)
+    add_approx_args(parser)
+    add_synthetic_args(parser)
+    add_anytime_args(parser)
     args = parser.parse_args()
+    profiler = StageProfiler(enabled=args.profile)
+    fetcher = synthetic_from_args(args)  # None = 실제 네이버 API
+    data_label = "SYNTHETIC" if fetcher else "REAL"
 
-    print(f"🤖 [닥터스톤 Real-Data 에이전트] 가동 시작...")
+    print(f"🤖 [닥터스톤 {data_label.title()}-Data 에이전트] 가동 시작...")
 
     # 1. 시드 키워드 정의
     seed_keyword = args.seed
     print(f"🎯 시드 키워드: {seed_keyword}")
+
+    # 시간 예산 모드: 이전에 중단된 실행이 있으면 남은 키워드부터 이어서 분석
+    anytime = None
+    if args.time_budget or args.resume:
+        state_path = AnytimeRun.state_path(seed_keyword)
+        anytime = AnytimeRun.load(state_path) if args.resume else None
+        if anytime is not None:
+            print(f"   ⏯️ 이어서 분석: {len(anytime.rows)}개 완료, {len(anytime.pending)}개 남음 ({state_path})")
+        elif args.resume:
+            print(f"   ℹ️ 이어서 분석할 실행이 없어 새로 시작합니다.")
+        if args.time_budget:
+            print(f"   ⏱️ 시간 예산: {args.time_budget:g}초 (시드 → 검색량 높은 순으로 분석)")
     
-    # 2. 키워드 확장 (브레인스토밍)
-    print("   ↳ 키워드 확장 및 브레인스토밍 중...")
-    keywords, sub_topics = expand_keyword(seed_keyword)
-    
-    if sub_topics:
-        print(f"   ✨ [Auto-Brainstorming] 대주제 감지! -> {len(sub_topics)}개 하위 주제로 확장됨.")
-        print(f"      {sub_topics}")
-    
-    # 3. 실제 데이터 수집 (REAL API)
-    print(f"   📡 네이버 API 접속 중... (총 {len(keywords)}개 키워드)")
-    data = []
-    
-    # for i, kw in enumerate(keywords):
-    #     print(f"      [{i+1}/{len(keywords)}] '{kw}' 데이터 조회 중...", end="\r")
-    #     try:
-    #         # fetch_keyword_data는 내부적으로 secrets.json을 로드합니다.
-    #         metrics = fetch_keyword_data(kw)
-    #         if metrics:
-    #             data.append(metrics)
-    #     except Exception as e:
-    #         print(f"\n      ❌ Error fetching '{kw}': {e}")
-        
-    #     # API 과부하 방지 (살짝 텀을 줌)
-    #     time.sleep(0.1) 
-    for i, kw in enumerate(keywords):
-            print(f"      [{i+1}/{len(keywords)}] '{kw}' 데이터 조회 중...", end=" ") # end="\r" 제거
-            try:
-                metrics = fetch_keyword_data(kw)
-                if metrics:
-                    data.append(metrics)
-                    
-                    # [🔥 검증 코드 추가] : 이 부분이 핵심입니다!
-                    vol = metrics['Monthly_Search_Volume']
-                    docs = metrics['Total_Docs']
-                    print(f"👉 [검색량: {vol:,} / 문서수: {docs:,}]")  
-                    
-            except Exception as e:
-                print(f"\n      ❌ Error fetching '{kw}': {e}")
-            
-            time.sleep(0.1)
-        
-    print("\n   ✅ 데이터 수집 완료.")
+    # 2. 리포트 준비 (행 단위 스트리밍: CSV/JSONL은 즉시 기록, Markdown은 상위 N개만 유지)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_filename = f"reports/result_{data_label}_{timestamp}.md"
+    # 근사 모드: 문서 수를 추정한 행은 Docs_Source=estimate 로 표시 (하위 주제는 확장 후 시드에 추가)
+    estimator = estimator_from_args(args, threshold=RED_OCEAN_SK, seeds=[seed_keyword])
+    columns = REPORT_COLUMNS + SERP_DETAIL_COLUMNS + (['Docs_Source'] if estimator else [])
+    writer = StreamingReportWriter(report_filename, columns=columns, chunk_rows=args.chunk_rows)
+    recommended = writer.add_section(ReportSection(
+        "## Recommended Keywords (Sorted by Efficiency Ek)",
+        sort_by='Efficiency_Score',
+        where=lambda row: row['Saturation_Index'] < RED_OCEAN_SK,  # 필터링 (Sk < 5.0)
+        limit=args.md_limit,
+        description="""| Note |
+| --- |
+| **Sk (Saturation Index)** | `< 0.5` Blue Ocean, `0.5 ~ 1.0` Good, `1.0 ~ 5.0` Competitive |
+| **Ek (Efficiency Score)** | Higher is better. Balancing volume, conversion, and competition. |
+| **SERP Score** | 0 ~ 1, higher = easier to break into the top results (fresh posts, few exact titles, one dominant blogger) |""",
+    ))
+
+    # 3. 파이프라인: 확장 → 중복 제거 → 수집 (REAL API, 병렬) → 지표 계산 (Sk, Ek, SERP; 배치 벡터화) → 순위 → 기록
+    sub_topics = []
+
+    def expand(seed):
+        keywords, subs = expand_keyword(seed)
+        if subs:
+            print(f"   ✨ [Auto-Brainstorming] 대주제 감지! -> {len(subs)}개 하위 주제로 확장됨.")
+            print(f"      {subs}")
+            sub_topics.extend(subs)
+            if estimator:
+                estimator.seeds.extend(subs)
+        print(f"   📡 {'합성 데이터 생성 중' if fetcher else '네이버 API 접속 중'}... (총 {len(keywords)}개 키워드)")
+        return keywords
+
+    def sink(metrics):
+        writer.store_row(metrics)
+        if anytime is not None:
+            anytime.add(metrics)
+        # [🔥 검증 코드] : 수집된 실제 값을 바로 확인
+        approx_note = " (추정)" if metrics.get('Docs_Source') == "estimate" else ""
+        print(f"      [{writer.rows_written}/{pipe.stats['dedupe'].emitted}] '{metrics['Keyword']}' "
+              f"👉 [검색량: {metrics['Monthly_Search_Volume']:,} / 문서수: {metrics['Total_Docs']:,}{approx_note}]")
+
+    def fetch(kw):
+        return fetch_keyword_data(kw, estimator=estimator, fetcher=fetcher)  # None = API 실패 (건너뜀)
+
+    pipe = pipeline_from_args(args, profiler, on_error=lambda stage, kw, e: print(f"\n      ❌ Error in {stage} ('{kw}'): {e}"))
+    if anytime is None and not args.time_budget:
+        print("   ↳ 키워드 확장 및 브레인스토밍 중...")
+        pipe.source("discover", lambda: [seed_keyword])
+        pipe.flat_map("expand", expand)
+        pipe.dedupe("dedupe")
+        pipe.map("fetch", fetch)
+    else:
+        if anytime is None:
+            # 기대 가치 순서: 확장을 먼저 끝내고 연관 키워드 검색량(광고 API 1회)과 저장된 검색량으로 정렬
+            anytime = AnytimeRun(seed_keyword, [], path=state_path)
+            anytime.start(args.time_budget)
+            print("   ↳ 키워드 확장 및 브레인스토밍 중...")
+            keywords = expand(seed_keyword)
+            related = (fetcher or RealDataFetcher()).get_related_keywords(seed_keyword)
+            anytime.items = prioritize(seed_keyword, keywords,
+                                       volume_hints(related, estimator.store if estimator else None, keywords))
+        else:
+            anytime.path = state_path
+            anytime.start(args.time_budget)
+        # 이전 호출에서 분석한 행도 순위/사이드카에 포함
+        for row in anytime.rows:
+            writer.write_row(row)
+        pipe.source("discover", anytime.discover)
+        pipe.dedupe("dedupe", key=lambda item: item['keyword'])
+        pipe.map("fetch", anytime.gate(fetch))
+    pipe.batch("score", score_rows)
+    pipe.tap("rank", writer.rank_row)
+    pipe.sink("sink", sink)
+    pipe.run()
+
+    print("\n   ✅ 데이터 수집 및 계산 완료.")
+    if anytime is not None:
+        anytime.save()
+        pending = len(anytime.pending)
+        if pending:
+            print(f"   ⏳ 시간 예산 종료: {pending}개 키워드 미분석 (--resume 으로 이어서 분석)")
+        if anytime.failed:
+            print(f"   ⚠️ [API 실패 - 건너뜀] {len(anytime.failed)}개 키워드")
+    elif pipe.stats['fetch'].dropped:
+        print(f"   ⚠️ [API 실패 - 건너뜀] {pipe.stats['fetch'].dropped}개 키워드")
     
-    if not data:
+    budget_expired = anytime is not None and bool(anytime.pending)
+    if writer.rows_written == 0 and not budget_expired:
         print("❌ 수집된 데이터가 없습니다. secrets.json 설정을 확인해주세요.")
         return
+    if writer.rows_written == 0:
+        # API 문제가 아니라 첫 수집 전에 예산이 끝난 경우: 진행 상황(남은 키워드)만 담아 리포트 생성
+        print("   ⏳ 첫 키워드를 분석하기 전에 시간 예산이 끝났습니다. 진행 상황만 리포트에 기록합니다.")
 
-    df = pd.DataFrame(data)
-    
-    # 4. 지표 계산 (변수명 매칭: Monthly_Search_Volume, Total_Docs)
-    print("   🧮 알고리즘 계산 중 (Sk, Ek)...")
-    try:
-        df['Saturation_Index'] = df.apply(lambda row: calculate_saturation(row['Total_Docs'], row['Monthly_Search_Volume']), axis=1)
-        df['Efficiency_Score'] = df.apply(lambda row: calculate_efficiency(row['Saturation_Index'], row['Monthly_Search_Volume']), axis=1)
-    except KeyError as e:
-        print(f"❌ 데이터 컬럼 이름 불일치 에러: {e}")
-        print("data_fetcher.py가 반환하는 키 값(Key)을 확인하세요.")
-        return
-    
-    # 5. 필터링 (Sk < 5.0)
-    initial_count = len(df)
-    df_filtered = filter_keywords(df) # calculator.py의 함수 사용
-    dropped_count = initial_count - len(df_filtered)
+    # 4. 필터링 결과 (Sk < 5.0)
+    initial_count = writer.rows_written
+    dropped_count = initial_count - recommended.matched
     
     if dropped_count > 0:
-        print(f"   🗑️ 레드오션 키워드 {dropped_count}개 제거됨 (Sk >= 5.0)")
-    
-    # 6. 정렬 (효율성 순)
-    df_filtered = df_filtered.sort_values(by='Efficiency_Score', ascending=False)
+        print(f"   🗑️ 레드오션 키워드 {dropped_count}개 제거됨 (Sk >= {RED_OCEAN_SK})")
     
-    # 7. 리포트 생성
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    os.makedirs('reports', exist_ok=True)
-    report_filename = f"reports/result_REAL_{timestamp}.md"
-    
-    # 보기 좋게 반올림
-    display_df = df_filtered.copy()
-    display_df['Saturation_Index'] = display_df['Saturation_Index'].round(2)
-    display_df['Efficiency_Score'] = display_df['Efficiency_Score'].round(2)
-    
-    # Markdown 변환
-    try:
-        markdown_table = display_df[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score', 'SmartBlock_Type']].to_markdown(index=False)
-    except ImportError:
-        markdown_table = display_df.to_string()
-
+    # 5. 리포트 생성 (효율성 순 정렬은 섹션이 담당)
     brainstorm_section = ""
     if sub_topics:
         brainstorm_section = f"""
@@ -132,33 +183,35 @@ def main():
 > {', '.join(sub_topics)}
 """
 
-    report_content = f"""# SEO Keyword Analysis Report (REAL DATA)
+    preamble = f"""# SEO Keyword Analysis Report ({data_label} DATA)
 **Timestamp:** {timestamp}
 **Seed Keyword:** {seed_keyword}
 {brainstorm_section}
 ## Analysis Summary
 - **Total Keywords Analyzed:** {initial_count}
-- **Keywords Passed Filter (Sk < 5.0):** {len(df_filtered)}
-- **Drop Rate:** {dropped_count / initial_count * 100:.1f}%
-
-## Recommended Keywords (Sorted by Efficiency Ek)
-
-| Note |
-| --- |
-| **Sk (Saturation Index)** | `< 0.5` Blue Ocean, `0.5 ~ 1.0` Good, `1.0 ~ 5.0` Competitive |
-| **Ek (Efficiency Score)** | Higher is better. Balancing volume, conversion, and competition. |
-
-{markdown_table}
+- **Keywords Passed Filter (Sk < {RED_OCEAN_SK}):** {recommended.matched}
+- **Drop Rate:** {dropped_count / max(initial_count, 1) * 100:.1f}%
+- **Full Data:** {writer.sidecar_hint() or "-"}
+"""
+    if initial_count == 0:
+        preamble += "- **Time Budget:** expired before the first keyword was analyzed (continue with `--resume`)\n"
 
-## Next Actions
+    epilogue = """## Next Actions
 - Select top 3 keywords with high `Ek` and `Sk < 1.0`.
-- Create content targeting the identified `SmartBlock Type`.
-"""
+- Create content matching the identified `SmartBlock_Type` (SERP pattern): beat exact titles in an "Exact-Title Race", post timely content for "Fresh Rotation".
+""" + accuracy_section(estimator)
+    if anytime is not None:
+        epilogue += f"\n## ⏳ Anytime Progress\n{anytime.summary_markdown()}\n"
     
-    with open(report_filename, "w", encoding="utf-8") as f:
-        f.write(report_content)
+    with profiler.stage("report"):
+        writer.close(preamble=preamble, epilogue=epilogue, metrics=REGISTRY)
+    if estimator:
+        estimator.close()
         
     print(f"✅ 리포트 생성 완료: {report_filename}")
+    if args.profile:
+        print(profiler.report())
+        print(pipe.summary())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
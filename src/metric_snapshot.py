@@ -0,0 +1,239 @@
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from distributed import normalize_keyword
+    from history_config import DEFAULT_REFRESH_DAYS, add_refresh_args
+    from metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from refresh_planner import planner_from_args
+except ImportError:
+    sys.path.append(os.path.join(current_dir, ".."))
+    from src.distributed import normalize_keyword
+    from src.history_config import DEFAULT_REFRESH_DAYS, add_refresh_args
+    from src.metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from src.refresh_planner import planner_from_args
+
+DEFAULT_SNAPSHOT_PATH = "reports/keyword_metrics.snap"
+
+# 파일 형식 (리틀 엔디언, 모든 구역 8바이트 정렬):
+#   header   MAGIC, count(u64), keys_bytes(u64), default_days(f64)  32 bytes
+#            default_days: 스냅샷에 없는 키워드의 재조회 주기 (빌드한 planner 기준, 0 = 이전 형식)
+#   offsets  u64 x (count + 1)   keys 구역 안에서 i번째 키의 시작 위치 (마지막 = 끝)
+#   volume   i64 x count         월간 검색량 (-1 = 모름)
+#   docs     i64 x count         문서 수 (-1 = 모름, 예: 연관 검색어 검색량만 있는 키워드)
+#   observed f64 x count         관측 시각 (epoch 초)
+#   refresh  f64 x count         재조회 주기 (일, RefreshPlanner 기준)
+#   keys     UTF-8              정규화된 키워드, 바이트 순 정렬 (= 코드 포인트 순)
+MAGIC = b"KWSNAP01"
+_HEADER = struct.Struct("<8sQQd")
+
+# (volume, docs, observed_at, refresh_days)
+Entry = Tuple[Optional[int], Optional[int], float, float]
+
+
+def build_snapshot(path: str, entries: Dict[str, Entry], default_days: float = DEFAULT_REFRESH_DAYS) -> int:
+    """
+    Writes `entries` (normalized key -> Entry) as an immutable snapshot and returns the keyword count.
+    `default_days` is the planner's interval for keywords without one; readers use it for unknown keywords.
+    The file is replaced atomically, so readers that still have the old one mapped are unaffected.
+    """
+    keys = sorted(entries)
+    blobs = [key.encode("utf-8") for key in keys]
+    offsets, volume, docs = array("Q", [0]), array("q"), array("q")
+    observed, refresh = array("d"), array("d")
+    for key, blob in zip(keys, blobs):
+        v, d, t, r = entries[key]
+        offsets.append(offsets[-1] + len(blob))
+        volume.append(-1 if v is None else v)
+        docs.append(-1 if d is None else d)
+        observed.append(t)
+        refresh.append(r)
+    keys_bytes = offsets[-1]
+    if sys.byteorder == "big":
+        for column in (offsets, volume, docs, observed, refresh):
+            column.byteswap()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(keys), keys_bytes, default_days))
+        for column in (offsets, volume, docs, observed, refresh):
+            column.tofile(f)
+        f.write(b"".join(blobs))
+    os.replace(tmp, path)
+    return len(keys)
+
+
+class MetricSnapshot:
+    """
+    Read-only view of a snapshot file through mmap: columns are memoryviews over the mapping (no copies,
+    pages shared by every process that opens the same file) and lookups are binary searches over the
+    offset table. Opening costs one header read, whatever the keyword count.
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        import mmap
+
+        if sys.byteorder != "little":
+            raise ValueError("metric snapshots are little-endian; memoryview columns need a little-endian host")
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, _, default_days = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a keyword metrics snapshot")
+        self._count = count
+        self.default_days = default_days or DEFAULT_REFRESH_DAYS
+        view = memoryview(self._mm)
+        pos = _HEADER.size
+        self._offsets = view[pos:pos + 8 * (count + 1)].cast("Q")
+        pos += 8 * (count + 1)
+        self.volume = view[pos:pos + 8 * count].cast("q")
+        pos += 8 * count
+        self.docs = view[pos:pos + 8 * count].cast("q")
+        pos += 8 * count
+        self.observed_at = view[pos:pos + 8 * count].cast("d")
+        pos += 8 * count
+        self.refresh_days = view[pos:pos + 8 * count].cast("d")
+        pos += 8 * count
+        self._keys_start = pos
+        self._view = view
+        self._views = [view, self._offsets, self.volume, self.docs, self.observed_at, self.refresh_days]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def key(self, i: int) -> str:
+        return self._key_bytes(i).decode("utf-8")
+
+    def _key_bytes(self, i: int) -> bytes:
+        return self._mm[self._keys_start + self._offsets[i]:self._keys_start + self._offsets[i + 1]]
+
+    def _compare(self, i: int, target: bytes) -> int:
+        """Sign of key i vs `target` in byte order, read through a memoryview slice (no copy per probe)."""
+        key = self._view[self._keys_start + self._offsets[i]:self._keys_start + self._offsets[i + 1]]
+        # 정렬된 키는 대부분 앞쪽 몇 바이트에서 갈리므로 바이트 단위 비교로 충분
+        for a, b in zip(key, target):
+            if a != b:
+                return a - b
+        return len(key) - len(target)
+
+    def find(self, keyword: str) -> int:
+        """Row index of `keyword` (normalized), or -1."""
+        target = normalize_keyword(keyword).encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._compare(mid, target) < 0:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._compare(lo, target) == 0 else -1
+
+    def __contains__(self, keyword: str) -> bool:
+        return self.find(keyword) >= 0
+
+    def latest(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """Same shape as MetricStore.latest() (plus refresh_days); None unless a doc count is known."""
+        i = self.find(keyword)
+        if i < 0 or self.docs[i] < 0:
+            return None
+        volume = self.volume[i]
+        return {"keyword": keyword, "volume": volume if volume >= 0 else None, "docs": self.docs[i],
+                "observed_at": self.observed_at[i], "refresh_days": self.refresh_days[i]}
+
+    def is_fresh(self, keyword: str, observed_at: float, now: Optional[float] = None) -> bool:
+        """RefreshPlanner.is_fresh() with the intervals (and the default for unknown keywords) frozen at build time."""
+        i = self.find(keyword)
+        interval = self.refresh_days[i] if i >= 0 else self.default_days
+        return ((now or time.time()) - observed_at) / 86400 <= interval
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.key(i) for i in range(self._count))
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._mm.close()
+
+
+def collect_entries(store: MetricStore, planner, sidecars: Sequence[str] = ()) -> Dict[str, Entry]:
+    """
+    Latest metrics per keyword from the history store (with adaptive refresh intervals) and from report
+    sidecars (observed at the file's modification time). The newest observation of each keyword wins.
+    """
+    entries: Dict[str, Entry] = {}
+    for key, state in planner.states.items():
+        entries[key] = (state.volume, state.docs, state.observed_at, state.interval_days)
+    if sidecars:
+        try:
+            from scenarios import load_records
+        except ImportError:
+            from src.scenarios import load_records
+        for path in sidecars:
+            observed_at = os.path.getmtime(path)
+            records = load_records([path])
+            for keyword, volume, docs in zip(records.keywords, records.volumes, records.docs):
+                key = normalize_keyword(keyword)
+                old = entries.get(key)
+                if old is None or old[2] < observed_at:
+                    entries[key] = (volume, docs, observed_at, old[3] if old else planner.default_days)
+    return entries
+
+
+def iter_lookups(snapshot: MetricSnapshot, keywords: Iterable[str]) -> Iterator[str]:
+    for keyword in keywords:
+        i = snapshot.find(keyword)
+        if i < 0:
+            yield f"   ❓ '{keyword}': not in snapshot"
+        else:
+            age = (time.time() - snapshot.observed_at[i]) / 86400
+            yield (f"   🔎 '{keyword}': volume {snapshot.volume[i]}, docs {snapshot.docs[i]}, "
+                   f"{age:.1f} days old (refresh every {snapshot.refresh_days[i]:.1f} days)")
+
+
+def snapshot_from_args(args) -> Optional[MetricSnapshot]:
+    return MetricSnapshot(args.snapshot) if getattr(args, "snapshot", None) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile stored keyword metrics into a read-only mmap snapshot")
+    parser.add_argument("inputs", nargs="*", help="Report sidecars (.csv / .jsonl) to include besides the history")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="Keyword history store")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT_PATH, help="Snapshot file to write")
+    parser.add_argument("--lookup", action="append", default=[],
+                        help="Only look keywords up in an existing snapshot (--out), repeatable")
+    add_refresh_args(parser)
+    args = parser.parse_args()
+
+    if args.lookup:
+        snapshot = MetricSnapshot(args.out)
+        print(f"📦 [Metric Snapshot] {args.out}: {len(snapshot)} keywords")
+        for line in iter_lookups(snapshot, args.lookup):
+            print(line)
+        snapshot.close()
+        return
+
+    print(f"📦 [Metric Snapshot] History: {args.history}")
+    start = time.perf_counter()
+    store = MetricStore(args.history)
+    planner = planner_from_args(args, store)
+    entries = collect_entries(store, planner, args.inputs)
+    store.close()
+    count = build_snapshot(args.out, entries, planner.default_days)
+    size = os.path.getsize(args.out)
+    print(f"   ✅ {count} keywords -> {args.out} ({size / 1024:.1f} KiB, {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
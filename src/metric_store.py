@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from distributed import normalize_keyword
+    from history_config import DEFAULT_HISTORY_PATH
+except ImportError:
+    from src.distributed import normalize_keyword
+    from src.history_config import DEFAULT_HISTORY_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    key TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    volume INTEGER,
+    docs INTEGER,
+    comp TEXT,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_by_key ON observations (key, observed_at);
+"""
+
+
+class MetricStore:
+    """
+    Append-only history of verified keyword metrics (one row per API observation), kept in SQLite
+    so that later runs can reuse what earlier runs paid for.
+    Writes are buffered and flushed every `flush_every` rows and on close().
+    The connection may be shared by pipeline worker threads (calls are serialized by a lock).
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH, flush_every: int = 200):
+        import sqlite3  # lazy: 근사 모드 등 이력이 필요할 때만 로드
+
+        self.path = path
+        self.flush_every = flush_every
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending: List[Tuple[Any, ...]] = []
+        # 아직 기록되지 않은 최신 관측값 (latest()가 매번 flush/commit하지 않도록)
+        self._pending_latest: Dict[str, Tuple[Any, ...]] = {}
+
+    def record(self, keyword: str, volume: Optional[int], docs: Optional[int], comp: Optional[str] = None,
+               observed_at: Optional[float] = None) -> None:
+        row = (normalize_keyword(keyword), keyword, volume, docs, comp, observed_at or time.time())
+        with self._lock:
+            self._pending.append(row)
+            if docs is not None:
+                self._pending_latest[row[0]] = row
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO observations (key, keyword, volume, docs, comp, observed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+            self._pending = []
+            self._pending_latest = {}
+
+    def latest(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """Most recent observation with a doc count, or None."""
+        key = normalize_keyword(keyword)
+        with self._lock:
+            pending = self._pending_latest.get(key)
+            row = pending[1:] if pending else self._conn.execute(
+                "SELECT keyword, volume, docs, comp, observed_at FROM observations"
+                " WHERE key = ? AND docs IS NOT NULL ORDER BY observed_at DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"keyword": row[0], "volume": row[1], "docs": row[2], "comp": row[3], "observed_at": row[4]}
+
+    def history(self, keyword: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Observations of one keyword, newest first."""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT volume, docs, comp, observed_at FROM observations WHERE key = ? ORDER BY observed_at DESC LIMIT ?",
+                (normalize_keyword(keyword), limit),
+            ).fetchall()
+        return [{"volume": r[0], "docs": r[1], "comp": r[2], "observed_at": r[3]} for r in rows]
+
+    def iter_observations(self) -> Iterator[Tuple[str, str, Optional[int], Optional[int], Optional[str], float]]:
+        """
+        Every observation as (key, keyword, volume, docs, comp, observed_at), grouped by key and oldest first.
+        Streams from one query; do not write from other threads while iterating.
+        """
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute(
+                "SELECT key, keyword, volume, docs, comp, observed_at FROM observations ORDER BY key, observed_at"
+            )
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 지연시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 호출 결과 분류: 정상 / 정상이지만 값이 0(또는 빈 목록) / 429 / 그 외 HTTP 오류 / 예외(타임아웃, 접속 실패 등) / 서킷 차단 / 사용 가능한 키 없음
+OUTCOMES = ("ok", "zero", "throttled", "http_error", "exception", "circuit_open", "no_credential")
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """200 -> '2xx', 429 -> '4xx', None (no response) -> 'error'."""
+    if status_code is None:
+        return "error"
+    return f"{status_code // 100}xx"
+
+
+def classify_outcome(status_code: Optional[int], empty: bool = False) -> str:
+    if status_code is None:
+        return "exception"
+    if status_code == 429:
+        return "throttled"
+    if status_code >= 400:
+        return "http_error"
+    return "zero" if empty else "ok"
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        total, out = 0, []
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by linear interpolation inside the matching bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for i, c in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if seen + c >= rank and c > 0:
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+            lower = upper
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters for Naver API calls, labelled by endpoint.
+    Thread-safe so that it can be shared by concurrent fetchers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency: Dict[str, Histogram] = {}
+            self.status: Dict[Tuple[str, str], int] = {}
+            self.outcomes: Dict[Tuple[str, str], int] = {}
+            self.retries: Dict[str, int] = {}
+            self.bytes: Dict[str, int] = {}
+            self.cache: Dict[Tuple[str, str], int] = {}
+
+    # --- Recording ---
+    def observe_request(self, endpoint: str, seconds: float, status_code: Optional[int] = None, nbytes: int = 0) -> None:
+        """One HTTP round trip (including failed ones)."""
+        with self._lock:
+            self.latency.setdefault(endpoint, Histogram()).observe(seconds)
+            key = (endpoint, status_class(status_code))
+            self.status[key] = self.status.get(key, 0) + 1
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + nbytes
+
+    def record_outcome(self, endpoint: str, outcome: str) -> None:
+        """Final result of one logical call (after retries)."""
+        with self._lock:
+            key = (endpoint, outcome)
+            self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    def record_retry(self, endpoint: str, count: int = 1) -> None:
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + count
+
+    def record_cache(self, endpoint: str, hit: bool) -> None:
+        with self._lock:
+            key = (endpoint, "hit" if hit else "miss")
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    # --- Export ---
+    def endpoints(self) -> List[str]:
+        names = set(self.latency) | {e for e, _ in self.outcomes} | {e for e, _ in self.cache} | set(self.retries)
+        return sorted(names)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {}
+            for ep in self.endpoints():
+                hist = self.latency.get(ep, Histogram())
+                out[ep] = {
+                    "requests": hist.count,
+                    "latency_seconds": {
+                        "sum": round(hist.sum, 6),
+                        "p50": round(hist.quantile(0.50), 6),
+                        "p95": round(hist.quantile(0.95), 6),
+                        "p99": round(hist.quantile(0.99), 6),
+                        "buckets": {str(b): c for b, c in zip(list(hist.buckets) + ["+Inf"], hist.cumulative())},
+                    },
+                    "status": {sc: n for (e, sc), n in sorted(self.status.items()) if e == ep},
+                    "outcomes": {o: n for (e, o), n in sorted(self.outcomes.items()) if e == ep},
+                    "retries": self.retries.get(ep, 0),
+                    "bytes": self.bytes.get(ep, 0),
+                    "cache": {r: n for (e, r), n in sorted(self.cache.items()) if e == ep},
+                }
+            return out
+
+    def to_prometheus(self, prefix: str = "naver_seo") -> str:
+        """Renders the registry in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Naver API request latency.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for ep, m in snap.items():
+            for bound, c in m["latency_seconds"]["buckets"].items():
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{ep}",le="{bound}"}} {c}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{endpoint="{ep}"}} {m["latency_seconds"]["sum"]}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{ep}"}} {m["requests"]}')
+
+        counters = [
+            ("requests_total", "Naver API requests by status class.", "status", "class"),
+            ("calls_total", "Logical calls by final outcome.", "outcomes", "outcome"),
+            ("cache_lookups_total", "Metric cache lookups.", "cache", "result"),
+        ]
+        for name, help_text, field, label in counters:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for ep, m in snap.items():
+                for value, n in m[field].items():
+                    lines.append(f'{prefix}_{name}{{endpoint="{ep}",{label}="{value}"}} {n}')
+
+        for name, help_text, field in [("retries_total", "Retried requests.", "retries"),
+                                       ("response_bytes_total", "Response body bytes.", "bytes")]:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for ep, m in snap.items():
+                lines.append(f'{prefix}_{name}{{endpoint="{ep}"}} {m[field]}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def write_prometheus_textfile(self, path: str) -> None:
+        """Atomic write (tmp + rename) so node_exporter never reads a partial file."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def summary_markdown(self) -> str:
+        snap = self.snapshot()
+        if not snap:
+            return "No API calls recorded."
+        lines = [
+            "| Endpoint | Requests | p50 (s) | p95 (s) | OK | Zero | Throttled | HTTP Error | Exception | Circuit Open | No Key | Retries | KB | Cache Hit |",
+            "| --- | --- | --- | --- | --- | --- | --- | --- | --- | --- | --- | --- | --- | --- |",
+        ]
+        for ep, m in snap.items():
+            o, c = m["outcomes"], m["cache"]
+            lookups = c.get("hit", 0) + c.get("miss", 0)
+            hit_rate = f"{c.get('hit', 0) / lookups * 100:.0f}%" if lookups else "-"
+            lines.append(
+                f"| {ep} | {m['requests']} | {m['latency_seconds']['p50']:.3f} | {m['latency_seconds']['p95']:.3f} "
+                f"| {o.get('ok', 0)} | {o.get('zero', 0)} | {o.get('throttled', 0)} | {o.get('http_error', 0)} "
+                f"| {o.get('exception', 0)} | {o.get('circuit_open', 0)} | {o.get('no_credential', 0)} | {m['retries']} | {m['bytes'] / 1024:.1f} | {hit_rate} |"
+            )
+        return "\n".join(lines)
+
+
+# 프로세스 전역 레지스트리 (data_fetcher가 기록, 리포트가 내보냄)
+REGISTRY = MetricsRegistry()
+
+
+class StageProfiler:
+    """
+    Accumulates wall-clock time per pipeline stage (expand, fetch, score, report).
+    Stages may be entered many times (e.g. once per keyword); durations add up.
+    Thread-safe: with concurrent stage workers a total is busy time summed over workers,
+    so it can exceed the wall time.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.totals[name] = self.totals.get(name, 0.0) + elapsed
+                self.counts[name] = self.counts.get(name, 0) + 1
+
+    def report(self) -> str:
+        wall = time.perf_counter() - self._started
+        lines = [f"   ⏱️ Stage Profile (wall {wall:.2f}s)"]
+        for name, total in self.totals.items():
+            share = total / wall * 100 if wall else 0.0
+            lines.append(f"      {name:<8} {total:8.3f}s  {share:5.1f}%  ({self.counts[name]} calls)")
+        return "\n".join(lines)
@@ -2,7 +2,6 @@ import sys
 import os
 import argparse
 import time
-import pandas as pd
 from datetime import datetime
 
 # --- Path Setup ---
@@ -12,106 +11,253 @@ if current_dir not in sys.path:
 
 try:
     from data_fetcher import RealDataFetcher
-    from calculator import calculate_saturation, calculate_efficiency
+    from calculator import BLUE_OCEAN_SK
+    from report_writer import StreamingReportWriter, ReportSection, DEFAULT_MD_LIMIT, SERP_DETAIL_COLUMNS
+    from serp_features import SERP_ITEMS, score_rows
+    from metrics import REGISTRY, StageProfiler
+    from distributed import LeaseStore, add_distributed_args, resolve_job, run_worker, wait_for_job
+    from doc_estimator import accuracy_section, add_approx_args, estimator_from_args
+    from synthetic_fetcher import add_synthetic_args, synthetic_from_args, synthetic_from_job, synthetic_meta, synthetic_worker_flags
+    from pipeline import add_pipeline_args, pipeline_from_args, workers_from_args
 except ImportError:
     sys.path.append(os.path.join(current_dir, ".."))
     from src.data_fetcher import RealDataFetcher
-    from src.calculator import calculate_saturation, calculate_efficiency
+    from src.calculator import BLUE_OCEAN_SK
+    from src.report_writer import StreamingReportWriter, ReportSection, DEFAULT_MD_LIMIT, SERP_DETAIL_COLUMNS
+    from src.serp_features import SERP_ITEMS, score_rows
+    from src.metrics import REGISTRY, StageProfiler
+    from src.distributed import LeaseStore, add_distributed_args, resolve_job, run_worker, wait_for_job
+    from src.doc_estimator import accuracy_section, add_approx_args, estimator_from_args
+    from src.synthetic_fetcher import add_synthetic_args, synthetic_from_args, synthetic_from_job, synthetic_meta, synthetic_worker_flags
+    from src.pipeline import add_pipeline_args, pipeline_from_args, workers_from_args
+
+COLUMNS = ['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score', 'SERP_Score', 'SmartBlock_Type']
+
+
+def fetch_docs(fetcher, kw, vol, estimator=None, comp=None):
+    """
+    Doc count of one related keyword as a partial row (the pipeline's fetch stage).
+    None = Search API failed after retries.
+    With an estimator (approximate mode) the doc count may be estimated instead of fetched.
+    When the Search API was called, its top results are kept under SERP_ITEMS for score_rows.
+    """
+    serp = {}
+
+    def get_doc_count(keyword):
+        result = fetcher.get_serp(keyword)
+        if result is None:
+            return None
+        serp.update(result)
+        return result["total"]
+
+    if estimator is None:
+        docs, source = get_doc_count(kw), None
+    else:
+        docs, source = estimator.resolve(kw, vol, comp, get_doc_count) or (None, None)
+    if docs is None:
+        # 0으로 채우면 Sk=0 블루오션으로 오인되므로 제외
+        return None
+    row = {"Keyword": kw, "Monthly_Search_Volume": vol, "Total_Docs": docs}
+    if serp:
+        row[SERP_ITEMS] = serp["items"]
+    if source is not None:
+        row["Docs_Source"] = source
+    return row
+
+
+def score_keyword(fetcher, kw, vol, profiler, estimator=None, comp=None):
+    """Doc count + Sk/Ek/SERP features for one related keyword. None = Search API failed after retries."""
+    with profiler.stage("fetch"):
+        row = fetch_docs(fetcher, kw, vol, estimator, comp)
+    if row is None:
+        return None
+    with profiler.stage("score"):
+        return score_rows([row])[0]
+
+
+def open_report(seed, args, approx=False):
+    """Creates the streaming writer with the Hot Topics / Blue Ocean sections."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = f"reports/NICHE_{seed.replace(' ', '_')}_{timestamp}.md"
+    # 근사 모드: 문서 수를 추정한 행은 Docs_Source=estimate 로 표시
+    writer = StreamingReportWriter(report_file, columns=COLUMNS + SERP_DETAIL_COLUMNS + (['Docs_Source'] if approx else []),
+                                   chunk_rows=args.chunk_rows)
+
+    # Section 1: High Volume (Hot Topics)
+    writer.add_section(ReportSection(
+        "## 1. 🔥 화제의 키워드 (High Volume Top 20)",
+        sort_by='Monthly_Search_Volume',
+        columns=COLUMNS,
+        limit=20,
+        description="*People are searching for this right now.*",
+    ))
+
+    # Section 2: Blue Ocean (Sk < 1.0)
+    writer.add_section(ReportSection(
+        f"## 2. 💎 블루오션 기회 ($S_k < {BLUE_OCEAN_SK}$)",
+        sort_by='Efficiency_Score',
+        columns=COLUMNS,
+        where=lambda row: row['Saturation_Index'] < BLUE_OCEAN_SK,
+        limit=args.md_limit,
+        description="*Good volume, Low content supply. Chance to rank!*",
+        empty_message="No Blue Ocean keywords found in this niche.",
+    ))
+    return writer, report_file, timestamp
+
+
+def finish_report(writer, report_file, seed, timestamp, profiler, metrics=REGISTRY, extra="", epilogue=""):
+    if writer.rows_written == 0:
+        print("   ❌ No results to report.")
+        return
+
+    preamble = f"""# 🦈 Niche Hunter Report: {seed}
+**Timestamp:** {timestamp}
+**Total Analyzed:** {writer.rows_written} keywords
+**Full Data:** {writer.sidecar_hint()}
+{extra}"""
+
+    with profiler.stage("report"):
+        writer.close(preamble=preamble, epilogue=epilogue, metrics=metrics)
+
+    print(f"   📝 Niche Report generated: {report_file}")
+
+
+def merge_job(store, job, args, profiler):
+    """Merge-and-rank: streams every worker's scored rows into the usual report."""
+    progress = store.progress(job["job_id"])
+    if progress["shards_left"]:
+        print(f"   ⚠️ Job {job['job_id']} is not finished ({progress['shards_left']} shards left). Merging partial results.")
+    # Docs_Source 열 여부는 병합 CLI 플래그가 아니라 작업 등록 시점의 모드를 따름
+    writer, report_file, timestamp = open_report(job["seed"], args, approx=job["meta"].get("approx", args.approx))
+    with profiler.stage("report"):
+        for row in store.iter_results(job["job_id"]):
+            writer.write_row(row)
+    extra = (f"**Distributed Job:** `{job['job_id']}` ({progress['workers']} workers, "
+             f"{progress['failed']} keywords skipped after API failures)\n")
+    if job["meta"].get("synthetic_seed") is not None:
+        extra += f"**Data:** Synthetic (seed {job['meta']['synthetic_seed']})\n"
+    # API 지표는 각 워커 프로세스에 남아 있으므로 병합 리포트에는 넣지 않음
+    finish_report(writer, report_file, job["seed"], timestamp, profiler, metrics=None, extra=extra)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Naver SEO Niche Hunter")
-    parser.add_argument("--seed", type=str, required=True, help="Category/Topic to hunt (e.g. '미국 주식')")
+    parser.add_argument("--seed", type=str, help="Category/Topic to hunt (e.g. '미국 주식'). Required except for worker/merge")
+    parser.add_argument("--md-limit", type=int, default=DEFAULT_MD_LIMIT, help="Max rows in the Blue Ocean Markdown table (full data goes to CSV/JSONL)")
+    parser.add_argument("--chunk-rows", type=int, default=0, help="Split CSV/JSONL sidecars every N rows (0 = single file)")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown (discover, expand, dedupe, fetch, score, rank, sink, report)")
+    add_pipeline_args(parser)
+    add_distributed_args(parser)
+    add_approx_args(parser)
+    add_synthetic_args(parser)
     args = parser.parse_args()
-    
+    profiler = StageProfiler(enabled=args.profile)
+    synthetic = synthetic_from_args(args)
+
+    if args.role in ("worker", "merge"):
+        store = LeaseStore(args.store, lease_seconds=args.lease_seconds)
+        job = resolve_job(store, "niche", args.job)
+        if job is None:
+            print(f"   ❌ No niche job found in {args.store}.")
+            return
+        if args.role == "worker":
+            try:
+                # 데이터 원천은 작업 등록 시점의 모드를 따름 (합성 작업에 실제 API를 쓰지 않도록)
+                synthetic = synthetic_from_job(args, job["meta"])
+            except ValueError as e:
+                print(f"   ❌ {e}")
+                return
+            print(f"🦈 [Niche Hunter] Worker joining job {job['job_id']} ('{job['seed']}')")
+            fetcher = synthetic or RealDataFetcher()
+            estimator = estimator_from_args(args, threshold=BLUE_OCEAN_SK, seeds=[job["seed"]])
+            stats = run_worker(store, job["job_id"], lambda kw, vol, comp: score_keyword(fetcher, kw, vol, profiler, estimator, comp),
+                               workers=workers_from_args(args))
+            print(f"   ✅ Worker finished: {stats['shards']} shards, {stats['done']} scored, {stats['failed']} skipped.")
+            if estimator:
+                print(accuracy_section(estimator))
+                estimator.close()
+        else:
+            merge_job(store, job, args, profiler)
+        if args.profile:
+            print(profiler.report())
+        return
+
+    if not args.seed:
+        parser.error("--seed is required for the local and coordinator roles")
     seed = args.seed
     print(f"🦈 [Niche Hunter] Hunting in category: '{seed}'")
 
-    # 1. Get Related Keywords
-    print("   📡 Fetching popular related keywords...")
-    fetcher = RealDataFetcher()
-    related_keywords = fetcher.get_related_keywords(seed)
-    
-    if not related_keywords:
-        print("   ❌ No related keywords found or API error.")
-        return
-        
-    print(f"   ✅ Found {len(related_keywords)} candidate keywords (Volume >= 100).")
-    
-    # 2. Analyze (Doc Count & Metrics)
-    print("   📊 Analyzing competition (This may take a while)...")
-    results = []
-    
-    total_kws = len(related_keywords)
-    for i, item in enumerate(related_keywords):
-        kw = item['keyword']
-        vol = item['volume']
-        
-        # Progress bar surrogate
-        print(f"      [{i+1}/{total_kws}] Checking '{kw}'...", end="\r")
-        
-        # Get Doc Count
-        docs = fetcher.get_doc_count(kw)
-        
-        # Calculate Metrics
-        try:
-            sk = calculate_saturation(docs, vol)
-            ek = calculate_efficiency(sk, vol)
-            
-            results.append({
-                "Keyword": kw,
-                "Monthly_Search_Volume": vol,
-                "Total_Docs": docs,
-                "Saturation_Index": sk,
-                "Efficiency_Score": ek
-            })
-        except Exception:
-            pass
-            
-    print("\n   ✅ Analysis Complete.")
-    
-    if not results:
-        print("   ❌ No results to report.")
-        return
+    fetcher = synthetic or RealDataFetcher()
 
-    df = pd.DataFrame(results)
-    
-    # 3. Sections
-    # Section 1: High Volume (Hot Topics)
-    hot_topics = df.sort_values(by='Monthly_Search_Volume', ascending=False).head(20)
-    
-    # Section 2: Blue Ocean (Sk < 1.0)
-    blue_ocean = df[df['Saturation_Index'] < 1.0].sort_values(by='Efficiency_Score', ascending=False)
+    def expand(seed):
+        # 1. Get Related Keywords
+        print("   📡 Fetching popular related keywords...")
+        related = fetcher.get_related_keywords(seed)
+        if related:
+            print(f"   ✅ Found {len(related)} candidate keywords (Volume >= 100).")
+        return related
 
-    # 4. Reporting
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    os.makedirs('reports', exist_ok=True)
-    report_file = f"reports/NICHE_{seed.replace(' ', '_')}_{timestamp}.md"
-    
-    # Formatting
-    for d in [hot_topics, blue_ocean]:
-        if not d.empty:
-            d['Saturation_Index'] = d['Saturation_Index'].round(2)
-            d['Efficiency_Score'] = d['Efficiency_Score'].round(2)
-
-    report_content = f"""# 🦈 Niche Hunter Report: {seed}
-**Timestamp:** {timestamp}
-**Total Analyzed:** {len(df)} keywords
+    if args.role == "coordinator":
+        # 작업 등록만 하므로 발견 → 확장 → 중복 제거까지만 실행
+        related_keywords = []
+        pipe = pipeline_from_args(args, profiler)
+        pipe.source("discover", lambda: [seed]).flat_map("expand", expand)
+        pipe.dedupe("dedupe", key=lambda item: item['keyword']).sink("sink", related_keywords.append)
+        pipe.run()
+        if not related_keywords:
+            print("   ❌ No related keywords found or API error.")
+            return
+        store = LeaseStore(args.store, lease_seconds=args.lease_seconds)
+        meta = {**synthetic_meta(args), "approx": args.approx}
+        job_id = store.create_job("niche", seed, ((item['keyword'], item['volume'], item.get('comp')) for item in related_keywords),
+                                  num_shards=args.shards, meta=meta)
+        print(f"   📦 Job {job_id} enqueued in {args.store} ({args.shards} shards).")
+        print(f"      Start workers with: python src/niche_hunter.py --role worker --store {args.store} --job {job_id}"
+              f"{synthetic_worker_flags(meta)}")
+        if args.wait:
+            wait_for_job(store, job_id)
+            merge_job(store, store.job(job_id), args, profiler)
+        return
 
-## 1. 🔥 화제의 키워드 (High Volume Top 20)
-*People are searching for this right now.*
+    # 2. Report Sections (rows are streamed to CSV/JSONL as they are scored)
+    estimator = estimator_from_args(args, threshold=BLUE_OCEAN_SK, seeds=[seed])
+    writer, report_file, timestamp = open_report(seed, args, approx=estimator is not None)
 
-{hot_topics[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score']].to_markdown(index=False)}
+    def sink(row):
+        writer.store_row(row)
+        # Progress bar surrogate
+        print(f"      [{writer.rows_written}/{pipe.stats['dedupe'].emitted}] Checked '{row['Keyword']}'...", end="\r")
 
-## 2. 💎 블루오션 기회 ($S_k < 1.0$)
-*Good volume, Low content supply. Chance to rank!*
+    # 3. Analyze (Doc Count & Metrics): discover → expand → dedupe → fetch (parallel) → score → rank → sink
+    print("   📊 Analyzing competition (This may take a while)...")
+    pipe = pipeline_from_args(args, profiler)
+    pipe.source("discover", lambda: [seed])
+    pipe.flat_map("expand", expand)
+    pipe.dedupe("dedupe", key=lambda item: item['keyword'])
+    pipe.map("fetch", lambda item: fetch_docs(fetcher, item['keyword'], item['volume'], estimator, item.get('comp')))
+    pipe.batch("score", score_rows)
+    pipe.tap("rank", writer.rank_row)
+    pipe.sink("sink", sink)
+    pipe.run()
 
-{blue_ocean[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score']].to_markdown(index=False) if not blue_ocean.empty else "No Blue Ocean keywords found in this niche."}
-"""
+    if not pipe.stats["expand"].emitted:
+        print("   ❌ No related keywords found or API error.")
+        if estimator:
+            estimator.close()
+        return
+    print("\n   ✅ Analysis Complete.")
+    failed = pipe.stats["fetch"].dropped + pipe.stats["fetch"].errors
+    if failed:
+        print(f"   ⚠️ {failed} keywords skipped (Search API failed after retries).")
 
-    with open(report_file, "w", encoding="utf-8") as f:
-        f.write(report_content)
-        
-    print(f"   📝 Niche Report generated: {report_file}")
+    # 4. Reporting
+    extra = f"**Data:** Synthetic (seed {args.synthetic_seed})\n" if synthetic else ""
+    finish_report(writer, report_file, seed, timestamp, profiler, extra=extra, epilogue=accuracy_section(estimator))
+    if estimator:
+        estimator.close()
+    if args.profile:
+        print(profiler.report())
+        print(pipe.summary())
 
 if __name__ == "__main__":
     main()
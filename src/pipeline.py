@@ -0,0 +1,328 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from metrics import StageProfiler
+except ImportError:
+    from src.metrics import StageProfiler
+
+# 스테이지 사이 큐 크기 기본값. 큐가 가득 차면 앞 스테이지가 기다림 (역압)
+DEFAULT_QUEUE_SIZE = 256
+
+# 스테이지별 기본 동시성: 네트워크 I/O인 fetch만 병렬 (실제 호출 속도는 키별 토큰 버킷이 제한)
+DEFAULT_WORKERS = {"fetch": 4}
+
+# batch 스테이지가 한 번에 처리하는 최대 항목 수 (큐에 이미 쌓인 만큼만 모으므로 지연은 늘지 않음)
+DEFAULT_BATCH_SIZE = 256
+
+# 진입점들이 공통으로 쓰는 스테이지 이름
+STAGES = ("discover", "expand", "dedupe", "fetch", "score", "rank", "sink")
+
+# 항상 워커 1개로 도는 스테이지 (source/sink, 공유 상태를 락 없이 갱신하는 dedupe/tap) → --workers로 바꿀 수 없음
+SERIAL_STAGES = ("discover", "dedupe", "rank", "sink")
+
+_END = object()
+
+
+class StageStats:
+    """Per-stage counters. `busy` sums worker time inside the stage function; `blocked` is time spent waiting on a full output queue."""
+
+    __slots__ = ("name", "workers", "received", "emitted", "dropped", "errors", "busy", "blocked", "_lock")
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.received = 0
+        self.emitted = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **deltas: float) -> None:
+        with self._lock:
+            for field, delta in deltas.items():
+                setattr(self, field, getattr(self, field) + delta)
+
+
+class _Stage:
+    __slots__ = ("name", "kind", "fn", "workers", "batch_size", "stats")
+
+    def __init__(self, name: str, kind: str, fn: Callable, workers: int, batch_size: int = 1):
+        self.name = name
+        self.kind = kind  # source / map / flat / batch / sink
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.stats = StageStats(name, workers)
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each with its own worker threads, so rows stream through:
+    scoring and report writing overlap with the network calls of the fetch stage, and a slow stage
+    makes the ones before it wait instead of piling up items in memory.
+
+    Usage:
+        pipe = Pipeline(profiler, workers={"fetch": 8})
+        pipe.source("discover", lambda: trends)
+        pipe.flat_map("expand", lambda trend: expand_keyword(trend)[0])
+        pipe.dedupe("dedupe")
+        pipe.map("fetch", fetch)          # returning None drops the item (e.g. API failure)
+        pipe.batch("score", score_rows)   # list in, list out (vectorized over whatever is queued)
+        pipe.tap("rank", writer.rank_row)
+        pipe.sink("sink", writer.store_row)
+        pipe.run()
+
+    The sink runs in the calling thread (safe for UI updates and non thread-safe writers).
+    An exception in a stage function counts as an error for that item (or batch) and calls `on_error(stage, item, exc)`;
+    with `fail_fast` the run is cancelled instead and the exception is re-raised by run().
+    """
+
+    def __init__(self, profiler: Optional[StageProfiler] = None, workers: Optional[Dict[str, int]] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, on_error: Optional[Callable[[str, Any, BaseException], None]] = None,
+                 fail_fast: bool = False):
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.fail_fast = fail_fast
+        self.stages: List[_Stage] = []
+        self.stats: Dict[str, StageStats] = {}
+        self._cancel = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    # --- Building ---
+    def _add(self, name: str, kind: str, fn: Callable, workers: Optional[int], batch_size: int = 1) -> "Pipeline":
+        if kind in ("source", "sink") or workers is None:
+            workers = 1 if kind in ("source", "sink") else max(1, self.workers.get(name, 1))
+        stage = _Stage(name, kind, fn, workers, batch_size)
+        self.stages.append(stage)
+        self.stats[name] = stage.stats
+        return self
+
+    def source(self, name: str, fn: Callable[[], Iterable[Any]]) -> "Pipeline":
+        """`fn()` yields the initial items (runs in its own thread)."""
+        return self._add(name, "source", fn, 1)
+
+    def map(self, name: str, fn: Callable[[Any], Any], workers: Optional[int] = None) -> "Pipeline":
+        """One item in, one item out; None drops the item."""
+        return self._add(name, "map", fn, workers)
+
+    def flat_map(self, name: str, fn: Callable[[Any], Iterable[Any]], workers: Optional[int] = None) -> "Pipeline":
+        """One item in, any number out."""
+        return self._add(name, "flat", fn, workers)
+
+    def batch(self, name: str, fn: Callable[[List[Any]], Iterable[Any]], size: int = DEFAULT_BATCH_SIZE,
+              workers: Optional[int] = None) -> "Pipeline":
+        """
+        `fn(items)` gets up to `size` items at once (whatever is already queued, never waiting for more)
+        and returns their results in any number; None results are dropped. For vectorized stages.
+        """
+        return self._add(name, "batch", fn, workers, max(1, size))
+
+    def tap(self, name: str, fn: Callable[[Any], Any]) -> "Pipeline":
+        """Calls `fn(item)` for its side effect and passes the item on (single worker, so `fn` needs no lock)."""
+        def passthrough(item):
+            fn(item)
+            return item
+        return self._add(name, "map", passthrough, 1)
+
+    def dedupe(self, name: str = "dedupe", key: Optional[Callable[[Any], Any]] = None) -> "Pipeline":
+        """Drops items whose key was already seen (single worker, so no lock is needed)."""
+        seen = set()
+
+        def first_seen(item):
+            k = item if key is None else key(item)
+            if k in seen:
+                return None
+            seen.add(k)
+            return item
+        return self._add(name, "map", first_seen, 1)
+
+    def sink(self, name: str, fn: Callable[[Any], None]) -> "Pipeline":
+        return self._add(name, "sink", fn, 1)
+
+    # --- Running ---
+    def cancel(self) -> None:
+        """Stops feeding new items; items already queued are drained without processing."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _fail(self, stage: _Stage, item: Any, exc: BaseException) -> None:
+        stage.stats.add(errors=1)
+        if self.fail_fast:
+            if self._error is None:
+                self._error = exc
+            self.cancel()
+        elif self.on_error is not None:
+            self.on_error(stage.name, item, exc)
+
+    def _put(self, stage: _Stage, out_q: "queue.Queue", item: Any) -> None:
+        started = time.perf_counter()
+        out_q.put(item)
+        stage.stats.add(emitted=1, blocked=time.perf_counter() - started)
+
+    def _call(self, stage: _Stage, item: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            with self.profiler.stage(stage.name):
+                return stage.fn(item)
+        finally:
+            stage.stats.add(busy=time.perf_counter() - started)
+
+    def _run_source(self, stage: _Stage, out_q: "queue.Queue") -> None:
+        started = time.perf_counter()
+        try:
+            with self.profiler.stage(stage.name):
+                items = stage.fn()
+            for item in items:
+                if self.cancelled:
+                    break
+                stage.stats.add(received=1)
+                self._put(stage, out_q, item)
+        except Exception as e:
+            self._fail(stage, None, e)
+        finally:
+            stage.stats.add(busy=time.perf_counter() - started - stage.stats.blocked)
+            out_q.put(_END)
+
+    def _run_worker(self, stage: _Stage, in_q: "queue.Queue", out_q: "queue.Queue", done: List[int],
+                    lock: threading.Lock) -> None:
+        while True:
+            item = in_q.get()
+            if item is _END:
+                in_q.put(_END)  # 같은 스테이지의 다른 워커도 종료하도록 되돌려 놓음
+                with lock:
+                    done[0] += 1
+                    last = done[0] == stage.workers
+                if last:
+                    out_q.put(_END)
+                return
+            if stage.kind == "batch":
+                item = self._take_batch(stage, in_q, item)
+            stage.stats.add(received=len(item) if stage.kind == "batch" else 1)
+            if self.cancelled:
+                continue
+            try:
+                result = self._call(stage, item)
+            except Exception as e:
+                self._fail(stage, item, e)
+                continue
+            if stage.kind == "batch":
+                for out in result or ():
+                    if out is None:
+                        stage.stats.add(dropped=1)
+                    else:
+                        self._put(stage, out_q, out)
+            elif stage.kind == "flat":
+                for out in result or ():
+                    self._put(stage, out_q, out)
+            elif result is None:
+                stage.stats.add(dropped=1)
+            else:
+                self._put(stage, out_q, result)
+
+    @staticmethod
+    def _take_batch(stage: _Stage, in_q: "queue.Queue", first: Any) -> List[Any]:
+        items = [first]
+        while len(items) < stage.batch_size:
+            try:
+                item = in_q.get_nowait()
+            except queue.Empty:
+                break
+            if item is _END:
+                in_q.put(_END)  # 다음 get()에서 종료 처리
+                break
+            items.append(item)
+        return items
+
+    def run(self) -> Dict[str, StageStats]:
+        if not self.stages or self.stages[0].kind != "source" or self.stages[-1].kind != "sink":
+            raise ValueError("A pipeline needs a source first and a sink last")
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages[:-1]]
+        threads = [threading.Thread(target=self._run_source, args=(self.stages[0], queues[0]),
+                                    name=f"pipeline-{self.stages[0].name}", daemon=True)]
+        for i, stage in enumerate(self.stages[1:-1], start=1):
+            done, lock = [0], threading.Lock()
+            for n in range(stage.workers):
+                threads.append(threading.Thread(target=self._run_worker, args=(stage, queues[i - 1], queues[i], done, lock),
+                                                name=f"pipeline-{stage.name}-{n}", daemon=True))
+        for t in threads:
+            t.start()
+
+        sink, last_q = self.stages[-1], queues[-1]
+        try:
+            while True:
+                item = last_q.get()
+                if item is _END:
+                    break
+                sink.stats.add(received=1)
+                if self.cancelled:
+                    continue
+                try:
+                    self._call(sink, item)
+                    sink.stats.add(emitted=1)
+                except Exception as e:
+                    self._fail(sink, item, e)
+        except BaseException:
+            # Ctrl+C 등: 앞 스테이지가 새 항목을 만들지 않도록 (데몬 스레드라 프로세스 종료를 막지 않음)
+            self.cancel()
+            raise
+        for t in threads:
+            t.join()
+        if self._error is not None:
+            raise self._error
+        return self.stats
+
+    def summary(self) -> str:
+        lines = ["   🧵 Pipeline Stages",
+                 f"      {'stage':<9} {'workers':>7} {'in':>8} {'out':>8} {'dropped':>8} {'errors':>6} {'busy':>8} {'blocked':>8}"]
+        for s in self.stats.values():
+            lines.append(f"      {s.name:<9} {s.workers:>7} {s.received:>8} {s.emitted:>8} {s.dropped:>8} {s.errors:>6} "
+                         f"{s.busy:>7.2f}s {s.blocked:>7.2f}s")
+        return "\n".join(lines)
+
+
+def parse_workers(specs: Iterable[str]) -> Dict[str, int]:
+    """['fetch=8,score=2', 'expand=1'] -> {'fetch': 8, 'score': 2, 'expand': 1}"""
+    tunable = [name for name in STAGES if name not in SERIAL_STAGES]
+    out: Dict[str, int] = {}
+    for spec in specs:
+        for part in spec.split(","):
+            if not part.strip():
+                continue
+            name, _, value = part.partition("=")
+            name = name.strip()
+            if name in SERIAL_STAGES:
+                raise ValueError(f"Invalid --workers entry '{part}' ('{name}' always runs on a single worker)")
+            if name not in STAGES or not value.strip().isdigit():
+                raise ValueError(f"Invalid --workers entry '{part}' (expected STAGE=N, STAGE in {', '.join(tunable)})")
+            out[name] = int(value)
+    return out
+
+
+def add_pipeline_args(parser) -> None:
+    """Flags shared by the entry points for the staged pipeline."""
+    group = parser.add_argument_group("pipeline")
+    group.add_argument("--workers", action="append", default=[], metavar="STAGE=N",
+                       help=f"Threads per stage, e.g. fetch=8,score=2 (default: fetch={DEFAULT_WORKERS['fetch']}, others 1)")
+    group.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                       help="Bounded queue size between stages (backpressure)")
+
+
+def workers_from_args(args) -> Dict[str, int]:
+    try:
+        return parse_workers(args.workers)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+
+
+def pipeline_from_args(args, profiler: Optional[StageProfiler] = None, **kwargs) -> Pipeline:
+    return Pipeline(profiler, workers=workers_from_args(args), queue_size=args.queue_size, **kwargs)
@@ -0,0 +1,304 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from keyword_expander import BROAD_TOPIC_MAP, expand_keyword
+    from metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from metric_snapshot import build_snapshot, collect_entries
+    from metrics import REGISTRY, StageProfiler
+    from pipeline import add_pipeline_args, pipeline_from_args
+    from refresh_planner import CALLS_PER_KEYWORD, add_refresh_args, planner_from_args
+    from report_writer import StreamingReportWriter, markdown_table
+    from synthetic_fetcher import add_synthetic_args, synthetic_from_args
+    from distributed import normalize_keyword
+except ImportError:
+    sys.path.append(os.path.join(current_dir, ".."))
+    from src.keyword_expander import BROAD_TOPIC_MAP, expand_keyword
+    from src.metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from src.metric_snapshot import build_snapshot, collect_entries
+    from src.metrics import REGISTRY, StageProfiler
+    from src.pipeline import add_pipeline_args, pipeline_from_args
+    from src.refresh_planner import CALLS_PER_KEYWORD, add_refresh_args, planner_from_args
+    from src.report_writer import StreamingReportWriter, markdown_table
+    from src.synthetic_fetcher import add_synthetic_args, synthetic_from_args
+    from src.distributed import normalize_keyword
+
+# 1회 실행의 기본 API 호출 한도 (키워드당 검색량 1회 + 문서 수 1회)
+DEFAULT_API_BUDGET = 2000
+
+# 실시간 트렌드는 확장 전 상위 N개만
+DEFAULT_TRENDS = 10
+
+COLUMNS = ['Keyword', 'Group', 'Monthly_Search_Volume', 'Total_Docs', 'Status']
+
+
+def parse_window(text: str) -> Tuple[int, int]:
+    """'01:00-06:00' -> (60, 360) minutes after midnight (the window may wrap past midnight)."""
+    try:
+        start, end = (part.strip() for part in text.split("-"))
+        to_min = lambda hhmm: int(hhmm.split(":")[0]) * 60 + int(hhmm.split(":")[1])
+        return to_min(start) % 1440, to_min(end) % 1440
+    except (ValueError, IndexError):
+        raise ValueError(f"Invalid --off-hours '{text}' (expected HH:MM-HH:MM)")
+
+
+def window_bounds(window: Tuple[int, int], now: datetime) -> Tuple[datetime, datetime]:
+    """(start, end) of the window occurrence that contains `now`, or else the next one."""
+    start_min, end_min = window
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    length = (end_min - start_min) % 1440 or 1440
+    for day in (-1, 0, 1):
+        start = midnight + timedelta(days=day, minutes=start_min)
+        end = start + timedelta(minutes=length)
+        if now < end:
+            return start, end
+    raise AssertionError("unreachable")
+
+
+def warm_targets(trends: List[str]) -> Dict[str, List[str]]:
+    """Group name -> expanded keywords: every BROAD_TOPIC_MAP topic, then each trending keyword."""
+    groups: Dict[str, List[str]] = {}
+    for topic in BROAD_TOPIC_MAP:
+        groups[topic] = expand_keyword(topic)[0]
+    for trend in trends:
+        groups.setdefault(f"trend: {trend}", expand_keyword(trend)[0])
+    return groups
+
+
+class WarmPlan:
+    """
+    Which keywords of each group to fetch: cold (never stored) and stale (past the refresh interval)
+    keywords only, interleaved round-robin across groups so a tight API budget still covers every topic.
+    """
+
+    def __init__(self, groups: Dict[str, List[str]], planner, now: Optional[float] = None):
+        now = now or time.time()
+        self.groups = groups
+        self.status: Dict[str, str] = {}  # normalized key -> warm / stale / cold / fetched / failed
+        self.group_keys: Dict[str, List[str]] = {}
+        self.group_of: Dict[str, str] = {}  # 키워드가 처음 나온 그룹
+        queues: List[List[str]] = []
+        for name, keywords in groups.items():
+            keys, todo = [], []
+            for kw in keywords:
+                key = normalize_keyword(kw)
+                keys.append(key)
+                if key in self.status:
+                    continue  # 다른 그룹과 겹치는 키워드
+                self.group_of[key] = name
+                state = planner.state(kw)
+                if state is None:
+                    self.status[key] = "cold"
+                elif state.is_stale(now):
+                    self.status[key] = "stale"
+                else:
+                    self.status[key] = "warm"
+                    continue
+                # 저장된 검색량이 큰 키워드부터 (처음 보는 키워드는 확장 순서대로 뒤에)
+                todo.append((-(state.volume or 0) if state is not None else 1, len(todo), kw))
+            self.group_keys[name] = keys
+            queues.append([kw for _, _, kw in sorted(todo)])
+        self.order: List[str] = []
+        for i in range(max((len(q) for q in queues), default=0)):
+            self.order.extend(q[i] for q in queues if i < len(q))
+        self.warm_before = {name: sum(self.status[k] == "warm" for k in set(keys)) for name, keys in self.group_keys.items()}
+
+    def summary_rows(self) -> List[Dict[str, object]]:
+        rows = []
+        for name, keys in self.group_keys.items():
+            unique = set(keys)
+            warm = sum(self.status[k] in ("warm", "fetched") for k in unique)
+            rows.append({
+                "Group": name,
+                "Keywords": len(unique),
+                "Warm_Before": self.warm_before[name],
+                "Fetched": sum(self.status[k] == "fetched" for k in unique),
+                "Failed": sum(self.status[k] == "failed" for k in unique),
+                "Left_Cold": sum(self.status[k] in ("cold", "stale") for k in unique),
+                "Coverage": f"{warm / len(unique):.0%}" if unique else "-",
+            })
+        return rows
+
+
+class ApiBudget:
+    """Hands out API calls until the budget is spent (thread-safe)."""
+
+    def __init__(self, calls: int):
+        self.calls = calls
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self, n: int) -> bool:
+        with self._lock:
+            if self.used + n > self.calls:
+                return False
+            self.used += n
+            return True
+
+    def refund(self, n: int) -> None:
+        with self._lock:
+            self.used -= n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm the keyword history for broad topics and recent trends")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="Keyword history store to warm")
+    parser.add_argument("--api-budget", type=int, default=DEFAULT_API_BUDGET,
+                        help=f"Max API calls for this run ({CALLS_PER_KEYWORD} per keyword)")
+    parser.add_argument("--trends", type=int, default=DEFAULT_TRENDS, help="Trending keywords to expand (0 = topics only)")
+    parser.add_argument("--off-hours", default=None, metavar="HH:MM-HH:MM",
+                        help="Only fetch inside this local time window (waits for it to open, stops when it closes)")
+    parser.add_argument("--snapshot", default=None,
+                        help="Rebuild this metric snapshot (metric_snapshot.py) from the warmed history afterwards")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown")
+    add_refresh_args(parser)
+    add_pipeline_args(parser)
+    add_synthetic_args(parser)
+    args = parser.parse_args()
+    synthetic = synthetic_from_args(args)
+    profiler = StageProfiler(enabled=args.profile)
+
+    print(f"🔥 [Pre-Warm] History: {args.history}")
+    deadline = None
+    if args.off_hours:
+        try:
+            window = parse_window(args.off_hours)
+        except ValueError as e:
+            parser.error(str(e))
+        start, end = window_bounds(window, datetime.now())
+        if not args.dry_run and datetime.now() < start:
+            print(f"   💤 Waiting for the off-hours window ({start:%Y-%m-%d %H:%M})...")
+            time.sleep((start - datetime.now()).total_seconds())
+        deadline = end
+        print(f"   🕐 Fetching until {end:%Y-%m-%d %H:%M}")
+
+    if synthetic is None:
+        try:
+            from data_fetcher import RealDataFetcher
+            from trend_hunter import fetch_trending_keywords
+        except ImportError:
+            from src.data_fetcher import RealDataFetcher
+            from src.trend_hunter import fetch_trending_keywords
+        fetcher = RealDataFetcher()
+    else:
+        fetcher = synthetic
+        fetch_trending_keywords = synthetic.get_trending_keywords
+
+    with profiler.stage("discover"):
+        trends = fetch_trending_keywords(limit=args.trends) if args.trends else []
+    if trends:
+        print(f"   🔥 Trends: {trends}")
+    with profiler.stage("expand"):
+        groups = warm_targets(trends)
+
+    store = MetricStore(args.history)
+    planner = planner_from_args(args, store)
+    with profiler.stage("plan"):
+        plan = WarmPlan(groups, planner)
+    budget = ApiBudget(args.api_budget)
+    print(f"   📋 {len(plan.status)} keywords in {len(groups)} groups: "
+          f"{sum(s == 'warm' for s in plan.status.values())} warm, {len(plan.order)} to fetch "
+          f"(budget {args.api_budget} calls = {args.api_budget // CALLS_PER_KEYWORD} keywords)")
+    if args.dry_run:
+        print(markdown_table(plan.summary_rows(), ["Group", "Keywords", "Warm_Before", "Left_Cold"]))
+        store.close()
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = f"reports/PREWARM_{timestamp}.md"
+    writer = StreamingReportWriter(report_file, columns=COLUMNS)
+    target = min(len(plan.order), args.api_budget // CALLS_PER_KEYWORD)
+
+    closed = threading.Event()
+
+    def window_closed() -> bool:
+        if deadline is None or datetime.now() < deadline:
+            return False
+        if not closed.is_set():
+            closed.set()
+            print("\n   🕐 Off-hours window closed.")
+        return True
+
+    def discover() -> Iterator[str]:
+        for kw in plan.order:
+            if window_closed():
+                return
+            if not budget.take(CALLS_PER_KEYWORD):
+                print("\n   💸 API budget spent.")
+                return
+            yield kw
+
+    def fetch(kw):
+        # 큐에서 기다리는 사이 시간대가 끝났으면 호출하지 않고 예산을 돌려줌 (키워드는 cold/stale로 남음)
+        if window_closed():
+            budget.refund(CALLS_PER_KEYWORD)
+            return None
+        stats = fetcher.get_keyword_stats(kw)
+        if stats is None:
+            budget.refund(CALLS_PER_KEYWORD - 1)  # 문서 수 조회는 하지 않음
+        docs = fetcher.get_doc_count(kw) if stats is not None else None
+        if docs is not None:
+            store.record(kw, stats["volume"], docs, stats["comp"])
+        return {"Keyword": kw, "Group": plan.group_of[normalize_keyword(kw)],
+                "Monthly_Search_Volume": stats["volume"] if stats else None, "Total_Docs": docs,
+                "Status": "fetched" if docs is not None else "failed"}
+
+    def sink(row):
+        writer.store_row(row)
+        plan.status[normalize_keyword(row["Keyword"])] = row["Status"]
+        print(f"      [{writer.rows_written}/{target}] {row['Status']} '{row['Keyword']}'...", end="\r")
+
+    pipe = pipeline_from_args(args, profiler, on_error=lambda stage, item, e: print(f"\n   ⚠️ {stage}: {e}"))
+    pipe.source("discover", discover).map("fetch", fetch).sink("sink", sink)
+    pipe.run()
+    store.close()
+
+    statuses = list(plan.status.values())
+    total = len(statuses)
+    warm_before = statuses.count("warm")
+    warm_after = warm_before + statuses.count("fetched")
+    print(f"\n   ✅ Pre-warm complete: {warm_after}/{total} keywords warm ({warm_after / max(total, 1):.0%}), "
+          f"{budget.used} of {args.api_budget} API calls used.")
+
+    if args.snapshot:
+        with profiler.stage("snapshot"):
+            store = MetricStore(args.history)
+            planner = planner_from_args(args, store)
+            count = build_snapshot(args.snapshot, collect_entries(store, planner), planner.default_days)
+            store.close()
+        print(f"   📦 Snapshot rebuilt: {args.snapshot} ({count} keywords)")
+
+    preamble = f"""# 🔥 Cache Pre-Warm Report
+**Timestamp:** {timestamp}
+**History:** `{args.history}`
+**Trends:** {', '.join(trends) if trends else '-'}
+**Full Data:** {writer.sidecar_hint()}
+"""
+    if synthetic:
+        preamble += f"**Data:** Synthetic (seed {args.synthetic_seed})\n"
+    epilogue = f"""## 🔥 Coverage
+- **Warm keywords:** {warm_after} of {total} ({warm_after / max(total, 1):.0%}), {warm_before} before this run
+- **API calls:** {budget.used} of {args.api_budget} budget ({statuses.count('fetched')} fetched, {statuses.count('failed')} failed)
+
+{markdown_table(plan.summary_rows(), ["Group", "Keywords", "Warm_Before", "Fetched", "Failed", "Left_Cold", "Coverage"])}
+"""
+    with profiler.stage("report"):
+        writer.close(preamble=preamble, epilogue=epilogue, metrics=REGISTRY)
+    print(f"   📝 Pre-Warm Report generated: {report_file}")
+    if args.profile:
+        print(profiler.report())
+        print(pipe.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import math
+import sys
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+COLUMNS = ('Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score', 'SmartBlock_Type')
+
+
+class KeywordRecords:
+    """
+    Compact, column-oriented container for per-keyword metrics.
+
+    Instead of one dict per keyword (repeated string keys + boxed ints/floats), numbers live in
+    typed `array` columns (8 bytes per value) and keyword / SmartBlock strings are interned.
+    `to_numpy()` / `to_pandas()` wrap the arrays without copying them.
+
+    Note: while an exported NumPy/pandas view is alive, the underlying arrays cannot grow
+    (append raises BufferError). Export once the fetch loop is finished.
+    """
+
+    __slots__ = ('keywords', 'volumes', 'docs', 'saturation', 'efficiency', 'smartblock')
+
+    def __init__(self):
+        self.keywords: List[str] = []
+        self.volumes = array('q')
+        self.docs = array('q')
+        self.saturation = array('d')
+        self.efficiency = array('d')
+        self.smartblock: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def append(self, keyword: str, volume: int, docs: int, saturation: float = math.nan,
+               efficiency: float = math.nan, smartblock: str = "") -> None:
+        self.keywords.append(sys.intern(keyword))
+        self.volumes.append(int(volume))
+        self.docs.append(int(docs))
+        self.saturation.append(saturation)
+        self.efficiency.append(efficiency)
+        self.smartblock.append(sys.intern(smartblock or ""))
+
+    def append_row(self, row: Dict[str, Any]) -> None:
+        """Appends a dict shaped like fetch_keyword_data() output (Sk/Ek optional)."""
+        self.append(
+            row['Keyword'],
+            row['Monthly_Search_Volume'],
+            row['Total_Docs'],
+            row.get('Saturation_Index', math.nan),
+            row.get('Efficiency_Score', math.nan),
+            row.get('SmartBlock_Type', ""),
+        )
+
+    def row(self, i: int) -> Dict[str, Any]:
+        return {
+            'Keyword': self.keywords[i],
+            'Monthly_Search_Volume': self.volumes[i],
+            'Total_Docs': self.docs[i],
+            'Saturation_Index': self.saturation[i],
+            'Efficiency_Score': self.efficiency[i],
+            'SmartBlock_Type': self.smartblock[i],
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the numeric columns and list slots (strings excluded)."""
+        numeric = sum(a.itemsize * len(a) for a in (self.volumes, self.docs, self.saturation, self.efficiency))
+        return numeric + sys.getsizeof(self.keywords) + sys.getsizeof(self.smartblock)
+
+    def to_numpy(self) -> Dict[str, "np.ndarray"]:
+        """Zero-copy NumPy views of the numeric columns (+ object arrays for strings)."""
+        import numpy as np
+
+        def view(col: array, dtype) -> "np.ndarray":
+            return np.frombuffer(col, dtype=dtype) if len(col) else np.empty(0, dtype=dtype)
+
+        return {
+            'Keyword': np.array(self.keywords, dtype=object),
+            'Monthly_Search_Volume': view(self.volumes, np.int64),
+            'Total_Docs': view(self.docs, np.int64),
+            'Saturation_Index': view(self.saturation, np.float64),
+            'Efficiency_Score': view(self.efficiency, np.float64),
+            'SmartBlock_Type': np.array(self.smartblock, dtype=object),
+        }
+
+    def to_pandas(self, columns: Optional[Sequence[str]] = None) -> "pd.DataFrame":
+        """DataFrame backed by the same buffers as the numeric columns (copy=False)."""
+        import pandas as pd
+
+        arrays = self.to_numpy()
+        selected = list(columns) if columns else list(COLUMNS)
+        return pd.DataFrame({c: arrays[c] for c in selected}, copy=False)
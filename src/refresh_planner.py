@@ -0,0 +1,357 @@
+import argparse
+import math
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from calculator import BLUE_OCEAN_SK, calculate_efficiency, calculate_saturation
+    from distributed import normalize_keyword
+    from history_config import (DEFAULT_REFRESH_DAYS, DEFAULT_TOLERANCE, MAX_REFRESH_DAYS, MIN_REFRESH_DAYS,
+                                add_refresh_args)
+    from metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from metrics import REGISTRY, StageProfiler
+    from pipeline import add_pipeline_args, pipeline_from_args
+    from report_writer import DEFAULT_MD_LIMIT, ReportSection, StreamingReportWriter, markdown_table
+    from synthetic_fetcher import add_synthetic_args, synthetic_from_args
+except ImportError:
+    sys.path.append(os.path.join(current_dir, ".."))
+    from src.calculator import BLUE_OCEAN_SK, calculate_efficiency, calculate_saturation
+    from src.distributed import normalize_keyword
+    from src.history_config import (DEFAULT_REFRESH_DAYS, DEFAULT_TOLERANCE, MAX_REFRESH_DAYS, MIN_REFRESH_DAYS,
+                                    add_refresh_args)
+    from src.metric_store import DEFAULT_HISTORY_PATH, MetricStore
+    from src.metrics import REGISTRY, StageProfiler
+    from src.pipeline import add_pipeline_args, pipeline_from_args
+    from src.report_writer import DEFAULT_MD_LIMIT, ReportSection, StreamingReportWriter, markdown_table
+    from src.synthetic_fetcher import add_synthetic_args, synthetic_from_args
+
+# 변화율 계산에 쓰는 키워드별 최근 관측 수, 같은 실행 안의 중복 관측을 거르는 최소 간격 (일)
+HISTORY_WINDOW = 12
+MIN_GAP_DAYS = 1 / 24
+
+# 전체 재조회 시 키워드당 호출 수: 검색량(광고 API) + 문서 수(검색 API)
+CALLS_PER_KEYWORD = 2
+
+COLUMNS = ['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score',
+           'Change_Rate', 'Refresh_Days', 'Status']
+
+
+def change_rate(series: Iterable[Tuple[float, Optional[int]]]) -> Optional[float]:
+    """
+    Mean absolute log change per day over consecutive (observed_at, value) pairs, oldest first.
+    Observations closer than MIN_GAP_DAYS to the previous one are ignored. None with fewer than two.
+    """
+    change, days, prev = 0.0, 0.0, None
+    for observed_at, value in series:
+        if value is None:
+            continue
+        if prev is None:
+            prev = (observed_at, value)
+            continue
+        gap = (observed_at - prev[0]) / 86400
+        if gap < MIN_GAP_DAYS:
+            continue
+        change += abs(math.log((value + 1) / (prev[1] + 1)))
+        days += gap
+        prev = (observed_at, value)
+    return change / days if days else None
+
+
+class KeywordState:
+    """Last observation of one keyword plus its observed change rates and the refresh interval they imply."""
+
+    __slots__ = ("keyword", "volume", "docs", "observed_at", "observations", "volume_rate", "docs_rate", "interval_days")
+
+    def __init__(self, keyword: str, volume: Optional[int], docs: Optional[int], observed_at: float, observations: int,
+                 volume_rate: Optional[float], docs_rate: Optional[float], interval_days: float):
+        self.keyword = keyword
+        self.volume = volume
+        self.docs = docs
+        self.observed_at = observed_at
+        self.observations = observations
+        self.volume_rate = volume_rate
+        self.docs_rate = docs_rate
+        self.interval_days = interval_days
+
+    @property
+    def rate(self) -> Optional[float]:
+        """The faster of the two change rates (log change per day), None if unknown."""
+        rates = [r for r in (self.volume_rate, self.docs_rate) if r is not None]
+        return max(rates) if rates else None
+
+    def age_days(self, now: float) -> float:
+        return (now - self.observed_at) / 86400
+
+    def is_stale(self, now: float) -> bool:
+        return self.docs is None or self.volume is None or self.age_days(now) > self.interval_days
+
+
+class RefreshPlan:
+    """Which keywords to re-fetch: stale (most overdue first), fresh, and never observed."""
+
+    def __init__(self, stale: List[KeywordState], fresh: List[KeywordState], unknown: List[str], now: float):
+        self.stale = stale
+        self.fresh = fresh
+        self.unknown = unknown
+        self.now = now
+
+    @property
+    def total(self) -> int:
+        return len(self.stale) + len(self.fresh) + len(self.unknown)
+
+    @property
+    def planned_calls(self) -> int:
+        return CALLS_PER_KEYWORD * (len(self.stale) + len(self.unknown))
+
+    @property
+    def avoided_calls(self) -> int:
+        return CALLS_PER_KEYWORD * len(self.fresh)
+
+    def summary_markdown(self) -> str:
+        if not self.total:
+            return "No keywords to plan."
+        full = CALLS_PER_KEYWORD * self.total
+        lines = [
+            f"- **Keywords:** {self.total} ({len(self.stale)} stale, {len(self.unknown)} never fetched, "
+            f"{len(self.fresh)} still fresh)",
+            f"- **API calls:** {self.planned_calls} instead of {full} for a full refresh "
+            f"(**{self.avoided_calls} avoided**, {self.avoided_calls / full:.0%})",
+        ]
+        known = self.stale + self.fresh
+        if known:
+            buckets = [("≤ 3 days", 0, 3), ("3-7 days", 3, 7), ("7-14 days", 7, 14), ("> 14 days", 14, math.inf)]
+            rows = []
+            for label, low, high in buckets:
+                group = [s for s in known if low < s.interval_days <= high]
+                rows.append({"Refresh Interval": label, "Keywords": len(group),
+                             "Stale Now": sum(s.is_stale(self.now) for s in group)})
+            lines += ["", markdown_table(rows, ["Refresh Interval", "Keywords", "Stale Now"])]
+        return "\n".join(lines)
+
+
+class RefreshPlanner:
+    """
+    Adaptive refresh intervals from the MetricStore history.
+    Each keyword's interval is how long its Monthly_Search_Volume and Total_Docs take, at their observed
+    change rate, to drift by `tolerance`: ln(1 + tolerance) / rate, clamped to [min_days, max_days].
+    Stable keywords are re-fetched rarely, trend keywords often; keywords seen once get `default_days`.
+    The history is scanned once, on first use.
+    """
+
+    def __init__(self, store: MetricStore, tolerance: float = DEFAULT_TOLERANCE, min_days: float = MIN_REFRESH_DAYS,
+                 max_days: float = MAX_REFRESH_DAYS, default_days: float = DEFAULT_REFRESH_DAYS):
+        self.store = store
+        self.tolerance = tolerance
+        self.min_days = min_days
+        self.max_days = max_days
+        self.default_days = min(max(default_days, min_days), max_days)
+        self._states: Optional[Dict[str, KeywordState]] = None
+
+    def interval_days(self, rate: Optional[float]) -> float:
+        if rate is None:
+            return self.default_days
+        if rate <= 0:
+            return self.max_days
+        return min(max(math.log1p(self.tolerance) / rate, self.min_days), self.max_days)
+
+    def _state(self, keyword: str, window: Deque[Tuple]) -> KeywordState:
+        # window: (volume, docs, observed_at), 오래된 순
+        volume_rate = change_rate((t, v) for v, _, t in window)
+        docs_rate = change_rate((t, d) for _, d, t in window)
+        rates = [r for r in (volume_rate, docs_rate) if r is not None]
+        last_volume = next((v for v, _, _ in reversed(window) if v is not None), None)
+        last_docs = next((d for _, d, _ in reversed(window) if d is not None), None)
+        return KeywordState(keyword, last_volume, last_docs, window[-1][2], len(window), volume_rate, docs_rate,
+                            self.interval_days(max(rates) if rates else None))
+
+    def load(self) -> Dict[str, KeywordState]:
+        """Scans the whole history once (observations arrive grouped by key)."""
+        states: Dict[str, KeywordState] = {}
+        key, keyword, window = None, None, deque(maxlen=HISTORY_WINDOW)
+        for row_key, row_keyword, volume, docs, _, observed_at in self.store.iter_observations():
+            if row_key != key:
+                if window:
+                    states[key] = self._state(keyword, window)
+                key, window = row_key, deque(maxlen=HISTORY_WINDOW)
+            keyword = row_keyword
+            window.append((volume, docs, observed_at))
+        if window:
+            states[key] = self._state(keyword, window)
+        self._states = states
+        return states
+
+    @property
+    def states(self) -> Dict[str, KeywordState]:
+        return self._states if self._states is not None else self.load()
+
+    def state(self, keyword: str) -> Optional[KeywordState]:
+        return self.states.get(normalize_keyword(keyword))
+
+    def is_fresh(self, keyword: str, observed_at: float, now: Optional[float] = None) -> bool:
+        """Whether an observation made at `observed_at` is still within the keyword's refresh interval."""
+        state = self.state(keyword)
+        interval = state.interval_days if state is not None else self.default_days
+        return ((now or time.time()) - observed_at) / 86400 <= interval
+
+    def plan(self, keywords: Optional[Iterable[str]] = None, now: Optional[float] = None) -> RefreshPlan:
+        """Plan for `keywords` (default: every stored keyword)."""
+        now = now or time.time()
+        states = self.states
+        stale: List[KeywordState] = []
+        fresh: List[KeywordState] = []
+        unknown: List[str] = []
+        if keywords is None:
+            selected: Iterable = states.values()
+        else:
+            seen = set()
+            selected = []
+            for kw in keywords:
+                key = normalize_keyword(kw)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if key in states:
+                    selected.append(states[key])
+                else:
+                    unknown.append(kw)
+        for state in selected:
+            (stale if state.is_stale(now) else fresh).append(state)
+        # 주기 대비 가장 오래된 키워드부터 (중간에 멈춰도 급한 것부터 갱신됨)
+        stale.sort(key=lambda s: s.age_days(now) / s.interval_days, reverse=True)
+        return RefreshPlan(stale, fresh, unknown, now)
+
+
+def planner_from_args(args, store: MetricStore) -> RefreshPlanner:
+    return RefreshPlanner(store, tolerance=args.refresh_tolerance, max_days=args.max_refresh_days)
+
+
+def _load_keywords(paths: Sequence[str]) -> List[str]:
+    try:
+        from scenarios import load_records
+    except ImportError:
+        from src.scenarios import load_records
+    return list(load_records(paths).keywords)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-fetch only the stale, volatile keywords of the metric history")
+    parser.add_argument("inputs", nargs="*",
+                        help="Report sidecars (.csv / .jsonl) whose keywords to refresh (default: every stored keyword)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="Keyword history store")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    parser.add_argument("--md-limit", type=int, default=DEFAULT_MD_LIMIT, help="Max rows in the Blue Ocean Markdown table")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown")
+    add_refresh_args(parser)
+    add_pipeline_args(parser)
+    add_synthetic_args(parser)
+    args = parser.parse_args()
+    synthetic = synthetic_from_args(args)
+    profiler = StageProfiler(enabled=args.profile)
+
+    print(f"🔄 [Refresh Planner] History: {args.history}")
+    store = MetricStore(args.history)
+    planner = planner_from_args(args, store)
+    with profiler.stage("plan"):
+        plan = planner.plan(_load_keywords(args.inputs) if args.inputs else None)
+    print(plan.summary_markdown())
+    if args.dry_run or not plan.total:
+        if plan.stale:
+            print("\n" + markdown_table(
+                [{"Keyword": s.keyword, "Age_Days": s.age_days(plan.now), "Refresh_Days": s.interval_days}
+                 for s in plan.stale[:20]], ["Keyword", "Age_Days", "Refresh_Days"], float_digits=1))
+        store.close()
+        return
+
+    if synthetic is None:
+        try:
+            from data_fetcher import RealDataFetcher
+        except ImportError:
+            from src.data_fetcher import RealDataFetcher
+        fetcher = RealDataFetcher()
+    else:
+        fetcher = synthetic
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = f"reports/REFRESH_{timestamp}.md"
+    writer = StreamingReportWriter(report_file, columns=COLUMNS)
+    writer.add_section(ReportSection(
+        "## 1. 📈 변동성 높은 키워드 (Most Volatile Top 20)",
+        sort_by='Change_Rate', columns=COLUMNS, limit=20,
+        description="*Fastest-moving volume or doc count per day; these are re-fetched most often.*",
+    ))
+    writer.add_section(ReportSection(
+        f"## 2. 💎 블루오션 기회 ($S_k < {BLUE_OCEAN_SK}$)",
+        sort_by='Efficiency_Score', columns=COLUMNS, where=lambda row: row['Saturation_Index'] < BLUE_OCEAN_SK,
+        limit=args.md_limit, empty_message="No Blue Ocean keywords found.",
+    ))
+
+    def discover():
+        yield from plan.stale
+        yield from plan.unknown
+        yield from plan.fresh
+
+    def fetch(item):
+        # 신선한 키워드는 저장된 값 그대로 (API 호출 없음)
+        if isinstance(item, KeywordState) and not item.is_stale(plan.now):
+            return {"Keyword": item.keyword, "Monthly_Search_Volume": item.volume, "Total_Docs": item.docs,
+                    "Change_Rate": item.rate, "Refresh_Days": item.interval_days, "Status": "fresh"}
+        keyword = item.keyword if isinstance(item, KeywordState) else item
+        stats = fetcher.get_keyword_stats(keyword)
+        docs = fetcher.get_doc_count(keyword) if stats is not None else None
+        if docs is None:
+            return None
+        store.record(keyword, stats["volume"], docs, stats["comp"])
+        state = item if isinstance(item, KeywordState) else None
+        return {"Keyword": keyword, "Monthly_Search_Volume": stats["volume"], "Total_Docs": docs,
+                "Change_Rate": state.rate if state else None,
+                "Refresh_Days": state.interval_days if state else planner.default_days, "Status": "refreshed"}
+
+    def score(row):
+        row["Saturation_Index"] = calculate_saturation(row["Total_Docs"], row["Monthly_Search_Volume"])
+        row["Efficiency_Score"] = calculate_efficiency(row["Saturation_Index"], row["Monthly_Search_Volume"])
+        return row
+
+    def sink(row):
+        writer.store_row(row)
+        print(f"      [{writer.rows_written}/{plan.total}] {row['Status']} '{row['Keyword']}'...", end="\r")
+
+    pipe = pipeline_from_args(args, profiler, on_error=lambda stage, item, e: print(f"\n   ⚠️ {stage}: {e}"))
+    pipe.source("discover", discover).map("fetch", fetch).map("score", score)
+    pipe.tap("rank", writer.rank_row).sink("sink", sink)
+    pipe.run()
+    store.close()
+
+    failed = pipe.stats["fetch"].dropped + pipe.stats["fetch"].errors
+    print("\n   ✅ Refresh Complete.")
+    if failed:
+        print(f"   ⚠️ {failed} keywords skipped (API failed after retries); they stay stale.")
+    if writer.rows_written == 0:
+        print("   ❌ No results to report.")
+        return
+
+    preamble = f"""# 🔄 Keyword Refresh Report
+**Timestamp:** {timestamp}
+**History:** `{args.history}` (tolerance {args.refresh_tolerance:.0%}, intervals {planner.min_days:g}-{planner.max_days:g} days)
+**Total Keywords:** {writer.rows_written}
+**Full Data:** {writer.sidecar_hint()}
+"""
+    if synthetic:
+        preamble += f"**Data:** Synthetic (seed {args.synthetic_seed})\n"
+    with profiler.stage("report"):
+        writer.close(preamble=preamble, epilogue=f"## 🔄 Refresh Plan\n{plan.summary_markdown()}\n", metrics=REGISTRY)
+    print(f"   📝 Refresh Report generated: {report_file}")
+    if args.profile:
+        print(profiler.report())
+        print(pipe.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import csv
+import heapq
+import itertools
+import json
+import os
+from typing import Any, Callable, Dict, IO, List, Optional, Sequence
+
+# 리포트 공통 컬럼 (fetch_keyword_data + Sk/Ek + SERP 점수/유형)
+REPORT_COLUMNS = ['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score', 'SERP_Score', 'SmartBlock_Type']
+# 사이드카(CSV/JSONL)에만 싣는 SERP 세부 지표 (serp_features.score_rows)
+SERP_DETAIL_COLUMNS = ['SERP_Fresh', 'SERP_Dominance', 'SERP_Title_Match']
+
+# Markdown 표에 싣는 기본 최대 행 수 (전체 데이터는 CSV/JSONL 사이드카에 기록)
+DEFAULT_MD_LIMIT = 500
+
+
+def _format_cell(value: Any, float_digits: int) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.{float_digits}f}"
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def markdown_table(rows: Sequence[Dict[str, Any]], columns: Sequence[str], float_digits: int = 2) -> str:
+    """
+    Renders rows as a GitHub-flavored Markdown table without tabulate/pandas.
+    """
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join(" --- " for _ in columns) + "|",
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(_format_cell(row.get(c), float_digits) for c in columns) + " |")
+    return "\n".join(lines)
+
+
+class ReportSection:
+    """
+    One ranked Markdown table of the report.
+    Rows are offered one at a time; only the best `limit` rows are kept (bounded heap),
+    so memory does not grow with the number of analyzed keywords.
+    """
+
+    def __init__(self, title: str, sort_by: str, columns: Sequence[str] = REPORT_COLUMNS,
+                 ascending: bool = False, where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 limit: Optional[int] = DEFAULT_MD_LIMIT, description: str = "",
+                 empty_message: str = "No keywords matched."):
+        self.title = title
+        self.sort_by = sort_by
+        self.columns = list(columns)
+        self.ascending = ascending
+        self.where = where
+        self.limit = limit
+        self.description = description
+        self.empty_message = empty_message
+        self.matched = 0
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+
+    def offer(self, row: Dict[str, Any]) -> None:
+        if self.where is not None and not self.where(row):
+            return
+        self.matched += 1
+
+        key = row.get(self.sort_by) or 0
+        if self.ascending:
+            key = -key
+        # (key, -seq): 동점이면 먼저 들어온 행을 남깁니다.
+        item = (key, -next(self._seq), row)
+        if self.limit is None or len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+        else:
+            heapq.heappushpop(self._heap, item)
+
+    def ranked_rows(self) -> List[Dict[str, Any]]:
+        return [item[2] for item in sorted(self._heap, reverse=True)]
+
+    def render(self, sidecar_hint: str = "") -> str:
+        parts = [self.title]
+        if self.description:
+            parts.append(self.description)
+
+        rows = self.ranked_rows()
+        if not rows:
+            parts.append(self.empty_message)
+            return "\n\n".join(parts)
+
+        parts.append(markdown_table(rows, self.columns))
+        if self.matched > len(rows):
+            note = f"*Showing top {len(rows)} of {self.matched} keywords.*"
+            if sidecar_hint:
+                note = f"*Showing top {len(rows)} of {self.matched} keywords. Full data: {sidecar_hint}*"
+            parts.append(note)
+        return "\n\n".join(parts)
+
+
+class StreamingReportWriter:
+    """
+    Streams scored rows to CSV/JSONL sidecars as soon as they are produced,
+    and renders the Markdown report from bounded per-section tables on close().
+
+    Usage:
+        writer = StreamingReportWriter("reports/result_REAL_20260101_000000.md")
+        top = writer.add_section(ReportSection("## Top", sort_by="Efficiency_Score"))
+        for row in rows:
+            writer.write_row(row)
+        writer.close(preamble="# Report", epilogue="## Next")
+
+    With `chunk_rows`, sidecars roll over to `<base>_part002.csv`, ... every N rows.
+    Sidecar files are opened lazily, so a run that produces no rows leaves nothing on disk.
+    """
+
+    def __init__(self, report_path: str, columns: Sequence[str] = REPORT_COLUMNS,
+                 formats: Sequence[str] = ("md", "csv", "jsonl"), chunk_rows: Optional[int] = None):
+        self.report_path = report_path
+        self.columns = list(columns)
+        self.formats = tuple(formats)
+        self.chunk_rows = chunk_rows if chunk_rows and chunk_rows > 0 else None
+        self.sections: List[ReportSection] = []
+        self.rows_written = 0
+        self.paths: Dict[str, List[str]] = {fmt: [] for fmt in self.formats}
+
+        self._base, _ = os.path.splitext(report_path)
+        self._chunk_index = 0
+        self._csv_file: Optional[IO[str]] = None
+        self._csv_writer = None
+        self._jsonl_file: Optional[IO[str]] = None
+
+    # --- Sections ---
+    def add_section(self, section: ReportSection) -> ReportSection:
+        self.sections.append(section)
+        return section
+
+    # --- Streaming ---
+    def _sidecar_path(self, ext: str) -> str:
+        if self.chunk_rows is None or self._chunk_index == 1:
+            return f"{self._base}.{ext}"
+        return f"{self._base}_part{self._chunk_index:03d}.{ext}"
+
+    def _close_sidecars(self) -> None:
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv_writer = None
+        if self._jsonl_file is not None:
+            self._jsonl_file.close()
+            self._jsonl_file = None
+
+    def _open_sidecars(self) -> None:
+        self._close_sidecars()
+        self._chunk_index += 1
+        directory = os.path.dirname(self.report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if "csv" in self.formats:
+            path = self._sidecar_path("csv")
+            # Excel에서 한글이 깨지지 않도록 BOM 포함 (app.py 다운로드와 동일)
+            self._csv_file = open(path, "w", encoding="utf-8-sig", newline="")
+            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=self.columns, extrasaction="ignore")
+            self._csv_writer.writeheader()
+            self.paths["csv"].append(path)
+        if "jsonl" in self.formats:
+            path = self._sidecar_path("jsonl")
+            self._jsonl_file = open(path, "w", encoding="utf-8")
+            self.paths["jsonl"].append(path)
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        self.store_row(row)
+        self.rank_row(row)
+
+    def store_row(self, row: Dict[str, Any]) -> None:
+        """Appends the row to the sidecars (the pipeline's sink stage)."""
+        needs_rollover = self.chunk_rows is not None and self.rows_written % self.chunk_rows == 0
+        if self._chunk_index == 0 or needs_rollover:
+            self._open_sidecars()
+
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+        if self._jsonl_file is not None:
+            self._jsonl_file.write(json.dumps({c: row.get(c) for c in self.columns}, ensure_ascii=False) + "\n")
+        self.rows_written += 1
+
+    def rank_row(self, row: Dict[str, Any]) -> None:
+        """Offers the row to the bounded section tables (the pipeline's rank stage).
+        May run in another thread than store_row: the two touch disjoint state."""
+        for section in self.sections:
+            section.offer(row)
+
+    # --- Finalize ---
+    def sidecar_hint(self) -> str:
+        files = self.paths.get("csv") or self.paths.get("jsonl") or []
+        if not files:
+            return ""
+        names = [os.path.basename(p) for p in files]
+        if len(names) > 3:
+            return f"`{names[0]}` ... `{names[-1]}` ({len(names)} files)"
+        return ", ".join(f"`{n}`" for n in names)
+
+    def close(self, preamble: str = "", epilogue: str = "", metrics=None) -> Dict[str, List[str]]:
+        """
+        Closes the sidecars and writes the Markdown report.
+        If a metrics registry (metrics.MetricsRegistry) is given, its snapshot is written to
+        `<base>.metrics.json` and `<base>.prom` (Prometheus textfile) and summarized in the report.
+        Returns the written file paths per format.
+        """
+        self._close_sidecars()
+
+        if metrics is not None:
+            metrics_path, prom_path = f"{self._base}.metrics.json", f"{self._base}.prom"
+            directory = os.path.dirname(self.report_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            metrics.write_json(metrics_path)
+            metrics.write_prometheus_textfile(prom_path)
+            self.paths["metrics"] = [metrics_path, prom_path]
+            appendix = f"## 📈 API Call Metrics\n\n{metrics.summary_markdown()}\n\n*Details: `{os.path.basename(metrics_path)}`*"
+            epilogue = f"{epilogue.rstrip()}\n\n{appendix}" if epilogue else appendix
+
+        if "md" in self.formats:
+            hint = self.sidecar_hint()
+            blocks = [preamble.strip("\n")] if preamble else []
+            blocks += [section.render(hint) for section in self.sections]
+            if epilogue:
+                blocks.append(epilogue.strip("\n"))
+
+            directory = os.path.dirname(self.report_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                f.write("\n\n".join(blocks) + "\n")
+            self.paths["md"] = [self.report_path]
+
+        return self.paths
+
+    def __enter__(self) -> "StreamingReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._close_sidecars()
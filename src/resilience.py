@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when an endpoint's circuit breaker is open and calls are being short-circuited."""
+
+
+class RetryPolicy:
+    """
+    Bounded retries with "full jitter" exponential backoff:
+    delay_n = uniform(0, min(max_delay, base_delay * 2**n)).
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delays(self) -> Iterator[float]:
+        """Yields the sleep before each attempt (0.0 for the first one)."""
+        yield 0.0
+        for n in range(self.max_attempts - 1):
+            yield self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** n)))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    - closed: calls pass; `failure_threshold` consecutive failures open the circuit.
+    - open: calls are rejected until `reset_timeout` seconds have passed.
+    - half-open: one trial call passes; success closes the circuit, failure re-opens it.
+      A trial that ends without telling anything about the endpoint (abandon()) lets the next call try again;
+      a trial that never reports back expires after `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._trial_at = time.monotonic()
+                return True
+            if self.state == "half_open":
+                # 시험 호출이 진행 중이면 나머지는 차단 (결과 없이 reset_timeout이 지나면 새 시험 호출 허용)
+                if time.monotonic() - self._trial_at < self.reset_timeout:
+                    return False
+                self._trial_at = time.monotonic()
+                return True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """Ends a half-open trial without an outcome (e.g. 429 or no usable key): the next call becomes the trial."""
+        with self._lock:
+            if self.state == "half_open":
+                # _opened_at은 이미 reset_timeout 이전이므로 다음 allow()가 곧바로 시험 호출을 허용
+                self.state = "open"
+
+
+# 엔드포인트별 브레이커 (fetch_keyword_data가 호출마다 RealDataFetcher를 새로 만들어도 상태가 공유되도록 모듈 전역)
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def breaker_for(endpoint: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        if endpoint not in _BREAKERS:
+            _BREAKERS[endpoint] = CircuitBreaker()
+        return _BREAKERS[endpoint]
+
+
+_HEDGE_POOL: Optional["ThreadPoolExecutor"] = None
+_HEDGE_POOL_LOCK = threading.Lock()
+
+
+def _hedge_pool() -> "ThreadPoolExecutor":
+    global _HEDGE_POOL
+    from concurrent.futures import ThreadPoolExecutor  # lazy: 헤징을 켰을 때만 로드 (CLI 콜드 스타트)
+
+    with _HEDGE_POOL_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+        return _HEDGE_POOL
+
+
+def hedged_call(fn: Callable[[], T], hedge_after: float, max_hedges: int = 1) -> T:
+    """
+    Runs `fn`; if it has not finished after `hedge_after` seconds, fires a duplicate
+    (up to `max_hedges` extra copies) and returns the first successful result.
+    Losing copies are not cancelled (requests cannot be aborted) and still count against quota,
+    so `fn` should take its own credential on every call.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pool = _hedge_pool()
+    launched = 1
+    pending = {pool.submit(fn)}
+    errors: List[BaseException] = []
+    while True:
+        can_hedge = launched <= max_hedges
+        done, pending = wait(pending, timeout=hedge_after if can_hedge else None, return_when=FIRST_COMPLETED)
+        for f in done:
+            if f.exception() is None:
+                return f.result()
+            errors.append(f.exception())
+        if not pending and not can_hedge:
+            # 모든 사본이 실패
+            raise errors[0]
+        if can_hedge:
+            pending.add(pool.submit(fn))
+            launched += 1
@@ -0,0 +1,239 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+try:
+    from calculator import (BLUE_OCEAN_SK, DEFAULT_CONVERSION_RATE, RED_OCEAN_SK,
+                            efficiency_array, saturation_array)
+    from keyword_expander import keyword_category
+    from records import KeywordRecords
+    from report_writer import markdown_table
+except ImportError:
+    sys.path.append(os.path.join(current_dir, ".."))
+    from src.calculator import (BLUE_OCEAN_SK, DEFAULT_CONVERSION_RATE, RED_OCEAN_SK,
+                                efficiency_array, saturation_array)
+    from src.keyword_expander import keyword_category
+    from src.records import KeywordRecords
+    from src.report_writer import markdown_table
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# (이름, 기본 전환율, 카테고리별 전환율)
+RateScenario = Tuple[str, float, Dict[str, float]]
+
+SUMMARY_COLUMNS = ['Scenario', 'Threshold', 'Blue_Ocean', 'TopK_Overlap', 'Avg_Rank_Shift', 'New_In_TopK', 'Top_3']
+
+
+def load_records(sources: Sequence[Union[str, IO[bytes]]]) -> KeywordRecords:
+    """
+    Reads report sidecars (.csv / .jsonl, including _partNNN chunks) or uploaded files into
+    columnar records. Only the raw metrics (keyword, volume, docs) are kept; Sk/Ek are recomputed.
+    A keyword found in several sources keeps its last values.
+    """
+    # 같은 키워드가 여러 파일(반복 실행)에 있으면 마지막 값 사용
+    latest: Dict[str, Tuple[int, int]] = {}
+    for source in sources:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        if isinstance(source, str):
+            f = open(source, encoding="utf-8-sig", newline="")
+        else:
+            f = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        with f:
+            rows = (json.loads(line) for line in f if line.strip()) if name.endswith(".jsonl") else csv.DictReader(f)
+            for row in rows:
+                latest[row['Keyword']] = (int(float(row['Monthly_Search_Volume'])), int(float(row['Total_Docs'])))
+    records = KeywordRecords()
+    for keyword, (volume, docs) in latest.items():
+        records.append(keyword, volume, docs)
+    return records
+
+
+def parse_rates(text: str) -> List[float]:
+    """'0.02, 0.05,0.1' -> [0.02, 0.05, 0.1]"""
+    return [float(v) for v in text.replace(" ", "").split(",") if v]
+
+
+def parse_category_rates(specs: Iterable[str]) -> Dict[str, List[float]]:
+    """['주식=0.03,0.08', '맛집=0.1'] (or one '주식=0.03,0.08; 맛집=0.1' string) -> {'주식': [0.03, 0.08], '맛집': [0.1]}"""
+    out: Dict[str, List[float]] = {}
+    for spec in specs:
+        for part in spec.split(";"):
+            if "=" not in part:
+                continue
+            category, values = part.split("=", 1)
+            out[category.strip()] = parse_rates(values)
+    return out
+
+
+def rate_scenarios(default_rates: Sequence[float], category_rates: Optional[Dict[str, Sequence[float]]] = None) -> List[RateScenario]:
+    """
+    Cartesian grid of conversion-rate scenarios. The baseline (DEFAULT_CONVERSION_RATE for every
+    category) always comes first so that rank shifts have a reference.
+    Note: a uniform rate only rescales Ek; rankings move when categories get different rates.
+    """
+    category_rates = category_rates or {}
+    categories = sorted(category_rates)
+    scenarios: List[RateScenario] = [(f"CR {DEFAULT_CONVERSION_RATE:g} (기준)", DEFAULT_CONVERSION_RATE, {})]
+    for default in default_rates:
+        for combo in itertools.product(*(category_rates[c] for c in categories)):
+            overrides = dict(zip(categories, combo))
+            if default == DEFAULT_CONVERSION_RATE and all(r == default for r in combo):
+                continue  # 기준과 동일
+            name = f"CR {default:g}" + "".join(f", {c} {r:g}" for c, r in overrides.items())
+            scenarios.append((name, default, overrides))
+    return scenarios
+
+
+class ScenarioGrid:
+    """
+    What-if scoring over already-fetched metrics (no API calls).
+    Sk is computed once; Ek for every conversion-rate scenario is one (scenarios x keywords) array,
+    and blue-ocean membership for every threshold is one (thresholds x keywords) boolean array.
+    Memory is about 8 bytes x scenarios x keywords (e.g. 27 scenarios x 1M keywords = 216 MB).
+    """
+
+    def __init__(self, records: KeywordRecords, scenarios: Sequence[RateScenario], thresholds: Sequence[float],
+                 categories: Optional[Sequence[str]] = None):
+        import numpy as np
+
+        cols = records.to_numpy()
+        self.keywords = cols['Keyword']
+        self.volumes = cols['Monthly_Search_Volume']
+        self.docs = cols['Total_Docs']
+        self.scenarios = list(scenarios)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+
+        cats = list(categories) if categories is not None else [keyword_category(k) for k in records.keywords]
+        self.category_names = sorted(set(cats))
+        lookup = {c: i for i, c in enumerate(self.category_names)}
+        self.category_index = np.fromiter((lookup[c] for c in cats), dtype=np.intp, count=len(cats))
+
+        self.saturation = saturation_array(self.docs, self.volumes)                       # (N,)
+        rates = np.array([[overrides.get(c, default) for c in self.category_names]
+                          for _, default, overrides in self.scenarios], dtype=np.float64)  # (S, C)
+        self.rates = rates[:, self.category_index]                                        # (S, N)
+        self.efficiency = efficiency_array(self.saturation, self.volumes, self.rates)     # (S, N)
+        self.member = self.saturation[None, :] < self.thresholds[:, None]                 # (T, N)
+
+    def top(self, threshold_index: int, k: int) -> "np.ndarray":
+        """(S, k) keyword indices of the top-k blue-ocean keywords by Ek, for every scenario at once."""
+        import numpy as np
+
+        k = min(k, int(self.member[threshold_index].sum()))
+        if k == 0:
+            return np.empty((len(self.scenarios), 0), dtype=np.intp)
+        score = np.where(self.member[threshold_index][None, :], self.efficiency, -np.inf)
+        part = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(score, part, axis=1), axis=1, kind="stable")
+        return np.take_along_axis(part, order, axis=1)
+
+    def summary(self, k: int = 20, baseline_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        One row per (scenario, threshold): blue-ocean count and how the top-k shifted against the
+        baseline scenario at `baseline_threshold` (default: RED_OCEAN_SK if in the grid, else the first).
+        """
+        import numpy as np
+
+        thresholds = list(self.thresholds)
+        if baseline_threshold is None:
+            baseline_threshold = RED_OCEAN_SK if RED_OCEAN_SK in thresholds else thresholds[0]
+        tops = [self.top(t, k) for t in range(len(thresholds))]
+        base = tops[thresholds.index(baseline_threshold)][0]
+        base_rank = {int(i): r for r, i in enumerate(base)}
+
+        rows = []
+        for t, threshold in enumerate(thresholds):
+            count = int(self.member[t].sum())
+            for s, (name, _, _) in enumerate(self.scenarios):
+                top = tops[t][s]
+                shared = [(base_rank[int(i)], r) for r, i in enumerate(top) if int(i) in base_rank]
+                rows.append({
+                    'Scenario': name,
+                    'Threshold': float(threshold),
+                    'Blue_Ocean': count,
+                    'TopK_Overlap': f"{len(shared) / len(base):.0%}" if len(base) else "-",
+                    'Avg_Rank_Shift': float(np.mean([abs(a - b) for a, b in shared])) if shared else None,
+                    'New_In_TopK': len(top) - len(shared),
+                    'Top_3': ", ".join(str(self.keywords[i]) for i in top[:3]),
+                })
+        return rows
+
+    def ranking(self, scenario_index: int, threshold_index: int, k: int = 20) -> List[Dict[str, Any]]:
+        """Top-k rows of one scenario, shaped like report rows (plus Category and Conversion_Rate)."""
+        rows = []
+        for i in self.top(threshold_index, k)[scenario_index]:
+            rows.append({
+                'Keyword': self.keywords[i],
+                'Category': self.category_names[self.category_index[i]],
+                'Monthly_Search_Volume': int(self.volumes[i]),
+                'Total_Docs': int(self.docs[i]),
+                'Saturation_Index': float(self.saturation[i]),
+                'Conversion_Rate': float(self.rates[scenario_index, i]),
+                'Efficiency_Score': float(self.efficiency[scenario_index, i]),
+            })
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if scoring over already-fetched report data (no API calls)")
+    parser.add_argument("inputs", nargs="+", help="Report sidecars (.csv / .jsonl) from main, trend_hunter or niche_hunter")
+    parser.add_argument("--rates", type=parse_rates, default=[0.02, DEFAULT_CONVERSION_RATE, 0.1],
+                        help="Default conversion rates, comma separated")
+    parser.add_argument("--category-rate", action="append", default=[], metavar="CATEGORY=R1,R2",
+                        help="Per-category conversion rates (repeatable), e.g. 주식=0.03,0.08")
+    parser.add_argument("--thresholds", type=parse_rates, default=[0.5, BLUE_OCEAN_SK, RED_OCEAN_SK],
+                        help="Blue-ocean Sk thresholds, comma separated")
+    parser.add_argument("--top", type=int, default=20, help="Top-K used for overlap / rank shift")
+    parser.add_argument("--detail", action="store_true", help="Also print the top-K table of every scenario")
+    parser.add_argument("--out", default=None, help="Markdown output (default: reports/SCENARIOS_<timestamp>.md)")
+    args = parser.parse_args()
+
+    print(f"🧪 [Scenario Grid] Loading {len(args.inputs)} file(s)...")
+    records = load_records(args.inputs)
+    if not records:
+        print("   ❌ No rows found.")
+        return
+    scenarios = rate_scenarios(args.rates, parse_category_rates(args.category_rate))
+    grid = ScenarioGrid(records, scenarios, args.thresholds)
+    unknown = set(parse_category_rates(args.category_rate)) - set(grid.category_names)
+    if unknown:
+        print(f"   ⚠️ No keywords in categories: {', '.join(sorted(unknown))}")
+    print(f"   ✅ {len(records)} keywords x {len(scenarios)} rate scenarios x {len(args.thresholds)} thresholds "
+          f"(categories: {', '.join(grid.category_names)})")
+
+    summary = grid.summary(k=args.top)
+    body = [f"# 🧪 Scenario Grid ({len(records)} keywords, Top-{args.top})",
+            f"**Sources:** {', '.join(os.path.basename(p) for p in args.inputs)}",
+            f"**Baseline:** {scenarios[0][0]}; rank shifts compare each scenario's Top-{args.top} with the baseline's.",
+            "",
+            markdown_table(summary, SUMMARY_COLUMNS)]
+    if args.detail:
+        for t, threshold in enumerate(args.thresholds):
+            for s, (name, _, _) in enumerate(scenarios):
+                body += ["", f"## {name} / $S_k < {threshold:g}$",
+                         markdown_table(grid.ranking(s, t, args.top),
+                                        ['Keyword', 'Category', 'Monthly_Search_Volume', 'Total_Docs',
+                                         'Saturation_Index', 'Conversion_Rate', 'Efficiency_Score'], float_digits=4)]
+    report = "\n".join(body) + "\n"
+    print(report)
+
+    out = args.out or f"reports/SCENARIOS_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(report)
+    print(f"   📝 Scenario report generated: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import html
+import math
+import os
+import re
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from calculator import efficiency_array, saturation_array
+except ImportError:
+    from src.calculator import efficiency_array, saturation_array
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 문서 수 조회(블로그 검색)에서 함께 받는 상위 결과 수 (1~100). 호출 수는 그대로이고 응답만 커짐
+SERP_DISPLAY = min(max(int(os.environ.get("NAVER_SERP_DISPLAY", "10")), 1), 100)
+
+# 이 기간 안에 작성된 글을 '최근 글'로 봄 (일)
+FRESH_DAYS = 30
+
+# SERP_Score 가중치: 최근 글 비율, (1 - 제목 정확 일치율), 한 블로거 점유율
+FRESH_WEIGHT = 0.4
+TITLE_WEIGHT = 0.4
+DOMINANCE_WEIGHT = 0.2
+
+# 행에 잠시 실어 두는 원본 검색 결과 키 (score_rows가 꺼내 씀, 리포트에는 기록되지 않음)
+SERP_ITEMS = "SERP_Items"
+
+# (postdate YYYYMMDD 정수, 블로거, 정규화된 제목)
+SerpItem = Tuple[int, str, str]
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+def normalize_title(text: str) -> str:
+    """'<b>캠핑 의자</b> 추천' -> '캠핑의자추천' (tags, entities and spaces removed, casefolded)"""
+    return html.unescape(_TAG.sub("", text)).replace(" ", "").casefold()
+
+
+def slim_items(items: Sequence[Dict[str, Any]]) -> List[SerpItem]:
+    """Keeps only what the features need from Blog Search API items."""
+    out = []
+    for item in items:
+        postdate = item.get("postdate") or ""
+        out.append((int(postdate) if postdate.isdigit() else 0,
+                    item.get("bloggerlink") or item.get("bloggername") or "",
+                    normalize_title(item.get("title") or "")))
+    return out
+
+
+def _days_since(postdates: "np.ndarray", today: date) -> "np.ndarray":
+    """Age in days of YYYYMMDD integers (NaN where 0 / invalid)."""
+    import numpy as np
+
+    valid = postdates > 0
+    y, m, d = postdates // 10000, postdates // 100 % 100, postdates % 100
+    valid &= (m >= 1) & (m <= 12) & (d >= 1) & (d <= 31)
+    y, m, d = np.where(valid, y, 1970), np.where(valid, m, 1), np.where(valid, d, 1)
+    days = ((y - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (m - 1).astype("timedelta64[M]")
+            ).astype("datetime64[D]") + (d - 1).astype("timedelta64[D]")
+    age = (np.datetime64(today, "D") - days).astype(np.float64)
+    return np.where(valid, age, np.nan)
+
+
+def serp_arrays(queries: Sequence[str], serps: Sequence[Optional[Sequence[SerpItem]]],
+                today: Optional[date] = None) -> Dict[str, "np.ndarray"]:
+    """
+    Per-keyword SERP features for a whole batch, from the flattened results of every keyword:
+    - SERP_Fresh: share of results posted within FRESH_DAYS (recent posts can still rank)
+    - SERP_Dominance: largest share of results held by one blogger (thin pool of competitors)
+    - SERP_Title_Match: share of titles containing the exact keyword (posts written for this query)
+    - SERP_Score: FRESH_WEIGHT x fresh + TITLE_WEIGHT x (1 - title match) + DOMINANCE_WEIGHT x dominance,
+      0 to 1, higher = easier for a new post to break in
+    Keywords without results (None / empty) get NaN.
+    """
+    import numpy as np
+
+    n = len(queries)
+    counts = np.fromiter((len(s) if s else 0 for s in serps), dtype=np.intp, count=n)
+    total = int(counts.sum())
+    row = np.repeat(np.arange(n), counts)
+    flat = [item for s in serps if s for item in s]
+    postdates = np.fromiter((item[0] for item in flat), dtype=np.int64, count=total)
+    bloggers = np.array([item[1] for item in flat], dtype=str) if total else np.empty(0, dtype=str)
+    titles = np.array([item[2] for item in flat], dtype=str) if total else np.empty(0, dtype=str)
+    normalized = [q.replace(" ", "").casefold() for q in queries]
+    keywords = np.array(normalized, dtype=str)[row] if total else np.empty(0, dtype=str)
+
+    age = _days_since(postdates, today or date.today())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = np.where(counts > 0, counts, np.nan)
+        fresh = np.bincount(row, weights=(age <= FRESH_DAYS).astype(np.float64), minlength=n) / denom
+        match = (np.char.find(titles, keywords) >= 0) if total else np.zeros(0, dtype=bool)
+        title_match = np.bincount(row, weights=match.astype(np.float64), minlength=n) / denom
+
+        # (키워드, 블로거) 쌍별 글 수 → 키워드별 최댓값
+        _, blogger_code = np.unique(bloggers, return_inverse=True)
+        stride = int(blogger_code.max()) + 1 if total else 1
+        pairs, pair_counts = np.unique(row.astype(np.int64) * stride + blogger_code, return_counts=True)
+        top = np.zeros(n)
+        np.maximum.at(top, pairs // stride, pair_counts)
+        dominance = top / denom
+
+    score = FRESH_WEIGHT * fresh + TITLE_WEIGHT * (1.0 - title_match) + DOMINANCE_WEIGHT * dominance
+    return {"SERP_Fresh": fresh, "SERP_Dominance": dominance, "SERP_Title_Match": title_match, "SERP_Score": score}
+
+
+def serp_type(fresh: float, dominance: float, title_match: float) -> str:
+    """Dominant trait of a results page (replaces the old SmartBlock_Type placeholder)."""
+    if math.isnan(fresh):
+        return ""
+    if title_match >= 0.6:
+        return "Exact-Title Race"
+    if dominance >= 0.5:
+        return "Single-Blogger Dominated"
+    if fresh >= 0.5:
+        return "Fresh Rotation"
+    return "Mixed"
+
+
+def score_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sk/Ek and the SERP features for a batch of fetched rows in one vectorized pass (the pipeline's score stage).
+    Consumes each row's SERP_ITEMS; rows without results (e.g. estimated doc counts) get empty SERP columns.
+    """
+    if not rows:
+        return rows
+    import numpy as np
+
+    volumes = np.fromiter((r['Monthly_Search_Volume'] for r in rows), dtype=np.float64, count=len(rows))
+    docs = np.fromiter((r['Total_Docs'] for r in rows), dtype=np.float64, count=len(rows))
+    saturation = saturation_array(docs, volumes)
+    efficiency = efficiency_array(saturation, volumes)
+    features = serp_arrays([r['Keyword'] for r in rows], [r.pop(SERP_ITEMS, None) for r in rows])
+
+    columns = {name: values.tolist() for name, values in features.items()}
+    for i, row in enumerate(rows):
+        row['Saturation_Index'] = float(saturation[i])
+        row['Efficiency_Score'] = float(efficiency[i])
+        for name, values in columns.items():
+            row[name] = None if math.isnan(values[i]) else values[i]
+        row['SmartBlock_Type'] = serp_type(columns['SERP_Fresh'][i], columns['SERP_Dominance'][i],
+                                           columns['SERP_Title_Match'][i])
+    return rows
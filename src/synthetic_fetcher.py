@@ -0,0 +1,242 @@
+import hashlib
+import math
+import random
+import struct
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from history_config import DEFAULT_HISTORY_PATH
+    from metrics import REGISTRY, classify_outcome
+    from serp_features import SERP_DISPLAY, SerpItem
+except ImportError:
+    from src.history_config import DEFAULT_HISTORY_PATH
+    from src.metrics import REGISTRY, classify_outcome
+    from src.serp_features import SERP_DISPLAY, SerpItem
+
+# 합성 데이터가 실제 키워드 이력(근사 모드)에 섞이지 않도록 별도 저장소 사용
+SYNTHETIC_HISTORY_PATH = "reports/synthetic_history.sqlite"
+
+# 연관 검색어 생성용 접미어 (실제 검색광고 API처럼 공백 없이 붙임)
+MODIFIERS = [
+    "추천", "가격", "후기", "순위", "비교", "방법", "종류", "구매", "할인", "최저가", "브랜드", "사이즈",
+    "여름", "겨울", "2026", "초보", "가성비", "인기", "세트", "중고", "렌탈", "맛집", "근처", "서울",
+    "부산", "제주", "리뷰", "장단점", "뜻", "전망", "수익률", "배당", "세금", "계산기", "정리", "모음",
+    "만들기", "고르는법", "관리", "보관", "디자인", "색상", "용량", "무게", "대여", "예약", "쿠폰", "이벤트",
+]
+
+SYNTHETIC_TRENDS = ["삼성전자", "손흥민", "비트코인", "날씨", "환율", "캠핑", "다이어트", "제주도 여행",
+                    "아이폰", "미국 주식", "전기차", "부동산", "넷플릭스", "마라톤", "청약"]
+
+# compIdx별 Sk 보정 (광고 경쟁이 심한 키워드일수록 문서도 많음)
+COMP_LOG_SK = {"낮음": -0.6, "중간": 0.0, "높음": 0.6}
+
+# 검색광고 API 연관 검색어 최대 개수
+MAX_RELATED = 1000
+
+# compIdx별 상위 결과를 나눠 갖는 블로거 수 (경쟁이 낮을수록 소수 블로거가 독점)
+COMP_BLOGGERS = {"낮음": 4, "중간": 12, "높음": 40}
+
+
+def _modifier_phrase(index: int) -> str:
+    """0 -> '추천', 47 -> '이벤트', 48 -> '추천추천', ... (bijective base-len(MODIFIERS), so every index is unique)"""
+    parts = []
+    index += 1
+    while index:
+        index, digit = divmod(index - 1, len(MODIFIERS))
+        parts.append(MODIFIERS[digit])
+    return "".join(reversed(parts))
+
+
+class SyntheticDataFetcher:
+    """
+    Offline stand-in for RealDataFetcher (same methods and return shapes) for load-testing the
+    scoring, filtering and report paths without API quota.
+
+    Every value is a pure function of (seed, keyword), so workers, reruns and the approximate
+    mode's history all see the same numbers:
+    - volume: log-normal, shorter keywords get more searches (long tail); '< 10' is reported as 10
+    - compIdx: rises with volume, with noise
+    - Sk: log-normal around a per-topic level (keywords sharing a prefix are similar), shifted by compIdx
+    - related keywords: the seed plus modifier suffixes, up to `related_count` with volume >= 100
+    - top results (get_serp): saturated keywords have more exact-title and older posts,
+      low-competition keywords are held by fewer bloggers
+    `failure_rate` makes that share of keywords fail per endpoint (None / []) to exercise the skip paths;
+    which ones fail is derived the same way, so it does not depend on thread timing.
+    """
+
+    def __init__(self, seed: int = 0, related_count: Optional[int] = None, failure_rate: float = 0.0):
+        self.seed = seed
+        self.related_count = related_count
+        self.failure_rate = failure_rate
+        self._topics: Dict[str, float] = {}
+        self._postdates: Dict[int, int] = {}  # 경과 일수 -> YYYYMMDD
+
+    def _normals(self, *parts: str) -> Tuple[float, float, float]:
+        """Three standard normals derived from a hash (Box-Muller); much cheaper than seeding a Random per keyword."""
+        digest = hashlib.blake2b(":".join((str(self.seed),) + parts).encode("utf-8"), digest_size=16).digest()
+        u = [(int.from_bytes(digest[i:i + 4], "big") + 0.5) / 2 ** 32 for i in range(0, 16, 4)]
+        r1, r2 = math.sqrt(-2.0 * math.log(u[0])), math.sqrt(-2.0 * math.log(u[2]))
+        return r1 * math.cos(2 * math.pi * u[1]), r1 * math.sin(2 * math.pi * u[1]), r2 * math.cos(2 * math.pi * u[3])
+
+    def _uniforms(self, count: int, *parts: str) -> Tuple[float, ...]:
+        """`count` uniforms in (0, 1) from as many 64-byte digests as needed."""
+        key = ":".join((str(self.seed),) + parts).encode("utf-8")
+        raw = b"".join(hashlib.blake2b(key + bytes([block]), digest_size=64).digest()
+                       for block in range((count + 15) // 16))
+        return tuple([(v + 0.5) * 2.0 ** -32 for v in struct.unpack(f">{count}I", raw[:4 * count])])
+
+    def _fails(self, endpoint: str, keyword: str) -> bool:
+        if self.failure_rate and self._uniforms(1, "fail", endpoint, keyword.replace(" ", "").casefold())[0] < self.failure_rate:
+            REGISTRY.record_outcome(endpoint, classify_outcome(503))
+            return True
+        return False
+
+    def profile(self, keyword: str) -> Tuple[int, str, int]:
+        """(volume, compIdx, docs) of a keyword."""
+        compact = keyword.replace(" ", "").casefold()
+        z_volume, z_comp, z_sk = self._normals("kw", compact)
+        mu = max(3.0, 10.5 - 0.45 * len(compact))
+        volume = max(10, int(math.exp(mu + 1.3 * z_volume)))
+
+        score = math.log(volume) + z_comp
+        comp = "높음" if score > 8.5 else "중간" if score > 6.5 else "낮음"
+
+        prefix = compact[:3]
+        topic = self._topics.get(prefix)
+        if topic is None:
+            topic = self._topics[prefix] = 0.5 + self._normals("topic", prefix)[0]
+        log_sk = topic + COMP_LOG_SK[comp] + 0.7 * z_sk
+        docs = int(volume * math.exp(log_sk))
+        return volume, comp, docs
+
+    def get_search_volume(self, keyword: str) -> Optional[int]:
+        stats = self.get_keyword_stats(keyword)
+        return None if stats is None else stats["volume"]
+
+    def get_keyword_stats(self, keyword: str) -> Optional[Dict[str, Any]]:
+        if self._fails("search_volume", keyword):
+            return None
+        volume, comp, _ = self.profile(keyword)
+        REGISTRY.record_outcome("search_volume", "ok")
+        return {"volume": volume, "comp": comp}
+
+    def get_doc_count(self, keyword: str) -> Optional[int]:
+        if self._fails("doc_count", keyword):
+            return None
+        docs = self.profile(keyword)[2]
+        REGISTRY.record_outcome("doc_count", classify_outcome(200, empty=not docs))
+        return docs
+
+    def serp_items(self, keyword: str, profile: Optional[Tuple[int, str, int]] = None) -> List[SerpItem]:
+        """Top SERP_DISPLAY results as (postdate, blogger, normalized title), shaped like serp_features.slim_items."""
+        volume, comp, docs = profile or self.profile(keyword)
+        compact = keyword.replace(" ", "").casefold()
+        log_sk = math.log(max(docs, 1) / volume)
+        exact = min(max(0.35 + 0.2 * log_sk, 0.05), 0.95)
+        median_age = math.exp(min(max(4.0 + 0.3 * log_sk, 2.0), 6.0))  # 대략 7일~1년
+        pool = COMP_BLOGGERS[comp]
+        count = min(SERP_DISPLAY, docs)
+        u = self._uniforms(3 * count, "serp", compact)
+        items = []
+        for i in range(count):
+            age = int(median_age * -math.log(u[3 * i]))  # 지수분포
+            postdate = self._postdates.get(age)
+            if postdate is None:
+                day = date.today() - timedelta(days=age)
+                postdate = self._postdates[age] = day.year * 10000 + day.month * 100 + day.day
+            modifier = MODIFIERS[i % len(MODIFIERS)]
+            title = compact + modifier if u[3 * i + 2] < exact else modifier + compact[:2]
+            items.append((postdate, f"blog.naver.com/syn{int(u[3 * i + 1] * pool)}", title))
+        return items
+
+    def get_serp(self, keyword: str) -> Optional[Dict[str, Any]]:
+        if self._fails("doc_count", keyword):
+            return None
+        profile = self.profile(keyword)
+        REGISTRY.record_outcome("doc_count", classify_outcome(200, empty=not profile[2]))
+        return {"total": profile[2], "items": self.serp_items(keyword, profile)}
+
+    def get_related_keywords(self, seed_keyword: str) -> List[Dict[str, Any]]:
+        """Same shape and volume >= 100 filter as RealDataFetcher.get_related_keywords."""
+        if self._fails("related_keywords", seed_keyword):
+            return []
+        base = seed_keyword.replace(" ", "")
+        if self.related_count:
+            count = self.related_count
+        else:
+            u = (self._normals("related", base)[0] + 3.0) / 6.0  # 대략 0~1
+            count = int(MAX_RELATED // 5 + min(max(u, 0.0), 1.0) * (MAX_RELATED - MAX_RELATED // 5))
+        related = []
+        # 조건(검색량 >= 100)을 통과한 키워드가 count개가 될 때까지 생성 (무한 루프 방지로 상한)
+        for i in range(count * 20):
+            kw = base + _modifier_phrase(i)
+            volume, comp, _ = self.profile(kw)
+            if volume >= 100:
+                related.append({"keyword": kw, "volume": volume, "comp": comp})
+                if len(related) >= count:
+                    break
+        REGISTRY.record_outcome("related_keywords", classify_outcome(200, empty=not related))
+        return related
+
+    def get_trending_keywords(self, limit: int = 5) -> List[str]:
+        """Stand-in for trend_hunter.fetch_trending_keywords (no scraping)."""
+        trends = list(SYNTHETIC_TRENDS)
+        random.Random(self.seed).shuffle(trends)
+        return trends[:limit]
+
+
+def add_synthetic_args(parser) -> None:
+    """Flags shared by every entry point for load-testing with generated data."""
+    group = parser.add_argument_group("synthetic data (load testing, no API calls)")
+    group.add_argument("--synthetic", action="store_true",
+                       help="Use generated volumes/doc counts/related keywords instead of the Naver APIs")
+    group.add_argument("--synthetic-seed", type=int, default=0, help="Seed of the generated data")
+    group.add_argument("--synthetic-related", type=int, default=None,
+                       help="Related keywords per seed (default: 200-1000 like the Ad API; can be millions)")
+    group.add_argument("--synthetic-failure-rate", type=float, default=0.0,
+                       help="Share of keywords whose calls fail (fixed per seed), to exercise the skip paths")
+
+
+def synthetic_from_args(args) -> Optional[SyntheticDataFetcher]:
+    """
+    None unless --synthetic. Generated numbers must not end up in the real keyword history,
+    so the approximate mode's default history store is swapped for a synthetic one.
+    """
+    if not args.synthetic:
+        return None
+    if getattr(args, "history", None) == DEFAULT_HISTORY_PATH:
+        args.history = SYNTHETIC_HISTORY_PATH
+    return SyntheticDataFetcher(seed=args.synthetic_seed, related_count=args.synthetic_related,
+                                failure_rate=args.synthetic_failure_rate)
+
+
+def synthetic_meta(args) -> Dict[str, Any]:
+    """Job meta entries that let distributed workers generate the same data as the coordinator."""
+    if not args.synthetic:
+        return {"synthetic_seed": None}
+    return {"synthetic_seed": args.synthetic_seed, "synthetic_failure_rate": args.synthetic_failure_rate}
+
+
+def synthetic_worker_flags(meta: Dict[str, Any]) -> str:
+    """Flags to append to the printed worker command of a job (empty for a real-API job)."""
+    if meta.get("synthetic_seed") is None:
+        return ""
+    return f" --synthetic --synthetic-seed {meta['synthetic_seed']}"
+
+
+def synthetic_from_job(args, meta: Dict[str, Any]) -> Optional[SyntheticDataFetcher]:
+    """
+    Data source of a distributed worker. The job meta decides, so a worker started without --synthetic
+    on a synthetic job does not spend API quota on generated keywords (and vice versa).
+    Raises ValueError when the worker's --synthetic/--synthetic-seed contradict the job.
+    """
+    seed = meta.get("synthetic_seed")
+    if args.synthetic and seed != args.synthetic_seed:
+        job_mode = "real API data" if seed is None else f"synthetic data (seed {seed})"
+        raise ValueError(f"--synthetic --synthetic-seed {args.synthetic_seed} does not match the job ({job_mode})")
+    if seed is None:
+        return None
+    args.synthetic, args.synthetic_seed = True, seed
+    args.synthetic_failure_rate = meta.get("synthetic_failure_rate", args.synthetic_failure_rate)
+    return synthetic_from_args(args)
@@ -1,9 +1,6 @@
 import sys
 import os
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
+import argparse
 from datetime import datetime
 
 # --- Path Setup ---
@@ -14,13 +11,27 @@ if current_dir not in sys.path:
 try:
     from keyword_expander import expand_keyword
     from data_fetcher import fetch_keyword_data
-    from calculator import calculate_saturation, calculate_efficiency, filter_keywords
+    from calculator import RED_OCEAN_SK
+    from report_writer import StreamingReportWriter, ReportSection, DEFAULT_MD_LIMIT, REPORT_COLUMNS, SERP_DETAIL_COLUMNS
+    from serp_features import score_rows
+    from metrics import REGISTRY, StageProfiler
+    from distributed import LeaseStore, add_distributed_args, resolve_job, run_worker, wait_for_job
+    from doc_estimator import accuracy_section, add_approx_args, estimator_from_args
+    from synthetic_fetcher import add_synthetic_args, synthetic_from_args, synthetic_from_job, synthetic_meta, synthetic_worker_flags
+    from pipeline import add_pipeline_args, pipeline_from_args, workers_from_args
 except ImportError:
     # Handle running from root
     sys.path.append(os.path.join(current_dir, ".."))
     from src.keyword_expander import expand_keyword
     from src.data_fetcher import fetch_keyword_data
-    from src.calculator import calculate_saturation, calculate_efficiency, filter_keywords
+    from src.calculator import RED_OCEAN_SK
+    from src.report_writer import StreamingReportWriter, ReportSection, DEFAULT_MD_LIMIT, REPORT_COLUMNS, SERP_DETAIL_COLUMNS
+    from src.serp_features import score_rows
+    from src.metrics import REGISTRY, StageProfiler
+    from src.distributed import LeaseStore, add_distributed_args, resolve_job, run_worker, wait_for_job
+    from src.doc_estimator import accuracy_section, add_approx_args, estimator_from_args
+    from src.synthetic_fetcher import add_synthetic_args, synthetic_from_args, synthetic_from_job, synthetic_meta, synthetic_worker_flags
+    from src.pipeline import add_pipeline_args, pipeline_from_args, workers_from_args
 
 def fetch_trending_keywords(limit: int = 5):
     """
@@ -31,6 +42,10 @@ def fetch_trending_keywords(limit: int = 5):
     print(f"   📡 Scraping trends from {url}...")
     
     try:
+        # lazy: 스크래핑할 때만 로드 (CLI 콜드 스타트 단축)
+        import requests
+        from bs4 import BeautifulSoup
+
         response = requests.get(url, timeout=10)
         response.raise_for_status()
         
@@ -58,105 +73,190 @@ def fetch_trending_keywords(limit: int = 5):
         # Fallback
         return ["삼성전자", "손흥민", "비트코인", "날씨", "환율"][:limit]
 
-def main():
-    print("🌊 [Trend Deep Diver] Starting Analysis...")
-    
-    # 1. Crawl Top 5
-    trends = fetch_trending_keywords(limit=5)
-    print(f"   🔥 Identified Top 5 Trends: {trends}")
-    
-    # 2. Expand (Deep Dive)
-    print("   🧠 Expanding trends into sub-topics...")
-    all_targets = set()
-    for trend in trends:
-        # expand_keyword returns (list, sub_topics)
-        expanded_list, _ = expand_keyword(trend)
-        all_targets.update(expanded_list)
-        
-    unique_targets = list(all_targets)
-    print(f"   🚀 Total Keywords to Analyze: {len(unique_targets)} (Duplicates removed)")
-    
-    # 3. Analyze (Real API)
-    print(f"   📡 Connecting to Naver API...")
-    data = []
-    
-    for i, kw in enumerate(unique_targets):
-        print(f"      [{i+1}/{len(unique_targets)}] Analyzing '{kw}'...", end="\r")
-        try:
-            metrics = fetch_keyword_data(kw)
-            if metrics:
-                data.append(metrics)
-        except Exception as e:
-            # print(f"\n      ❌ Error: {e}")
-            pass
-        time.sleep(0.1) # Rate Limit
-        
-    print("\n   ✅ Data Collection Complete.")
-    
-    if not data:
-        print("   ❌ No data available.")
-        return
+def score_keyword(kw, profiler, estimator=None, fetcher=None):
+    """Volume + doc count + Sk/Ek/SERP features for one keyword. None = API failure."""
+    with profiler.stage("fetch"):
+        metrics = fetch_keyword_data(kw, estimator=estimator, fetcher=fetcher)
+    if not metrics:
+        return None
+    with profiler.stage("score"):
+        return score_rows([metrics])[0]
 
-    df = pd.DataFrame(data)
-    
-    # 4. Calculation
-    print("   🧮 Calculating Sk & Ek...")
-    try:
-        df['Saturation_Index'] = df.apply(lambda row: calculate_saturation(row['Total_Docs'], row['Monthly_Search_Volume']), axis=1)
-        df['Efficiency_Score'] = df.apply(lambda row: calculate_efficiency(row['Saturation_Index'], row['Monthly_Search_Volume']), axis=1)
-    except KeyError as e:
-        print(f"   ❌ Calculation Error (Keys): {e}")
-        return
 
-    # 5. Filter (Blue Ocean only)
-    # Using manual mask for clear variable names, or reuse filter_keywords if compatible
-    blue_ocean = df[df['Saturation_Index'] < 5.0].copy()
-    
-    # Sort
-    blue_ocean = blue_ocean.sort_values(by='Efficiency_Score', ascending=False)
-    
-    # 6. Reporting
+def open_report(args, approx=False):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    os.makedirs('reports', exist_ok=True)
     report_file = f"reports/DEEP_DIVE_{timestamp}.md"
-    
-    # Rounding
-    if not blue_ocean.empty:
-        blue_ocean['Saturation_Index'] = blue_ocean['Saturation_Index'].round(2)
-        blue_ocean['Efficiency_Score'] = blue_ocean['Efficiency_Score'].round(2)
+    # 근사 모드: 문서 수를 추정한 행은 Docs_Source=estimate 로 표시
+    columns = REPORT_COLUMNS + SERP_DETAIL_COLUMNS + (['Docs_Source'] if approx else [])
+    writer = StreamingReportWriter(report_file, columns=columns, chunk_rows=args.chunk_rows)
+    blue_ocean = writer.add_section(ReportSection(
+        f"## 2. 🏆 Blue Ocean Opportunities ($S_k < {RED_OCEAN_SK}$)",
+        sort_by='Efficiency_Score',
+        where=lambda row: row['Saturation_Index'] < RED_OCEAN_SK,  # Blue Ocean only
+        limit=args.md_limit,
+        description="*Sorted by Efficiency Score ($E_k$). Higher is better.*",
+        empty_message="No Blue Ocean keywords found (All highly competitive).",
+    ))
+    return writer, blue_ocean, report_file, timestamp
 
-    try:
-        table_md = blue_ocean[['Keyword', 'Monthly_Search_Volume', 'Total_Docs', 'Saturation_Index', 'Efficiency_Score', 'SmartBlock_Type']].to_markdown(index=False)
-    except ImportError:
-        table_md = blue_ocean.to_string()
-    except KeyError:
-         # Fallback if columns missing
-         table_md = blue_ocean.to_markdown()
-
-    report_content = f"""# 🌊 실시간 트렌드 딥 다이브 리포트
+
+def finish_report(writer, blue_ocean, report_file, timestamp, trends, scanned, profiler, metrics=REGISTRY, extra="",
+                  estimator=None, source="Signal.bz -> Naver API"):
+    if writer.rows_written == 0:
+        print("   ❌ No data available.")
+        return
+
+    preamble = f"""# 🌊 실시간 트렌드 딥 다이브 리포트
 **Timestamp:** {timestamp}
-**Source:** Signal.bz -> Naver API
+**Source:** {source}
 
 ## 1. 🔍 Analysis Context
 - **Base Trends:** {', '.join(trends)}
-- **Total Keywords Scanned:** {len(unique_targets)}
-- **Blue Ocean Found:** {len(blue_ocean)}
-
-## 2. 🏆 Blue Ocean Opportunities ($S_k < 5.0$)
-*Sorted by Efficiency Score ($E_k$). Higher is better.*
-
-{table_md if not blue_ocean.empty else "No Blue Ocean keywords found (All highly competitive)."}
+- **Total Keywords Scanned:** {scanned}
+- **Blue Ocean Found:** {blue_ocean.matched}
+- **Full Data:** {writer.sidecar_hint()}
+{extra}"""
 
-## 3. 💡 Strategy
+    epilogue = """## 3. 💡 Strategy
 - Pick the top keywords from the list above.
 - Ensure content addresses the specific intent (e.g. 'Review', 'How-to' implied by suffixes).
 - If list is empty, the trends are currently 'Red Ocean'. Consider targeting niche sub-questions not yet covered.
-"""
+""" + accuracy_section(estimator)
 
-    with open(report_file, "w", encoding="utf-8") as f:
-        f.write(report_content)
+    with profiler.stage("report"):
+        writer.close(preamble=preamble, epilogue=epilogue, metrics=metrics)
         
     print(f"   📝 Deep Dive Report generated: {report_file}")
 
+
+def merge_job(store, job, args, profiler):
+    """Merge-and-rank: streams every worker's scored rows into the usual report."""
+    progress = store.progress(job["job_id"])
+    if progress["shards_left"]:
+        print(f"   ⚠️ Job {job['job_id']} is not finished ({progress['shards_left']} shards left). Merging partial results.")
+    # Docs_Source 열 여부는 병합 CLI 플래그가 아니라 작업 등록 시점의 모드를 따름
+    writer, blue_ocean, report_file, timestamp = open_report(args, approx=job["meta"].get("approx", args.approx))
+    with profiler.stage("report"):
+        for row in store.iter_results(job["job_id"]):
+            writer.write_row(row)
+    meta = job["meta"]
+    extra = (f"- **Distributed Job:** `{job['job_id']}` ({progress['workers']} workers, "
+             f"{progress['failed']} keywords skipped after API failures)\n")
+    # API 지표는 각 워커 프로세스에 남아 있으므로 병합 리포트에는 넣지 않음
+    finish_report(writer, blue_ocean, report_file, timestamp, meta.get("trends", []), meta.get("scanned", 0),
+                  profiler, metrics=None, extra=extra, source=meta.get("source", "Signal.bz -> Naver API"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Naver SEO Trend Deep Diver")
+    parser.add_argument("--limit", type=int, default=5, help="Number of trending keywords to dive into")
+    parser.add_argument("--md-limit", type=int, default=DEFAULT_MD_LIMIT, help="Max rows in the Markdown table (full data goes to CSV/JSONL)")
+    parser.add_argument("--chunk-rows", type=int, default=0, help="Split CSV/JSONL sidecars every N rows (0 = single file)")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown (discover, expand, dedupe, fetch, score, rank, sink, report)")
+    add_pipeline_args(parser)
+    add_distributed_args(parser)
+    add_approx_args(parser)
+    add_synthetic_args(parser)
+    args = parser.parse_args()
+    profiler = StageProfiler(enabled=args.profile)
+    fetcher = synthetic_from_args(args)  # None = 실제 네이버 API
+    source = f"Synthetic data (seed {args.synthetic_seed})" if fetcher else "Signal.bz -> Naver API"
+
+    if args.role in ("worker", "merge"):
+        store = LeaseStore(args.store, lease_seconds=args.lease_seconds)
+        job = resolve_job(store, "trend", args.job)
+        if job is None:
+            print(f"   ❌ No trend job found in {args.store}.")
+            return
+        if args.role == "worker":
+            try:
+                # 데이터 원천은 작업 등록 시점의 모드를 따름 (합성 작업에 실제 API를 쓰지 않도록)
+                fetcher = synthetic_from_job(args, job["meta"])
+            except ValueError as e:
+                print(f"   ❌ {e}")
+                return
+            print(f"🌊 [Trend Deep Diver] Worker joining job {job['job_id']}")
+            estimator = estimator_from_args(args, threshold=RED_OCEAN_SK, seeds=job["meta"].get("trends", []))
+            stats = run_worker(store, job["job_id"], lambda kw, vol, comp: score_keyword(kw, profiler, estimator, fetcher),
+                               workers=workers_from_args(args))
+            print(f"   ✅ Worker finished: {stats['shards']} shards, {stats['done']} scored, {stats['failed']} skipped.")
+            if estimator:
+                print(accuracy_section(estimator))
+                estimator.close()
+        else:
+            merge_job(store, job, args, profiler)
+        if args.profile:
+            print(profiler.report())
+        return
+
+    print("🌊 [Trend Deep Diver] Starting Analysis...")
+    trends = []
+
+    def discover():
+        # 1. Crawl Top N
+        trends.extend(fetcher.get_trending_keywords(args.limit) if fetcher else fetch_trending_keywords(limit=args.limit))
+        print(f"   🔥 Identified Top {len(trends)} Trends: {trends}")
+        print("   🧠 Expanding trends into sub-topics...")
+        if estimator:
+            estimator.seeds.extend(trends)
+        return trends
+
+    def expand(trend):
+        # 2. Expand (Deep Dive). expand_keyword returns (list, sub_topics)
+        expanded_list, _ = expand_keyword(trend)
+        return expanded_list
+
+    if args.role == "coordinator":
+        # 작업 등록만 하므로 수집 스테이지 없이 발견 → 확장 → 중복 제거까지만 실행
+        estimator = None
+        targets = []
+        pipe = pipeline_from_args(args, profiler)
+        pipe.source("discover", discover).flat_map("expand", expand).dedupe("dedupe").sink("sink", targets.append)
+        pipe.run()
+        print(f"   🚀 Total Keywords to Analyze: {len(targets)} (Duplicates removed)")
+        store = LeaseStore(args.store, lease_seconds=args.lease_seconds)
+        meta = {"trends": trends, "scanned": len(targets), "source": source, **synthetic_meta(args), "approx": args.approx}
+        job_id = store.create_job("trend", None, ((kw, None, None) for kw in targets), num_shards=args.shards, meta=meta)
+        print(f"   📦 Job {job_id} enqueued in {args.store} ({args.shards} shards).")
+        print(f"      Start workers with: python src/trend_hunter.py --role worker --store {args.store} --job {job_id}"
+              f"{synthetic_worker_flags(meta)}")
+        if args.wait:
+            wait_for_job(store, job_id)
+            merge_job(store, store.job(job_id), args, profiler)
+        return
+    
+    # 3. Report (rows are streamed to CSV/JSONL as they are scored)
+    estimator = estimator_from_args(args, threshold=RED_OCEAN_SK)
+    writer, blue_ocean, report_file, timestamp = open_report(args, approx=estimator is not None)
+
+    def sink(row):
+        writer.store_row(row)
+        print(f"      [{writer.rows_written}/{pipe.stats['dedupe'].emitted}] Analyzed '{row['Keyword']}'...", end="\r")
+
+    # 4. Analyze (Real API) + Calculation: discover → expand → dedupe → fetch (parallel) → score → rank → sink
+    print(f"   📡 Connecting to Naver API...")
+    pipe = pipeline_from_args(args, profiler)
+    pipe.source("discover", discover)
+    pipe.flat_map("expand", expand)
+    pipe.dedupe("dedupe")
+    pipe.map("fetch", lambda kw: fetch_keyword_data(kw, estimator=estimator, fetcher=fetcher))
+    pipe.batch("score", score_rows)
+    pipe.tap("rank", writer.rank_row)
+    pipe.sink("sink", sink)
+    pipe.run()
+        
+    print("\n   ✅ Data Collection Complete.")
+    scanned = pipe.stats["dedupe"].emitted
+    print(f"   🚀 Total Keywords Analyzed: {scanned} (Duplicates removed)")
+
+    # 5. Reporting
+    finish_report(writer, blue_ocean, report_file, timestamp, trends, scanned, profiler, estimator=estimator,
+                  source=source)
+    if estimator:
+        estimator.close()
+    if args.profile:
+        print(profiler.report())
+        print(pipe.summary())
+
 if __name__ == "__main__":
     main()